@@ -0,0 +1,161 @@
+"""응답 압축 (Accept-Encoding 협상: zstd > br > gzip)
+
+슬롯 키("2025-03-04|09:30")가 반복되는 결과/응답 기록 JSON은 10~20배 줄어든다.
+- CompressionMiddleware: 한 번에 보내는 응답 본문이 COMPRESSION_MIN_SIZE 바이트 이상이면 압축
+  (스트리밍 응답(SSE 등), 이미 Content-Encoding이 있는 응답, 압축 효과가 없는 형식은 그대로 보냄)
+- cached_json_response(): 결과 캐시에 압축본도 함께 저장해 캐시 적중 때 다시 압축하지 않음
+
+압축 대상 형식의 응답은 압축하지 않고 보낼 때도 Vary: Accept-Encoding을 붙이고,
+압축한 본문의 ETag에는 인코딩을 붙여(encoded_etag) 인코딩마다 다른 ETag를 쓴다.
+
+br은 brotli 패키지, zstd는 zstandard 패키지가 설치되어 있을 때만 사용한다. (선택 의존성)
+
+환경 변수
+- COMPRESSION_MIN_SIZE: 압축할 최소 본문 크기(바이트, 기본 1024, 0이면 압축하지 않음)
+"""
+from typing import Awaitable, Callable, Dict, Optional
+from fastapi import Request
+from fastapi.responses import Response
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+from app.api.rendering import encoded_etag, json_response
+from app.services.result_cache import result_cache
+import gzip
+import os
+
+try:
+    import brotli
+except ImportError:  # 선택 의존성
+    brotli = None
+
+try:
+    import zstandard
+except ImportError:  # 선택 의존성
+    zstandard = None
+
+COMPRESSION_MIN_SIZE = int(os.getenv("COMPRESSION_MIN_SIZE", "1024"))
+
+# 인코딩별 압축 함수 (선호 순서, 요청 지연에 비해 압축률이 충분한 수준)
+COMPRESSORS: Dict[str, Callable[[bytes], bytes]] = {}
+if zstandard is not None:
+    COMPRESSORS["zstd"] = zstandard.ZstdCompressor(level=3).compress
+if brotli is not None:
+    COMPRESSORS["br"] = lambda data: brotli.compress(data, quality=5)
+COMPRESSORS["gzip"] = lambda data: gzip.compress(data, compresslevel=6)
+
+COMPRESSIBLE_TYPES = ("application/json", "text/", "application/javascript")
+
+
+def negotiate(accept_encoding: Optional[str]) -> Optional[str]:
+    """Accept-Encoding에서 사용할 인코딩 선택 (q값이 가장 높은 것, 같으면 COMPRESSORS 순서, 없으면 None)"""
+    if not accept_encoding:
+        return None
+    weights: Dict[str, float] = {}
+    for item in accept_encoding.split(","):
+        token, _, params = item.strip().partition(";")
+        quality = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                quality = float(params[2:])
+            except ValueError:
+                continue
+        weights[token.strip().lower()] = quality
+
+    best, best_quality = None, 0.0
+    for encoding in COMPRESSORS:
+        quality = weights.get(encoding, weights.get("*", 0.0))
+        if quality > best_quality:
+            best, best_quality = encoding, quality
+    return best
+
+
+def compress(data: bytes, encoding: str) -> bytes:
+    return COMPRESSORS[encoding](data)
+
+
+def _compressible(headers: Headers) -> bool:
+    return "content-encoding" not in headers and headers.get("content-type", "").startswith(COMPRESSIBLE_TYPES)
+
+
+async def cached_json_response(
+    request: Request,
+    room_id: str,
+    key: str,
+    compute: Callable[[], Awaitable[bytes]],
+    etag: Optional[str] = None
+) -> Response:
+    """결과 캐시를 거친 JSON 응답 (클라이언트가 받을 수 있으면 압축본도 캐시에 저장해 두고 그대로 보냄)"""
+    content = await result_cache.get_or_compute(room_id, key, compute)
+    if not COMPRESSION_MIN_SIZE:
+        return json_response(content, etag=etag)
+    encoding = negotiate(request.headers.get("accept-encoding"))
+    if encoding is None or len(content) < COMPRESSION_MIN_SIZE:
+        return json_response(content, etag=etag, headers={"Vary": "Accept-Encoding"})
+
+    async def encode() -> bytes:
+        return compress(content, encoding)
+
+    encoded = await result_cache.get_or_compute(room_id, f"{key}:{encoding}", encode)
+    return json_response(
+        encoded,
+        etag=encoded_etag(etag, encoding) if etag else None,
+        headers={"Content-Encoding": encoding, "Vary": "Accept-Encoding"}
+    )
+
+
+def _add_vary(headers: MutableHeaders) -> None:
+    if "accept-encoding" not in (token.strip().lower() for token in headers.get("vary", "").split(",")):
+        headers.add_vary_header("Accept-Encoding")
+
+
+class CompressionMiddleware:
+    """한 번에 보내는 응답 본문을 협상한 인코딩으로 압축하는 ASGI 미들웨어"""
+
+    def __init__(self, app: ASGIApp, minimum_size: int = COMPRESSION_MIN_SIZE):
+        self.app = app
+        self.minimum_size = minimum_size
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or not self.minimum_size:
+            await self.app(scope, receive, send)
+            return
+        # 압축하지 않는 요청도 압축 대상 응답에 Vary를 붙이기 위해 항상 거침
+        encoding = negotiate(Headers(scope=scope).get("accept-encoding"))
+
+        start: Optional[Message] = None
+        passthrough = False
+
+        async def send_compressed(message: Message) -> None:
+            nonlocal start, passthrough
+            if message["type"] == "http.response.start":
+                start = message
+                return
+            if passthrough or message["type"] != "http.response.body":
+                await send(message)
+                return
+
+            # 첫 본문 메시지에서 압축 여부 결정 (스트리밍 응답, 압축 대상이 아닌 형식은 그대로)
+            passthrough = True
+            body = message.get("body", b"")
+            headers = MutableHeaders(scope=start)
+            if message.get("more_body", False) or not (_compressible(headers) or start["status"] == 304):
+                await send(start)
+                await send(message)
+                return
+
+            _add_vary(headers)
+            if encoding is None or len(body) < self.minimum_size or start["status"] == 304:
+                await send(start)
+                await send(message)
+                return
+
+            body = compress(body, encoding)
+            headers["Content-Encoding"] = encoding
+            headers["Content-Length"] = str(len(body))
+            if "etag" in headers:
+                headers["ETag"] = encoded_etag(headers["etag"], encoding)
+            await send(start)
+            await send({"type": "http.response.body", "body": body})
+
+        await self.app(scope, receive, send_compressed)
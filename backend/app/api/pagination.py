@@ -0,0 +1,93 @@
+"""목록 API의 키셋 커서 페이지네이션과 필드 선택 (fields=)
+
+- 커서는 마지막 항목의 (created_at, id)를 base64url로 인코딩한 값이며, 다음 페이지는 그 다음 항목부터 조회한다.
+  (OFFSET 없이 인덱스 범위 조회로 끝나므로 깊은 페이지도 비용이 같음)
+- 다음 페이지가 있으면 X-Next-Cursor 헤더와 Link: <...>; rel="next" 헤더를 붙인다. 본문은 기존과 같은 목록이다.
+- limit과 cursor를 모두 생략하면 이전 클라이언트처럼 전체 목록을 보낸다. (cursor만 주면 DEFAULT_PAGE_SIZE개씩)
+- fields=id,version처럼 필드를 고르면 그 필드만 보낸다. (response_data를 빼면 응답 데이터를 읽거나 복원하지 않음)
+"""
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+from datetime import datetime
+from fastapi import HTTPException, Request, status
+from fastapi.responses import Response
+from pydantic import TypeAdapter
+from sqlalchemy import and_, or_
+from app import json_codec
+from app.api.rendering import json_response, render
+import base64
+
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 1000
+
+sparse_adapter = TypeAdapter(List[Dict[str, Any]])
+
+
+def page_size(limit: Optional[int], cursor: Optional[str]) -> Optional[int]:
+    """요청의 페이지 크기 (limit과 cursor를 모두 생략하면 None: 페이지로 나누지 않음)"""
+    if limit is None and cursor is None:
+        return None
+    return limit or DEFAULT_PAGE_SIZE
+
+
+def encode_cursor(created_at: datetime, item_id: str) -> str:
+    raw = json_codec.dumps([created_at.isoformat(), item_id]).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[datetime, str]:
+    """커서를 (created_at, id)로 (형식이 잘못되면 400)"""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        created_at, item_id = json_codec.loads(raw)
+        return datetime.fromisoformat(created_at), str(item_id)
+    except (ValueError, TypeError):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid cursor"
+        )
+
+
+def after_cursor(created_at_column, id_column, cursor: str, descending: bool = False):
+    """(created_at, id) 순서에서 커서 다음 항목들의 조건 (descending이면 역순에서 다음)"""
+    created_at, item_id = decode_cursor(cursor)
+    if descending:
+        return or_(created_at_column < created_at, and_(created_at_column == created_at, id_column < item_id))
+    return or_(created_at_column > created_at, and_(created_at_column == created_at, id_column > item_id))
+
+
+def parse_fields(fields: Optional[str], allowed: Sequence[str]) -> Optional[List[str]]:
+    """fields=a,b 값을 필드 목록으로 (지정하지 않으면 None, 모르는 필드가 있으면 400)"""
+    if fields is None:
+        return None
+    selected = list(dict.fromkeys(field.strip() for field in fields.split(",") if field.strip()))
+    unknown = [field for field in selected if field not in allowed]
+    if unknown or not selected:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"fields must be a comma separated subset of {', '.join(allowed)}"
+        )
+    return selected
+
+
+def render_page(
+    request: Request,
+    adapter: TypeAdapter,
+    items: List[Any],
+    limit: Optional[int],
+    fields: Optional[List[str]] = None,
+    etag: Optional[str] = None
+) -> Response:
+    """limit + 1개까지 조회한 items로 한 페이지 응답 생성 (남는 항목이 있으면 다음 커서 헤더 추가, limit이 None이면 전체)"""
+    page = items[:limit]
+    headers = None
+    if limit is not None and len(items) > limit:
+        cursor = encode_cursor(page[-1].created_at, page[-1].id)
+        headers = {
+            "X-Next-Cursor": cursor,
+            "Link": f'<{request.url.include_query_params(cursor=cursor)}>; rel="next"',
+        }
+
+    if fields is None:
+        return render(adapter, page, etag=etag, headers=headers)
+    content = sparse_adapter.dump_json([{field: getattr(item, field) for field in fields} for item in page])
+    return json_response(content, etag=etag, headers=headers)
@@ -0,0 +1,136 @@
+"""API 응답 렌더링
+
+- FastJSONResponse: 앱 기본 응답 클래스 (json_codec으로 직렬화, orjson이 있으면 orjson)
+- render(): 큰 응답을 TypeAdapter로 한 번 검증하고 pydantic-core에서 바로 JSON 바이트로 직렬화
+  (엔드포인트가 Response를 반환하면 FastAPI의 response_model 재검증/jsonable_encoder 단계를 건너뜀.
+  response_model은 OpenAPI 문서용으로 그대로 둔다.)
+- splice(): 캐시된 JSON 바이트를 묶음 응답에 그대로 끼워 넣기
+- room_etag() / not_modified(): 방 변경 버전(Room.change_version) 기반 조건부 GET (If-None-Match → 304)
+  (압축된 본문은 app.api.compression이 encoded_etag()로 ETag에 인코딩을 붙임)
+
+    python -m app.api.rendering   # 기본 경로와 render()의 요청당 직렬화 비용 비교
+"""
+from typing import Any, Optional
+from fastapi import Request
+from fastapi.responses import JSONResponse, Response
+from pydantic import TypeAdapter
+from app import json_codec
+
+# 압축 본문 ETag에 붙을 수 있는 인코딩 (app.api.compression의 COMPRESSORS)
+CONTENT_CODINGS = ("zstd", "br", "gzip")
+
+
+class FastJSONResponse(JSONResponse):
+    """json_codec으로 직렬화하는 JSON 응답"""
+
+    def render(self, content: Any) -> bytes:
+        return json_codec.dumps_bytes(content)
+
+
+def dump(adapter: TypeAdapter, value: Any) -> bytes:
+    """value(ORM 객체 또는 dict)를 adapter 스키마로 검증하여 JSON 바이트로 직렬화"""
+    return adapter.dump_json(adapter.validate_python(value, from_attributes=True))
+
+
+def json_response(content: bytes, status_code: int = 200, etag: Optional[str] = None, headers: Optional[dict] = None) -> Response:
+    """직렬화된 JSON 바이트 응답 (etag가 있으면 ETag 헤더 추가)"""
+    headers = {**(_etag_headers(etag) or {}), **(headers or {})}
+    return Response(content=content, status_code=status_code, media_type="application/json", headers=headers or None)
+
+
+def render(adapter: TypeAdapter, value: Any, status_code: int = 200, etag: Optional[str] = None, headers: Optional[dict] = None) -> Response:
+    """value를 adapter 스키마로 검증하여 JSON 응답으로 반환"""
+    return json_response(dump(adapter, value), status_code, etag, headers)
+
+
+def splice(content: bytes, key: str, value: bytes) -> bytes:
+    """직렬화된 JSON 객체 content의 key 필드를 이미 직렬화된 value로 바꿈 (캐시된 JSON 바이트를 다시 파싱하지 않고 끼워 넣기)
+
+    key 필드는 content의 마지막 필드여야 한다 (스키마 기본값으로 직렬화된 자리를 value로 대체).
+    """
+    marker = b',"' + key.encode() + b'":'
+    head = content[:content.rindex(marker)]
+    return head + marker + value + b"}"
+
+
+def room_etag(room: Any) -> str:
+    """방과 방의 참여자/응답 상태를 나타내는 강한 ETag (방/참여자/응답이 바뀔 때마다 올라가는 change_version 사용)"""
+    return f'"{room.id}-{room.change_version}"'
+
+
+def encoded_etag(etag: str, encoding: str) -> str:
+    """압축된 본문의 ETag (같은 강한 ETag를 인코딩이 다른 본문에 쓰지 않도록 인코딩을 붙임: "id-3" -> "id-3-gzip")"""
+    return f'{etag[:-1]}-{encoding}"'
+
+
+def not_modified(request: Request, etag: str) -> Optional[Response]:
+    """If-None-Match가 etag(또는 etag에 인코딩을 붙인 압축본 ETag)와 일치하면 304 응답, 아니면 None"""
+    header = request.headers.get("if-none-match")
+    if not header:
+        return None
+    for candidate in header.split(","):
+        candidate = candidate.strip().removeprefix("W/")
+        if candidate == "*":
+            return Response(status_code=304, headers=_etag_headers(etag))
+        if candidate == etag or any(candidate == encoded_etag(etag, encoding) for encoding in CONTENT_CODINGS):
+            # 클라이언트가 가진 본문의 ETag를 그대로 돌려줌
+            return Response(status_code=304, headers=_etag_headers(candidate))
+    return None
+
+
+def _etag_headers(etag: Optional[str]) -> Optional[dict]:
+    if etag is None:
+        return None
+    # 브라우저가 캐시된 본문을 쓰기 전에 항상 ETag로 재검증하도록 함
+    return {"ETag": etag, "Cache-Control": "no-cache"}
+
+
+def bench(rounds: int = 200) -> None:
+    """최적 시간대 500개, 응답 기록 50개(각 슬롯 300개)의 요청당 직렬화 비용 비교
+
+    기본 경로: response_model 검증 → 파이썬 객체로 직렬화 → JSONResponse(json.dumps)
+    """
+    from datetime import datetime
+    from typing import List
+    import timeit
+    from app.models.response import Response as ResponseModel
+    from app.schemas.response import OptimalTimeSlot, ResponseResponse
+
+    optimal_times = [
+        {
+            "time_slot": f"2025-03-{index % 14 + 1:02d}|{index % 48 // 2:02d}:{index % 2 * 30:02d}",
+            "available_participants": [f"참여자{position}" for position in range(index % 20)],
+            "participant_count": index % 20,
+            "availability_rate": index % 20 / 20,
+        }
+        for index in range(500)
+    ]
+    slots = [f"2025-03-{day:02d}|{minutes // 60:02d}:{minutes % 60:02d}" for day in range(1, 15) for minutes in range(0, 24 * 60, 30)]
+    now = datetime.utcnow()
+    history = []
+    for version in range(50):
+        response = ResponseModel(
+            id=f"response-{version}", participant_id="participant", version=version + 1,
+            is_active=version == 49, created_at=now, updated_at=now
+        )
+        response.response_data = {"available_time_slots": slots[version:version + 300]}
+        history.append(response)
+
+    for label, adapter, value in (
+        ("optimal-times", TypeAdapter(List[OptimalTimeSlot]), optimal_times),
+        ("history", TypeAdapter(List[ResponseResponse]), history),
+    ):
+        def default():
+            validated = adapter.validate_python(value, from_attributes=True)
+            return JSONResponse(adapter.dump_python(validated, mode="json")).body
+
+        def fast():
+            return render(adapter, value).body
+
+        for name, func in (("default", default), ("render", fast)):
+            micros = timeit.timeit(func, number=rounds) / rounds * 1e6
+            print(f"{label:14s} {name:8s} {micros:9.1f} us/request")
+
+
+if __name__ == "__main__":
+    bench()
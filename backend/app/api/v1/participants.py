@@ -1,75 +1,132 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
-from typing import List
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, status
+from sqlalchemy import select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+from pydantic import TypeAdapter
+from sqlalchemy.orm import selectinload
+from typing import List, Optional
 from app.database import get_db
 from app.models.participant import Participant
 from app.models.room import Room
 from app.schemas.participant import ParticipantCreate, ParticipantResponse, ParticipantWithResponses
+from app.services import response_history, slot_tally
+from app.services.room_changes import bump_room_version, publish_room_change
+from app.services.write_queue import after_commit, write_queue
+from app.api.rendering import not_modified, room_etag
+from app.api.pagination import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE, after_cursor, page_size, parse_fields, render_page
 
 router = APIRouter()
 
+participant_list_adapter = TypeAdapter(List[ParticipantResponse])
+PARTICIPANT_FIELDS = tuple(ParticipantResponse.model_fields)
+
 @router.post("/", response_model=ParticipantResponse, status_code=status.HTTP_201_CREATED)
-async def create_participant(participant_data: ParticipantCreate, db: Session = Depends(get_db)):
+async def create_participant(participant_data: ParticipantCreate):
     """새로운 참여자 생성 또는 기존 참여자 반환"""
-    # 방 존재 확인
-    room = db.query(Room).filter(Room.id == participant_data.room_id, Room.is_active == True).first()
-    if not room:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Room not found"
+    async def write(db: AsyncSession) -> Participant:
+        # 방 존재 확인
+        room = await db.scalar(select(Room).where(Room.id == participant_data.room_id, Room.is_active == True))
+        if not room:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Room not found"
+            )
+        
+        # 같은 방에서 같은 이름의 참여자가 있는지 확인
+        existing_query = select(Participant).where(
+            Participant.room_id == participant_data.room_id,
+            Participant.name == participant_data.name
         )
-    
-    # 같은 방에서 같은 이름의 참여자가 있는지 확인
-    existing_participant = db.query(Participant).filter(
-        Participant.room_id == participant_data.room_id,
-        Participant.name == participant_data.name
-    ).first()
-    
-    if existing_participant:
-        # 기존 참여자 반환 (새로운 응답을 위해)
-        return existing_participant
-    else:
-        # 새로운 참여자 생성
-        participant = Participant(**participant_data.dict())
-        db.add(participant)
-        db.commit()
-        db.refresh(participant)
+        existing_participant = await db.scalar(existing_query)
+        
+        if existing_participant:
+            # 기존 참여자 반환 (새로운 응답을 위해)
+            return existing_participant
+        
+        # 새로운 참여자 생성 (같은 이름을 제출하는 요청과 같은 순서로 방을 먼저 잠금)
+        await slot_tally.lock_room(db, room.id)
+        participant = Participant(**participant_data.model_dump())
+        try:
+            async with db.begin_nested():
+                db.add(participant)
+                await db.flush()
+        except IntegrityError:
+            # 동시에 같은 이름으로 생성된 경우 (방 내 이름 유니크 인덱스, 다른 프로세스) 먼저 생성된 참여자 반환
+            return await db.scalar(existing_query)
+        version = await bump_room_version(db, participant.room_id)
+        # 아직 응답이 없는 참여자라 슬롯 집계는 그대로
+        after_commit(db, publish_room_change, participant.room_id, version, "participant_joined", participant.name, {"slots": {}})
         return participant
+    
+    return await write_queue.submit(write)
 
 @router.get("/room/{room_id}", response_model=List[ParticipantResponse])
-async def get_participants_by_room(room_id: str, db: Session = Depends(get_db)):
-    """방의 참여자 목록 조회"""
+async def get_participants_by_room(
+    room_id: str,
+    request: Request,
+    limit: Optional[int] = Query(None, ge=1, le=MAX_PAGE_SIZE, description=f"페이지 크기 (cursor만 주면 {DEFAULT_PAGE_SIZE}, limit과 cursor를 모두 생략하면 전체 목록)"),
+    cursor: Optional[str] = Query(None, description="이전 페이지의 X-Next-Cursor 값"),
+    fields: Optional[str] = Query(None, description=f"보낼 필드 (쉼표로 구분: {', '.join(PARTICIPANT_FIELDS)})"),
+    db: AsyncSession = Depends(get_db)
+):
+    """방의 참여자 목록 조회 (참여 순서, 커서 페이지네이션, If-None-Match가 방 ETag와 같으면 304)"""
+    selected = parse_fields(fields, PARTICIPANT_FIELDS)
+    limit = page_size(limit, cursor)
+    
     # 방 존재 확인
-    room = db.query(Room).filter(Room.id == room_id, Room.is_active == True).first()
+    room = await db.scalar(select(Room).where(Room.id == room_id, Room.is_active == True))
     if not room:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Room not found"
         )
     
-    participants = db.query(Participant).filter(Participant.room_id == room_id).all()
-    return participants
+    etag = room_etag(room)
+    cached = not_modified(request, etag)
+    if cached:
+        return cached
+    
+    query = select(Participant).where(Participant.room_id == room_id)
+    if cursor:
+        query = query.where(after_cursor(Participant.created_at, Participant.id, cursor))
+    query = query.order_by(Participant.created_at, Participant.id)
+    if limit is not None:
+        query = query.limit(limit + 1)
+    participants = (await db.scalars(query)).all()
+    return render_page(request, participant_list_adapter, participants, limit, selected, etag=etag)
 
 @router.get("/{participant_id}", response_model=ParticipantWithResponses)
-async def get_participant(participant_id: str, db: Session = Depends(get_db)):
+async def get_participant(participant_id: str, db: AsyncSession = Depends(get_db)):
     """참여자 정보 조회 (응답 포함)"""
-    participant = db.query(Participant).filter(Participant.id == participant_id).first()
+    participant = await db.scalar(
+        select(Participant).options(selectinload(Participant.responses)).where(Participant.id == participant_id)
+    )
     if not participant:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Participant not found"
         )
+    await response_history.load(db, participant.responses)
     return participant
 
 @router.delete("/{participant_id}", status_code=status.HTTP_204_NO_CONTENT)
-async def delete_participant(participant_id: str, db: Session = Depends(get_db)):
+async def delete_participant(participant_id: str):
     """참여자 삭제"""
-    participant = db.query(Participant).filter(Participant.id == participant_id).first()
-    if not participant:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Participant not found"
+    async def write(db: AsyncSession) -> None:
+        # 응답까지 함께 삭제되도록 미리 로드 (비동기 세션에서는 지연 로딩 불가)
+        participant = await db.scalar(
+            select(Participant).options(selectinload(Participant.responses)).where(Participant.id == participant_id)
         )
+        if not participant:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Participant not found"
+            )
+        
+        before = await slot_tally.participant_slots(db, participant)
+        await db.delete(participant)
+        aggregate = await slot_tally.apply_participant_change(db, participant, before, deleted=True)
+        version = await bump_room_version(db, participant.room_id)
+        after_commit(db, publish_room_change, participant.room_id, version, "participant_deleted", participant.name, aggregate)
     
-    db.delete(participant)
-    db.commit()
+    await write_queue.submit(write)
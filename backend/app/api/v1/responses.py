@@ -1,119 +1,162 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
-from typing import List
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, status
+from sqlalchemy import select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import defer
+from pydantic import TypeAdapter
+from typing import List, Optional
 from app.database import get_db
 from app.models.response import Response
 from app.models.participant import Participant
 from app.schemas.response import ResponseCreate, ResponseUpdate, ResponseResponse
+from app.services import response_history, slot_tally
+from app.services.response_versions import allocate_version
+from app.services.room_changes import bump_room_version, publish_room_change
+from app.services.write_queue import after_commit, write_queue
+from app.api.pagination import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE, after_cursor, page_size, parse_fields, render_page
 
 router = APIRouter()
 
+response_list_adapter = TypeAdapter(List[ResponseResponse])
+RESPONSE_FIELDS = tuple(ResponseResponse.model_fields)
+
 @router.post("/", response_model=ResponseResponse, status_code=status.HTTP_201_CREATED)
-async def create_response(response_data: ResponseCreate, db: Session = Depends(get_db)):
+async def create_response(response_data: ResponseCreate):
     """새로운 응답 생성"""
-    # 참여자 존재 확인
-    participant = db.query(Participant).filter(Participant.id == response_data.participant_id).first()
-    if not participant:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Participant not found"
+    async def write(db: AsyncSession) -> Response:
+        # 참여자 존재 확인
+        participant = await db.scalar(select(Participant).where(Participant.id == response_data.participant_id))
+        if not participant:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Participant not found"
+            )
+        
+        # 항상 새로운 응답 생성 (기존 응답 업데이트하지 않음)
+        before = await slot_tally.participant_slots(db, participant)
+        response = Response(
+            participant_id=response_data.participant_id,
+            version=await allocate_version(db, participant.id)
         )
+        # 직전 버전 응답에 대한 델타로 저장
+        await response_history.append(db, response, response_data.response_data)
+        db.add(response)
+        aggregate = await slot_tally.apply_participant_change(db, participant, before)
+        version = await bump_room_version(db, participant.room_id)
+        after_commit(db, publish_room_change, participant.room_id, version, "response_created", participant.name, aggregate)
+        return response
     
-    # 기존 응답이 있는지 확인하고 버전 번호 결정
-    existing_responses = db.query(Response).filter(
-        Response.participant_id == response_data.participant_id
-    ).all()
-    
-    # 다음 버전 번호 계산
-    next_version = max([r.version for r in existing_responses], default=0) + 1
-    
-    # 항상 새로운 응답 생성 (기존 응답 업데이트하지 않음)
-    response = Response(
-        participant_id=response_data.participant_id,
-        response_data=response_data.response_data,
-        version=next_version
-    )
-    db.add(response)
-    db.commit()
-    db.refresh(response)
-    return response
+    return await write_queue.submit(write)
 
 @router.get("/participant/{participant_id}", response_model=List[ResponseResponse])
-async def get_responses_by_participant(participant_id: str, db: Session = Depends(get_db)):
-    """참여자의 응답 목록 조회"""
-    participant = db.query(Participant).filter(Participant.id == participant_id).first()
+async def get_responses_by_participant(
+    participant_id: str,
+    request: Request,
+    limit: Optional[int] = Query(None, ge=1, le=MAX_PAGE_SIZE, description=f"페이지 크기 (cursor만 주면 {DEFAULT_PAGE_SIZE}, limit과 cursor를 모두 생략하면 전체 목록)"),
+    cursor: Optional[str] = Query(None, description="이전 페이지의 X-Next-Cursor 값"),
+    fields: Optional[str] = Query(None, description=f"보낼 필드 (쉼표로 구분: {', '.join(RESPONSE_FIELDS)}), response_data를 빼면 목록만 가볍게 조회"),
+    db: AsyncSession = Depends(get_db)
+):
+    """참여자의 응답 목록 조회 (최신순, 커서 페이지네이션)"""
+    selected = parse_fields(fields, RESPONSE_FIELDS)
+    limit = page_size(limit, cursor)
+    
+    participant = await db.scalar(select(Participant).where(Participant.id == participant_id))
     if not participant:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Participant not found"
         )
     
-    responses = db.query(Response).filter(
-        Response.participant_id == participant_id
-    ).order_by(Response.created_at.desc()).all()
+    query = select(Response).where(Response.participant_id == participant_id)
+    if cursor:
+        query = query.where(after_cursor(Response.created_at, Response.id, cursor, descending=True))
+    with_data = selected is None or "response_data" in selected
+    if not with_data:
+        # 응답 데이터 컬럼은 읽지 않음
+        query = query.options(defer(Response._response_data), defer(Response.slot_bitmap))
+    query = query.order_by(Response.created_at.desc(), Response.id.desc())
+    if limit is not None:
+        query = query.limit(limit + 1)
+    responses = (await db.scalars(query)).all()
+    if with_data:
+        await response_history.load(db, responses[:limit])
     
-    return responses
+    return render_page(request, response_list_adapter, responses, limit, selected)
 
 @router.get("/{response_id}", response_model=ResponseResponse)
-async def get_response(response_id: str, db: Session = Depends(get_db)):
+async def get_response(response_id: str, db: AsyncSession = Depends(get_db)):
     """응답 정보 조회"""
-    response = db.query(Response).filter(Response.id == response_id).first()
+    response = await db.scalar(select(Response).where(Response.id == response_id))
     if not response:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Response not found"
         )
     
+    await response_history.load(db, [response])
     return response
 
 @router.put("/{response_id}", response_model=ResponseResponse)
-async def update_response(response_id: str, response_update: ResponseUpdate, db: Session = Depends(get_db)):
+async def update_response(response_id: str, response_update: ResponseUpdate):
     """응답 수정"""
-    response = db.query(Response).filter(Response.id == response_id).first()
-    if not response:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Response not found"
-        )
+    async def write(db: AsyncSession) -> Response:
+        response = await find_response(db, response_id)
+        participant = await db.get(Participant, response.participant_id)
+        before = await slot_tally.participant_slots(db, participant)
+        await response_history.rewrite(db, response, response_update.response_data)
+        response.version = await allocate_version(db, participant.id)
+        aggregate = await slot_tally.apply_participant_change(db, participant, before)
+        version = await bump_room_version(db, participant.room_id)
+        after_commit(db, publish_room_change, participant.room_id, version, "response_updated", participant.name, aggregate)
+        return response
     
-    response.response_data = response_update.response_data
-    response.version += 1
-    db.commit()
-    db.refresh(response)
-    
-    return response
+    return await write_queue.submit(write)
 
 @router.put("/{response_id}/activate", response_model=ResponseResponse)
-async def activate_response(response_id: str, db: Session = Depends(get_db)):
+async def activate_response(response_id: str):
     """특정 응답을 활성화 (해당 참여자의 다른 응답들은 비활성화)"""
-    response = db.query(Response).filter(Response.id == response_id).first()
-    if not response:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Response not found"
+    async def write(db: AsyncSession) -> Response:
+        response = await find_response(db, response_id)
+        participant = await db.get(Participant, response.participant_id)
+        before = await slot_tally.participant_slots(db, participant)
+        
+        # 해당 참여자의 모든 응답을 비활성화
+        await db.execute(
+            update(Response).where(
+                Response.participant_id == response.participant_id
+            ).values(is_active=False)
         )
+        
+        # 선택된 응답만 활성화
+        response.is_active = True
+        await response_history.load(db, [response])
+        aggregate = await slot_tally.apply_participant_change(db, participant, before)
+        version = await bump_room_version(db, participant.room_id)
+        after_commit(db, publish_room_change, participant.room_id, version, "response_activated", participant.name, aggregate)
+        return response
     
-    # 해당 참여자의 모든 응답을 비활성화
-    db.query(Response).filter(
-        Response.participant_id == response.participant_id
-    ).update({"is_active": False})
-    
-    # 선택된 응답만 활성화
-    response.is_active = True
-    db.commit()
-    db.refresh(response)
-    
-    return response
+    return await write_queue.submit(write)
 
 @router.delete("/{response_id}", status_code=status.HTTP_204_NO_CONTENT)
-async def delete_response(response_id: str, db: Session = Depends(get_db)):
+async def delete_response(response_id: str):
     """응답 삭제"""
-    response = db.query(Response).filter(Response.id == response_id).first()
+    async def write(db: AsyncSession) -> None:
+        response = await find_response(db, response_id)
+        participant = await db.get(Participant, response.participant_id)
+        before = await slot_tally.participant_slots(db, participant)
+        await response_history.remove(db, response)
+        aggregate = await slot_tally.apply_participant_change(db, participant, before)
+        version = await bump_room_version(db, participant.room_id)
+        after_commit(db, publish_room_change, participant.room_id, version, "response_deleted", participant.name, aggregate)
+    
+    await write_queue.submit(write)
+
+async def find_response(db: AsyncSession, response_id: str) -> Response:
+    """응답 조회 (없으면 404)"""
+    response = await db.scalar(select(Response).where(Response.id == response_id))
     if not response:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Response not found"
         )
-    
-    db.delete(response)
-    db.commit()
+    return response
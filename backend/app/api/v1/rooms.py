@@ -1,59 +1,72 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
-from typing import List
-from app.database import get_db
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, status
+from fastapi.responses import StreamingResponse
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from pydantic import TypeAdapter
+from typing import List, Optional
+from app.database import SessionLocal, get_db
 from app.models.room import Room
 from app.models.participant import Participant
 from app.models.response import Response
-from app.schemas.room import RoomCreate, RoomUpdate, RoomResponse, RoomWithParticipants
-from app.schemas.response import OptimalTimeSlot
-from app.services.schedule_optimizer import ScheduleOptimizer
+from app.schemas.room import RoomCreate, RoomUpdate, RoomResponse, RoomWithParticipants, RoomBundle
+from app.schemas.response import ImportResult, OptimalTimeSlot, RoomAvailability, SubmissionCreate, SubmissionResult
+from app.services.schedule_optimizer import ScheduleOptimizer, WINDOW_SCORINGS
+from app.services.availability import SLOT_MINUTES
+from app.services import bulk_import, response_history, slot_tally
+from app.services.response_versions import upsert_participant_version
+from app.services.active_responses import load_active_responses
+from app.services.room_changes import bump_room_version, publish_room_change
+from app.services.room_events import format_event, room_events
+from app.services.write_queue import after_commit, write_queue
+from app.services.result_cache import optimal_times_key, result_cache
+from app.api.rendering import dump, json_response, not_modified, render, room_etag, splice
+from app.api.compression import cached_json_response
 import json
 
 router = APIRouter()
 
+room_with_participants_adapter = TypeAdapter(RoomWithParticipants)
+optimal_times_adapter = TypeAdapter(List[OptimalTimeSlot])
+availability_adapter = TypeAdapter(RoomAvailability)
+room_bundle_adapter = TypeAdapter(RoomBundle)
+
+# 이벤트가 없을 때 연결 유지용 주석을 보내는 간격(초)
+EVENTS_KEEPALIVE_SECONDS = 15
+
 @router.post("/", response_model=RoomResponse, status_code=status.HTTP_201_CREATED)
-async def create_room(room_data: RoomCreate, db: Session = Depends(get_db)):
+async def create_room(room_data: RoomCreate):
     """새로운 방 생성"""
-    room_dict = room_data.dict()
+    room_dict = room_data.model_dump()
     settings = room_dict.pop('settings', None)
     
-    room = Room(**room_dict)
-    if settings:
-        room.set_settings(settings)
-    
-    db.add(room)
-    db.commit()
-    db.refresh(room)
-    
-    # 응답 데이터 생성
-    room_data = {
-        "id": room.id,
-        "title": room.title,
-        "description": room.description,
-        "room_type": room.room_type,
-        "creator_name": room.creator_name,
-        "deadline": room.deadline,
-        "settings": room.get_settings(),
-        "created_at": room.created_at,
-        "updated_at": room.updated_at,
-        "is_active": room.is_active
-    }
+    async def write(db: AsyncSession) -> RoomResponse:
+        room = Room(**room_dict)
+        if settings:
+            room.set_settings(settings)
+        
+        db.add(room)
+        await db.flush()
+        return room_response(room)
     
-    return RoomResponse(**room_data)
+    return await write_queue.submit(write)
 
 @router.get("/{room_id}", response_model=RoomWithParticipants)
-async def get_room(room_id: str, db: Session = Depends(get_db)):
-    """방 정보 조회 (참여자 포함)"""
-    room = db.query(Room).filter(Room.id == room_id, Room.is_active == True).first()
+async def get_room(room_id: str, request: Request, db: AsyncSession = Depends(get_db)):
+    """방 정보 조회 (참여자 포함, If-None-Match가 방 ETag와 같으면 304)"""
+    room = await db.scalar(select(Room).where(Room.id == room_id, Room.is_active == True))
     if not room:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Room not found"
         )
     
+    etag = room_etag(room)
+    cached = not_modified(request, etag)
+    if cached:
+        return cached
+    
     # 참여자 정보 가져오기
-    participants = db.query(Participant).filter(Participant.room_id == room_id).all()
+    participants = (await db.scalars(select(Participant).where(Participant.room_id == room_id).order_by(Participant.created_at, Participant.id))).all()
     
     # 응답 데이터 생성
     room_data = {
@@ -77,95 +90,327 @@ async def get_room(room_id: str, db: Session = Depends(get_db)):
         ]
     }
     
-    return RoomWithParticipants(**room_data)
+    return render(room_with_participants_adapter, room_data, etag=etag)
 
 @router.put("/{room_id}", response_model=RoomResponse)
-async def update_room(room_id: str, room_update: RoomUpdate, db: Session = Depends(get_db)):
+async def update_room(room_id: str, room_update: RoomUpdate):
     """방 정보 수정"""
-    room = db.query(Room).filter(Room.id == room_id, Room.is_active == True).first()
+    update_data = room_update.model_dump(exclude_unset=True)
+    settings = update_data.pop('settings', None)
+    
+    async def write(db: AsyncSession) -> RoomResponse:
+        room = await find_room(db, room_id)
+        for field, value in update_data.items():
+            setattr(room, field, value)
+        
+        if settings is not None:
+            room.set_settings(settings)
+        
+        version = await bump_room_version(db, room.id)
+        after_commit(db, publish_room_change, room.id, version, "room_updated")
+        await db.flush()
+        return room_response(room)
+    
+    return await write_queue.submit(write)
+
+@router.delete("/{room_id}", status_code=status.HTTP_204_NO_CONTENT)
+async def delete_room(room_id: str):
+    """방 삭제 (비활성화)"""
+    async def write(db: AsyncSession) -> None:
+        room = await find_room(db, room_id)
+        room.is_active = False
+        version = await bump_room_version(db, room.id)
+        after_commit(db, publish_room_change, room.id, version, "room_deleted")
+    
+    await write_queue.submit(write)
+
+@router.post("/{room_id}/submissions", response_model=SubmissionResult, status_code=status.HTTP_201_CREATED)
+async def submit_response(room_id: str, submission: SubmissionCreate):
+    """이름으로 참여하면서 응답 제출 (참여자 생성/조회 + 새 응답 버전 저장을 한 트랜잭션으로)
+
+    참여자는 (room_id, name) INSERT ... ON CONFLICT로 만들거나 찾고 같은 문장에서 응답 버전을 발급한다.
+    """
+    async def write(db: AsyncSession) -> SubmissionResult:
+        room = await find_room(db, room_id)
+        # 참여자 행(upsert)보다 방을 먼저 잠금 (다른 쓰기와 같은 순서)
+        await slot_tally.lock_room(db, room.id)
+        participant, created = await upsert_participant_version(db, room.id, submission.name)
+        response = Response(participant_id=participant.id, version=participant.response_version)
+        if created:
+            # 새 참여자는 이전 응답이 없으므로 바로 키프레임으로 저장
+            before = None
+            await response_history.encode(db, response, None, submission.response_data)
+        else:
+            before = await slot_tally.participant_slots(db, participant)
+            await response_history.append(db, response, submission.response_data)
+        db.add(response)
+        aggregate = await slot_tally.apply_participant_change(db, participant, before)
+        version = await bump_room_version(db, room.id)
+        after_commit(db, publish_room_change, room.id, version, "response_created", participant.name, aggregate)
+        await db.flush()
+        return SubmissionResult(participant_id=participant.id, response_id=response.id, version=response.version)
+    
+    return await write_queue.submit(write)
+
+@router.post("/{room_id}/import", response_model=ImportResult)
+async def import_responses(
+    room_id: str,
+    request: Request,
+    format: str = Query("jsonl", pattern="^(jsonl|csv)$", description="본문 형식 (jsonl: {\"name\", \"slots\"} 한 줄씩, csv: name,slots 헤더와 ;로 구분한 슬롯)"),
+    db: AsyncSession = Depends(get_db)
+):
+    """응답 일괄 가져오기 (요청 본문을 스트림으로 읽으며 묶음 단위로 저장, 잘못된 행은 건너뛰고 결과에 보고)"""
+    room = await db.scalar(select(Room).where(Room.id == room_id, Room.is_active == True))
     if not room:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Room not found"
         )
     
-    update_data = room_update.dict(exclude_unset=True)
-    settings = update_data.pop('settings', None)
-    
-    for field, value in update_data.items():
-        setattr(room, field, value)
+    return await bulk_import.import_rows(room, bulk_import.split_lines(request.stream()), format)
+
+async def find_room(db: AsyncSession, room_id: str) -> Room:
+    """활성 방 조회 (없으면 404)"""
+    room = await db.scalar(select(Room).where(Room.id == room_id, Room.is_active == True))
+    if not room:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Room not found"
+        )
+    return room
+
+def room_response(room: Room) -> RoomResponse:
+    return RoomResponse(
+        id=room.id,
+        title=room.title,
+        description=room.description,
+        room_type=room.room_type,
+        creator_name=room.creator_name,
+        deadline=room.deadline,
+        settings=room.get_settings(),
+        created_at=room.created_at,
+        updated_at=room.updated_at,
+        is_active=room.is_active
+    )
+
+@router.get("/{room_id}/optimal-times", response_model=List[OptimalTimeSlot])
+async def get_optimal_times(
+    room_id: str,
+    request: Request,
+    duration: Optional[int] = Query(None, ge=SLOT_MINUTES, le=24 * 60, description="회의 길이(분), 시간 기준 방에서 연속 구간으로 계산"),
+    scoring: str = Query("all", description="연속 구간 정렬 방식 (all: 구간 전체 참석 가능 인원, count: 평균 참여 인원)"),
+    limit: Optional[int] = Query(None, ge=1, description="상위 N개만 반환"),
+    min_count: Optional[int] = Query(None, ge=1, description="최소 참여 인원수"),
+    min_rate: Optional[float] = Query(None, ge=0, le=1, description="최소 참여율 (0~1)"),
+    db: AsyncSession = Depends(get_db)
+):
+    """최적 시간대 계산 (If-None-Match가 방 ETag와 같으면 304)"""
+    room = await db.scalar(select(Room).where(Room.id == room_id, Room.is_active == True))
+    if not room:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Room not found"
+        )
     
-    if settings is not None:
-        room.set_settings(settings)
+    if duration is not None:
+        if room.room_type != 1:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="duration is only supported for hourly rooms"
+            )
+        if duration % SLOT_MINUTES:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"duration must be a multiple of {SLOT_MINUTES} minutes"
+            )
+    if scoring not in WINDOW_SCORINGS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"scoring must be one of {', '.join(WINDOW_SCORINGS)}"
+        )
     
-    db.commit()
-    db.refresh(room)
+    etag = room_etag(room)
+    cached = not_modified(request, etag)
+    if cached:
+        return cached
     
-    # 응답 데이터 생성
-    room_data = {
-        "id": room.id,
-        "title": room.title,
-        "description": room.description,
-        "room_type": room.room_type,
-        "creator_name": room.creator_name,
-        "deadline": room.deadline,
-        "settings": room.get_settings(),
-        "created_at": room.created_at,
-        "updated_at": room.updated_at,
-        "is_active": room.is_active
-    }
+    # 결과 캐시에 압축본도 함께 저장 (캐시 적중 시 다시 압축하지 않음)
+    key = optimal_times_key(room.id, room.change_version, duration, scoring, limit, min_count, min_rate)
+    return await cached_json_response(
+        request, room.id, key,
+        lambda: compute_optimal_times(db, room, duration, scoring, limit, min_count, min_rate),
+        etag=etag
+    )
+
+async def compute_optimal_times(
+    db: AsyncSession,
+    room: Room,
+    duration: Optional[int] = None,
+    scoring: str = "all",
+    limit: Optional[int] = None,
+    min_count: Optional[int] = None,
+    min_rate: Optional[float] = None
+) -> bytes:
+    """최적 시간대 결과 JSON 바이트 (캐시 없이 계산)"""
+    # 방별 슬롯 집계 조회 (활성화된 응답만 반영됨)
+    participant_names, slot_members, respondent_count = await slot_tally.load_room_slots(db, room)
     
-    return RoomResponse(**room_data)
+    # 일정 최적화 알고리즘 실행 (큰 방은 워커 풀에서 실행)
+    optimizer = ScheduleOptimizer(room.room_type)
+    optimal_times = await optimizer.find_optimal_times_from_tally(
+        participant_names,
+        slot_members,
+        respondent_count,
+        room.get_settings(),
+        duration=duration,
+        scoring=scoring,
+        limit=limit,
+        min_count=min_count,
+        min_rate=min_rate
+    )
+    return dump(optimal_times_adapter, optimal_times)
 
-@router.delete("/{room_id}", status_code=status.HTTP_204_NO_CONTENT)
-async def delete_room(room_id: str, db: Session = Depends(get_db)):
-    """방 삭제 (비활성화)"""
-    room = db.query(Room).filter(Room.id == room_id, Room.is_active == True).first()
+async def optimal_times_json(db: AsyncSession, room: Room) -> bytes:
+    """기본 옵션의 최적 시간대 결과 JSON 바이트 (optimal-times와 같은 결과 캐시 항목 사용)"""
+    key = optimal_times_key(room.id, room.change_version, None, "all", None, None, None)
+    return await result_cache.get_or_compute(room.id, key, lambda: compute_optimal_times(db, room))
+
+@router.get("/{room_id}/availability", response_model=RoomAvailability)
+async def get_availability(room_id: str, request: Request, db: AsyncSession = Depends(get_db)):
+    """날짜 -> 시간/블럭 단위로 묶은 참여 가능 현황 (결과 페이지용 서버 집계, If-None-Match가 방 ETag와 같으면 304)"""
+    room = await db.scalar(select(Room).where(Room.id == room_id, Room.is_active == True))
     if not room:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Room not found"
         )
     
-    room.is_active = False
-    db.commit()
+    etag = room_etag(room)
+    cached = not_modified(request, etag)
+    if cached:
+        return cached
+    
+    optimizer = ScheduleOptimizer(room.room_type)
+    participant_names, slot_members, respondent_count = await slot_tally.load_room_slots(db, room)
+    
+    return render(availability_adapter, {
+        "room_id": room.id,
+        "room_type": room.room_type,
+        "respondent_count": respondent_count,
+        "dates": optimizer.group_by_date(participant_names, slot_members, respondent_count, room.get_settings())
+    }, etag=etag)
 
-@router.get("/{room_id}/optimal-times", response_model=List[OptimalTimeSlot])
-async def get_optimal_times(room_id: str, db: Session = Depends(get_db)):
-    """최적 시간대 계산"""
-    room = db.query(Room).filter(Room.id == room_id, Room.is_active == True).first()
+@router.get("/{room_id}/bundle", response_model=RoomBundle)
+async def get_room_bundle(
+    room_id: str,
+    request: Request,
+    history: str = Query("active", pattern=r"^(active|all|\d+)$", description="참여자별 응답 범위 (active: 활성 응답만, all: 전체 버전, N: 활성 응답 + 최근 N개 버전)"),
+    db: AsyncSession = Depends(get_db)
+):
+    """결과 페이지용 방 묶음 조회 (방, 참여자와 응답, 최적 시간대를 한 번에, If-None-Match가 방 ETag와 같으면 304)
+
+    참여자/응답은 방 단위 쿼리로 한꺼번에 가져오고, 델타로 저장된 응답은 재귀 쿼리 한 번으로 복원한다.
+    최적 시간대는 기본 옵션의 optimal-times와 같은 캐시 항목을 쓴다.
+    """
+    room = await db.scalar(select(Room).where(Room.id == room_id, Room.is_active == True))
     if not room:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Room not found"
         )
     
-    # 참여자들의 응답 데이터 수집 (활성화된 응답만)
-    participants = db.query(Participant).filter(Participant.room_id == room_id).all()
-    responses_data = []
+    etag = room_etag(room)
+    cached = not_modified(request, etag)
+    if cached:
+        return cached
     
-    for participant in participants:
-        # 활성화된 최신 응답만 가져오기
-        active_response = db.query(Response).filter(
-            Response.participant_id == participant.id,
-            Response.is_active == True
-        ).order_by(Response.created_at.desc()).first()
-        
-        if active_response:
-            try:
-                # Response 모델의 response_data 프로퍼티는 이미 파싱된 객체를 반환
-                response_data = active_response.response_data
-                responses_data.append({
-                    'participant_name': participant.name,
-                    'response_data': response_data
-                })
-                print(f"Participant {participant.name} active response: {response_data}")  # 디버깅용
-            except Exception as e:
-                print(f"응답 데이터 처리 오류: {e}")
-                continue
-    
-    # 일정 최적화 알고리즘 실행
-    optimizer = ScheduleOptimizer(room.room_type)
-    optimal_times = await optimizer.find_optimal_times(responses_data, room.get_settings())
+    participants = (await db.scalars(select(Participant).where(Participant.room_id == room_id).order_by(Participant.created_at, Participant.id))).all()
+    
+    # 참여자별 활성 응답과 (요청 시) 이전 버전들을 방 단위 쿼리로 조회
+    active = await load_active_responses(db, room_id)
+    responses = {response.id: response for _, response in active}
+    if history != "active":
+        query = select(Response).join(Participant).where(Participant.room_id == room_id)
+        if history != "all":
+            # 참여자별 최신 N개 버전
+            rank = func.row_number().over(
+                partition_by=Response.participant_id, order_by=Response.version.desc()
+            ).label("rank")
+            ranked = query.add_columns(rank).subquery()
+            query = select(Response).join(ranked, Response.id == ranked.c.id).where(ranked.c.rank <= int(history))
+        for response in await db.scalars(query):
+            responses.setdefault(response.id, response)
+        await response_history.load(db, responses.values())
     
-    return optimal_times
+    by_participant = {}
+    for response in sorted(responses.values(), key=lambda response: response.version, reverse=True):
+        by_participant.setdefault(response.participant_id, []).append(response)
+    
+    bundle = {
+        "room": {
+            "id": room.id,
+            "title": room.title,
+            "description": room.description,
+            "room_type": room.room_type,
+            "creator_name": room.creator_name,
+            "deadline": room.deadline,
+            "settings": room.get_settings(),
+            "created_at": room.created_at,
+            "updated_at": room.updated_at,
+            "is_active": room.is_active
+        },
+        "participants": [
+            {
+                "id": p.id,
+                "room_id": p.room_id,
+                "name": p.name,
+                "created_at": p.created_at,
+                "responses": by_participant.get(p.id, [])
+            } for p in participants
+        ],
+        "respondent_count": len(active)
+    }
+    content = splice(dump(room_bundle_adapter, bundle), "optimal_times", await optimal_times_json(db, room))
+    return json_response(content, etag=etag)
+
+@router.get("/{room_id}/events")
+async def stream_room_events(room_id: str, request: Request):
+    """방 변경 이벤트 스트림 (Server-Sent Events)
+
+    연결하면 현재 변경 버전을 담은 hello 이벤트를 먼저 보내고, 이후 응답/참여자/방 변경마다
+    change 이벤트(바뀐 슬롯의 새 인원수, resync 여부)를 보낸다.
+    스트림 동안 DB 세션을 잡고 있지 않도록 방 확인에만 세션을 열고 바로 닫는다.
+    """
+    async with SessionLocal() as db:
+        room = await db.scalar(select(Room).where(Room.id == room_id, Room.is_active == True))
+        if not room:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Room not found"
+            )
+        # 구독한 뒤에 버전을 다시 읽어야 방 조회와 구독 사이에 커밋된 변경을 놓치지 않는다
+        # (그 사이의 change 이벤트가 큐에 함께 들어올 수 있으므로 클라이언트는 hello 버전 이하의 이벤트를 무시)
+        subscription = room_events.subscribe(room_id)
+        try:
+            version = await db.scalar(select(Room.change_version).where(Room.id == room_id))
+        except BaseException:
+            room_events.unsubscribe(subscription)
+            raise
+
+    async def stream():
+        try:
+            yield format_event("hello", {"version": version}, event_id=version)
+            while not await request.is_disconnected():
+                frame = await subscription.next(EVENTS_KEEPALIVE_SECONDS)
+                if frame is None:
+                    # 따라오지 못해 끊긴 구독자 (클라이언트가 다시 연결하며 전체를 새로 받음)
+                    break
+                yield frame or ": keepalive\n\n"
+        finally:
+            room_events.unsubscribe(subscription)
+
+    return StreamingResponse(
+        stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
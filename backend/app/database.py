@@ -1,23 +1,109 @@
-from sqlalchemy import create_engine
+from typing import Any, Awaitable, Dict, TypeVar
+from sqlalchemy import event
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker, AsyncSession
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker
+from app import json_codec
 import os
 
 # 로컬 개발용 SQLite 데이터베이스 사용
 DATABASE_URL = os.getenv("DATABASE_URL", "sqlite:///./data/yakjeong.db")
 
-engine = create_engine(
-    DATABASE_URL,
-    connect_args={"check_same_thread": False} if "sqlite" in DATABASE_URL else {}
-)
+# 비동기 드라이버 매핑 (드라이버를 직접 지정한 URL은 그대로 사용)
+ASYNC_DRIVERS = {
+    "sqlite": "sqlite+aiosqlite",
+    "postgresql": "postgresql+asyncpg",
+    "postgres": "postgresql+asyncpg",
+}
 
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+def to_async_url(url: str) -> str:
+    """sqlite:///..., postgresql://... 형태의 URL을 비동기 드라이버 URL로 변환"""
+    scheme, sep, rest = url.partition("://")
+    return f"{ASYNC_DRIVERS.get(scheme, scheme)}{sep}{rest}"
+
+# SQLite 성능 프로필 (production 기본 | off: 드라이버 기본값 그대로, 요청마다 새 연결)
+SQLITE_PROFILE = os.getenv("SQLITE_PROFILE", "production")
+
+def json_text(value: Any) -> str:
+    """JSONB 컬럼 값 직렬화 (모델이 이미 JSON 문자열로 만든 값은 그대로)"""
+    return value if isinstance(value, str) else json_codec.dumps(value)
+
+def json_text_result(value: str) -> str:
+    """JSONB 컬럼 값을 파싱하지 않고 JSON 문자열 그대로 돌려줌 (파싱과 캐시는 모델이 담당)"""
+    return value
+
+def env_flag(name: str, default: bool) -> bool:
+    value = os.getenv(name)
+    return default if value is None else value.lower() in ("1", "true", "yes", "on")
+
+def engine_options(url: str) -> Dict[str, Any]:
+    if "sqlite" not in url:
+        # PostgreSQL 등 서버 데이터베이스: 연결 풀 설정 (끊긴 연결은 pre-ping으로 걸러냄)
+        return {
+            "pool_size": int(os.getenv("DB_POOL_SIZE", "10")),
+            "max_overflow": int(os.getenv("DB_MAX_OVERFLOW", "20")),
+            "pool_timeout": float(os.getenv("DB_POOL_TIMEOUT", "30")),
+            "pool_recycle": int(os.getenv("DB_POOL_RECYCLE", "1800")),
+            "pool_pre_ping": env_flag("DB_POOL_PRE_PING", True),
+            "json_serializer": json_text,
+            "json_deserializer": json_text_result,
+        }
+    options: Dict[str, Any] = {"connect_args": {"check_same_thread": False}}
+    if SQLITE_PROFILE != "off" and ":memory:" not in url:
+        # 파일 데이터베이스는 연결을 재사용해 연결/PRAGMA 비용을 요청마다 치르지 않음 (aiosqlite 기본은 NullPool)
+        options["poolclass"] = AsyncAdaptedQueuePool
+        options["pool_size"] = int(os.getenv("SQLITE_POOL_SIZE", "5"))
+    return options
+
+engine = create_async_engine(to_async_url(DATABASE_URL), **engine_options(DATABASE_URL))
+
+# SQLite 연결마다 적용할 PRAGMA
+# - WAL + synchronous=NORMAL: 읽기가 쓰기를 막지 않고, 커밋마다 fsync하지 않음 (체크포인트 때만)
+# - busy_timeout: 다른 연결이 쓰는 중이면 바로 "database is locked"로 실패하지 않고 기다림
+SQLITE_PRAGMAS: Dict[str, str] = {
+    "journal_mode": os.getenv("SQLITE_JOURNAL_MODE", "WAL"),
+    "synchronous": os.getenv("SQLITE_SYNCHRONOUS", "NORMAL"),
+    "busy_timeout": os.getenv("SQLITE_BUSY_TIMEOUT", "5000"),  # 밀리초
+    "mmap_size": os.getenv("SQLITE_MMAP_SIZE", str(256 * 1024 * 1024)),  # 바이트
+    "cache_size": os.getenv("SQLITE_CACHE_SIZE", "-65536"),  # 음수면 KiB 단위 (64MB)
+    "temp_store": os.getenv("SQLITE_TEMP_STORE", "MEMORY"),
+    "foreign_keys": os.getenv("SQLITE_FOREIGN_KEYS", "ON"),
+}
+
+def apply_sqlite_pragmas(dbapi_connection, connection_record) -> None:
+    """새 SQLite 연결에 PRAGMA 프로필 적용 (값이 빈 항목은 건너뜀)"""
+    cursor = dbapi_connection.cursor()
+    try:
+        for name, value in SQLITE_PRAGMAS.items():
+            if value:
+                cursor.execute(f"PRAGMA {name}={value}")
+    finally:
+        cursor.close()
+
+if engine.dialect.name == "sqlite" and SQLITE_PROFILE != "off":
+    event.listen(engine.sync_engine, "connect", apply_sqlite_pragmas)
+
+SessionLocal = async_sessionmaker(engine, class_=AsyncSession, autoflush=False, expire_on_commit=False)
 
 Base = declarative_base()
 
-def get_db():
-    db = SessionLocal()
+async def init_db():
+    """테이블 생성 및 기존 데이터베이스에 누락된 인덱스 추가"""
+    from app.migrations import upgrade
+
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+        await conn.run_sync(upgrade)
+
+T = TypeVar("T")
+
+async def disposing(main: Awaitable[T]) -> T:
+    """CLI용: 작업이 끝나면 연결 풀을 닫음 (풀에 남은 aiosqlite 연결 스레드가 있으면 프로세스가 끝나지 않음)"""
     try:
-        yield db
+        return await main
     finally:
-        db.close()
+        await engine.dispose()
+
+async def get_db():
+    async with SessionLocal() as db:
+        yield db
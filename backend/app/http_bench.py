@@ -0,0 +1,233 @@
+"""HTTP 처리량 벤치마크 (방 조회와 응답 생성을 섞은 동시 요청의 처리량/지연 시간)
+
+시간 기준 방에 참여자를 채운 뒤, 동시에 concurrency개씩 방 조회(GET /rooms/{id})와
+응답 생성(POST /responses/)을 섞어 보내고 처리량, 종류별 지연 시간 분포, 실패 수를 출력한다.
+--url을 주지 않으면 앱을 같은 프로세스에서 ASGI로 호출한다. (httpx 패키지 필요, requirements-dev.txt)
+
+--baseline REV를 주면 이전 리비전(예: 비동기 세션으로 바꾸기 전 커밋)과 현재 트리를 각각 빈 SQLite 데이터베이스로
+uvicorn 워커 한 개에 띄워 같은 요청을 보내고 두 결과를 함께 출력한다. (이전 리비전은 git archive로 임시 디렉터리에 풀어 실행)
+참여자는 두 리비전 모두에 있는 참여자 생성 + 응답 생성 요청으로 채운다.
+
+    python -m app.http_bench [--requests 400] [--concurrency 50] [--participants 70] [--write-ratio 0.5]
+    python -m app.http_bench --url http://localhost:8000   # 실행 중인 서버 (uvicorn app.main:app --workers N)
+    python -m app.http_bench --baseline 3cefb2d            # 동기 Session 시절 리비전과 비교
+"""
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Optional
+from collections import Counter
+import os
+import random
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+
+DATES = [f"2025-03-{day:02d}" for day in range(1, 15)]
+TIMES = [f"{minutes // 60:02d}:{minutes % 60:02d}" for minutes in range(9 * 60, 18 * 60, 30)]
+SLOTS = [f"{date}|{time}" for date in DATES for time in TIMES]
+
+
+async def open_client(url: Optional[str], timeout: float = 60):
+    """벤치마크 클라이언트 (url이 없으면 테이블을 만들고 앱을 ASGI로 직접 호출)"""
+    import httpx
+
+    if url:
+        return httpx.AsyncClient(base_url=url, timeout=timeout)
+    from app.database import init_db
+    from app.main import app
+
+    await init_db()
+    return httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://bench", timeout=timeout)
+
+
+async def close_client(client) -> None:
+    from app.database import engine
+    from app.services.write_queue import write_queue
+
+    await client.aclose()
+    await write_queue.close()
+    await engine.dispose()
+
+
+async def create_room(client, title: str) -> str:
+    response = await client.post("/api/v1/rooms/", json={
+        "title": title,
+        "room_type": 1,
+        "creator_name": "bench",
+        "settings": {"time_slots_by_date": {date: TIMES for date in DATES}},
+    })
+    response.raise_for_status()
+    return response.json()["id"]
+
+
+def random_slots(rng: random.Random) -> Dict[str, Any]:
+    return {"available_time_slots": rng.sample(SLOTS, rng.randint(5, 60))}
+
+
+def percentile(values: List[float], q: float) -> float:
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * q))] if values else 0.0
+
+
+async def bench(url: Optional[str], requests: int, concurrency: int, participants: int, write_ratio: float, seed: int = 0,
+                timeout: float = 60) -> Dict[str, Any]:
+    import asyncio
+
+    rng = random.Random(seed)
+    client = await open_client(url, timeout)
+    try:
+        room_id = await create_room(client, "http bench")
+        participant_ids = []
+        for index in range(participants):
+            # 이전 리비전과 비교할 수 있도록 양쪽에 있는 참여자 생성 + 응답 생성으로 채움
+            participant = await client.post("/api/v1/participants/", json={"room_id": room_id, "name": f"참여자{index}"})
+            participant.raise_for_status()
+            participant_ids.append(participant.json()["id"])
+            response = await client.post("/api/v1/responses/", json={"participant_id": participant_ids[-1], "response_data": random_slots(rng)})
+            response.raise_for_status()
+
+        semaphore = asyncio.Semaphore(concurrency)
+        latencies: Dict[str, List[float]] = {"read": [], "write": []}
+        errors: Counter = Counter()
+
+        async def request() -> None:
+            kind = "write" if rng.random() < write_ratio else "read"
+            payload = {"participant_id": rng.choice(participant_ids), "response_data": random_slots(rng)}
+            async with semaphore:
+                started = time.perf_counter()
+                try:
+                    if kind == "write":
+                        response = await client.post("/api/v1/responses/", json=payload)
+                    else:
+                        response = await client.get(f"/api/v1/rooms/{room_id}")
+                    response.raise_for_status()
+                except Exception as e:
+                    errors[f"{kind} {type(e).__name__}: {str(e).splitlines()[0][:80] if str(e) else ''}"] += 1
+                    return
+                latencies[kind].append(time.perf_counter() - started)
+
+        started = time.perf_counter()
+        await asyncio.gather(*(request() for _ in range(requests)))
+        elapsed = time.perf_counter() - started
+    finally:
+        await close_client(client)
+
+    completed = sum(len(values) for values in latencies.values())
+    return {
+        "elapsed": elapsed,
+        "throughput": completed / elapsed,
+        "errors": errors,
+        **{
+            kind: {"count": len(values), "p50": percentile(values, 0.5), "p95": percentile(values, 0.95), "p99": percentile(values, 0.99)}
+            for kind, values in latencies.items()
+        },
+    }
+
+
+@contextmanager
+def export_revision(revision: str) -> Iterator[str]:
+    """리비전의 backend 디렉터리를 임시 디렉터리에 풀어 경로 반환 (작업 트리는 건드리지 않음)"""
+    root = subprocess.run(["git", "rev-parse", "--show-toplevel"], capture_output=True, text=True, check=True).stdout.strip()
+    with tempfile.TemporaryDirectory() as directory:
+        archive = subprocess.run(["git", "-C", root, "archive", revision, "backend"], capture_output=True, check=True).stdout
+        subprocess.run(["tar", "-x", "-C", directory], input=archive, check=True)
+        yield os.path.join(directory, "backend")
+
+
+@contextmanager
+def serve(backend_dir: str, database_path: str) -> Iterator[str]:
+    """backend_dir의 앱을 uvicorn 워커 한 개로 띄우고 주소 반환 (끝나면 종료)"""
+    import httpx
+
+    with socket.socket() as probe:
+        probe.bind(("127.0.0.1", 0))
+        port = probe.getsockname()[1]
+    url = f"http://127.0.0.1:{port}"
+    env = dict(os.environ, DATABASE_URL=f"sqlite:///{database_path}", PYTHONPATH=backend_dir)
+    process = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app.main:app", "--port", str(port), "--log-level", "warning"],
+        cwd=backend_dir, env=env
+    )
+    try:
+        deadline = time.monotonic() + 30
+        while True:
+            try:
+                httpx.get(f"{url}/health", timeout=1).raise_for_status()
+                break
+            except httpx.HTTPError:
+                if process.poll() is not None or time.monotonic() > deadline:
+                    raise RuntimeError(f"server in {backend_dir} did not start")
+                time.sleep(0.2)
+        yield url
+    finally:
+        process.terminate()
+        try:
+            process.wait(10)
+        except subprocess.TimeoutExpired:
+            # 요청 처리가 멈춘 서버는 정상 종료를 기다리지 않음
+            process.kill()
+            process.wait()
+
+
+def report(label: str, requests: int, concurrency: int, result: Dict[str, Any]) -> None:
+    print(f"{label}{requests} requests, {concurrency} in flight: {result['elapsed']:.2f}s, "
+          f"{result['throughput']:.0f} req/s, {sum(result['errors'].values())} failed")
+    for kind in ("read", "write"):
+        stats = result[kind]
+        print(
+            f"  {kind:5s} {stats['count']:5d} ok, "
+            f"p50 {stats['p50'] * 1000:.1f} ms, p95 {stats['p95'] * 1000:.1f} ms, p99 {stats['p99'] * 1000:.1f} ms"
+        )
+    for error, count in result["errors"].most_common():
+        print(f"  - {count} × {error}")
+
+
+def compare(baseline: str, requests: int, concurrency: int, participants: int, write_ratio: float,
+            timeout: float = 60) -> Dict[str, Dict[str, Any]]:
+    """이전 리비전과 현재 트리를 같은 조건의 서버로 띄워 차례로 측정"""
+    import asyncio
+
+    current_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    results = {}
+    with tempfile.TemporaryDirectory() as directory, export_revision(baseline) as baseline_dir:
+        for label, backend_dir in ((baseline, baseline_dir), ("current", current_dir)):
+            with serve(backend_dir, os.path.join(directory, f"{label}.db")) as url:
+                results[label] = asyncio.run(bench(url, requests, concurrency, participants, write_ratio, timeout=timeout))
+    return results
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    import argparse
+    import asyncio
+
+    parser = argparse.ArgumentParser(prog="python -m app.http_bench", description="HTTP 처리량 벤치마크")
+    parser.add_argument("--requests", type=int, default=400, help="측정할 요청 수")
+    parser.add_argument("--concurrency", type=int, default=50, help="동시 요청 수")
+    parser.add_argument("--participants", type=int, default=70, help="미리 채울 참여자 수")
+    parser.add_argument("--write-ratio", type=float, default=0.5, help="요청 중 응답 생성 비율")
+    parser.add_argument("--timeout", type=float, default=60, help="요청 하나의 제한 시간(초), 넘으면 실패로 셈")
+    parser.add_argument("--url", help="실행 중인 서버 주소 (생략하면 임시 SQLite 데이터베이스로 앱을 직접 호출)")
+    parser.add_argument("--baseline", metavar="REV", help="이 git 리비전과 현재 트리를 각각 uvicorn으로 띄워 비교")
+    args = parser.parse_args(argv)
+
+    if args.baseline:
+        results = compare(args.baseline, args.requests, args.concurrency, args.participants, args.write_ratio, args.timeout)
+        for label, result in results.items():
+            report(f"{label}: ", args.requests, args.concurrency, result)
+        baseline, current = results.values()
+        print(f"throughput: {current['throughput'] / baseline['throughput']:.2f}x {args.baseline}")
+        return 1 if any(result["errors"] for result in results.values()) else 0
+
+    with tempfile.TemporaryDirectory() as directory:
+        if not args.url:
+            # app.database가 가져올 때 DATABASE_URL을 읽으므로 앱을 가져오기 전에 정함
+            os.environ.setdefault("DATABASE_URL", f"sqlite:///{os.path.join(directory, 'bench.db')}")
+        result = asyncio.run(bench(args.url, args.requests, args.concurrency, args.participants, args.write_ratio, timeout=args.timeout))
+
+    report("", args.requests, args.concurrency, result)
+    return 1 if result["errors"] else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,39 @@
+"""JSON 인코딩/디코딩 (orjson이 설치되어 있으면 사용하고, 없으면 표준 json 모듈 사용)
+
+dumps()는 한글을 이스케이프하지 않은 문자열을 반환한다. (json.dumps(..., ensure_ascii=False)와 같은 내용)
+dumps_bytes()는 HTTP 응답 본문용 UTF-8 바이트를 반환한다.
+"""
+from typing import Any, Union
+import json
+
+try:
+    import orjson
+except ImportError:  # 선택 의존성
+    orjson = None
+
+
+def loads(data: Union[str, bytes]) -> Any:
+    """JSON 문자열을 파이썬 객체로 변환 (형식 오류는 json.JSONDecodeError)"""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def dumps(value: Any) -> str:
+    """파이썬 객체를 JSON 문자열로 변환 (orjson이 지원하지 않는 값은 표준 json으로)"""
+    if orjson is not None:
+        try:
+            return orjson.dumps(value).decode()
+        except TypeError:
+            pass
+    return json.dumps(value, ensure_ascii=False)
+
+
+def dumps_bytes(value: Any) -> bytes:
+    """파이썬 객체를 UTF-8 JSON 바이트로 변환 (NaN/Infinity는 허용하지 않음)"""
+    if orjson is not None:
+        try:
+            return orjson.dumps(value)
+        except TypeError:
+            pass
+    return json.dumps(value, ensure_ascii=False, allow_nan=False, separators=(",", ":")).encode()
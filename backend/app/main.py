@@ -1,22 +1,38 @@
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
 # 데이터베이스 및 모델 import
-from app.database import engine, Base
+from app.database import engine, init_db
+from app.services.worker_pool import shutdown_executor
+from app.api.rendering import FastJSONResponse
+from app.api.compression import CompressionMiddleware
+from app.services.result_cache import result_cache
+from app.services.room_events import room_events
+from app.services.write_queue import write_queue
 
 # 모델들을 먼저 import (테이블 생성을 위해)
-from app.models import room, participant, response
+from app.models import room, participant, response, slot_tally, slot_universe
 
 # API 라우터 import
 from app.api.v1 import rooms, participants, responses
 
-# 데이터베이스 테이블 생성
-Base.metadata.create_all(bind=engine)
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # 데이터베이스 테이블 생성
+    await init_db()
+    yield
+    # 큐에 남은 쓰기를 커밋한 뒤 종료
+    await write_queue.close()
+    shutdown_executor()
+    await engine.dispose()
 
 app = FastAPI(
     title="YakJeong API",
     description="약속 결정 서비스 API",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan,
+    default_response_class=FastJSONResponse
 )
 
 # CORS 설정 - 개발 환경용
@@ -27,8 +43,12 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["ETag", "X-Next-Cursor", "Link"],
 )
 
+# 응답 압축 (Accept-Encoding 협상, 작은 본문과 스트리밍 응답은 제외)
+app.add_middleware(CompressionMiddleware)
+
 # API 라우터 등록
 app.include_router(rooms.router, prefix="/api/v1/rooms", tags=["rooms"])
 app.include_router(participants.router, prefix="/api/v1/participants", tags=["participants"])
@@ -41,3 +61,18 @@ async def root():
 @app.get("/health")
 async def health_check():
     return {"status": "healthy"}
+
+@app.get("/stats/cache")
+async def cache_stats():
+    """최적 시간대 결과 캐시 적중/실패/제거 횟수"""
+    return result_cache.stats()
+
+@app.get("/stats/events")
+async def event_stats():
+    """방 이벤트 구독자 수, 전송/끊김 횟수"""
+    return room_events.stats()
+
+@app.get("/stats/writes")
+async def write_stats():
+    """쓰기 큐 묶음 커밋 횟수, 커밋/실패한 작업 수, 대기 중인 작업 수"""
+    return write_queue.stats()
@@ -0,0 +1,332 @@
+"""기존 데이터베이스 스키마 업그레이드와 주요 조회 쿼리의 실행 계획 검사
+
+create_all()은 이미 있는 테이블에 새로 선언된 컬럼/인덱스를 추가하지 않으므로
+앱 시작 시(init_db) 모델에 선언되었지만 데이터베이스에 없는 컬럼과 인덱스를 만든다.
+
+PostgreSQL에서는 이전에 TEXT로 만든 JSON 컬럼을 JSONB로 바꾸고 PostgreSQL 전용(GIN) 인덱스를 만든다.
+
+    python -m app.migrations upgrade   # 누락된 컬럼/인덱스 생성
+    python -m app.migrations explain   # 주요 쿼리가 인덱스를 사용하는지 검사 (SQLite, PostgreSQL)
+
+라우트가 실제로 실행하는 쿼리의 실행 계획은 backend/tests/test_query_plans.py에서 검사한다.
+"""
+from typing import Any, List, Optional, Tuple
+from sqlalchemy import delete, func, inspect, select, update
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.engine import Connection
+from sqlalchemy.exc import IntegrityError
+from app.database import Base, disposing
+from app.models import Participant, Response, Room, RoomSlotMember, RoomSlotTally, RoomTally
+import logging
+import re
+
+logger = logging.getLogger(__name__)
+
+
+def find_duplicate_participants(conn: Connection) -> List[Tuple[str, str, int]]:
+    """같은 방에 같은 이름으로 등록된 참여자 목록 [(room_id, name, 개수)]"""
+    return conn.execute(
+        select(Participant.room_id, Participant.name, func.count())
+        .group_by(Participant.room_id, Participant.name)
+        .having(func.count() > 1)
+    ).all()
+
+
+def merge_duplicate_participants(conn: Connection) -> int:
+    """같은 방의 같은 이름 참여자를 가장 먼저 참여한 한 명으로 합치고 합쳐서 없앤 참여자 수 반환
+
+    나머지 참여자의 응답은 남기는 참여자로 옮기고, 합친 응답 전체의 버전을 생성 순서대로 1부터 다시 매긴다.
+    (델타의 parent_id는 응답 ID라 그대로 유효하며, 활성 응답은 기존처럼 가장 최근에 만든 활성 응답)
+    합친 방의 슬롯 집계는 지워서 다음 조회 때 다시 만들고 변경 버전을 올린다.
+    """
+    merged = 0
+    rooms = set()
+    for room_id, name, _ in find_duplicate_participants(conn):
+        participant_ids = conn.scalars(
+            select(Participant.id)
+            .where(Participant.room_id == room_id, Participant.name == name)
+            .order_by(Participant.created_at, Participant.id)
+        ).all()
+        keeper, others = participant_ids[0], participant_ids[1:]
+        response_ids = conn.scalars(
+            select(Response.id)
+            .where(Response.participant_id.in_(participant_ids))
+            .order_by(Response.created_at, Response.id)
+        ).all()
+        # (participant_id, version) 유니크 인덱스와 겹치지 않도록 음수를 거쳐 다시 매김
+        for position, response_id in enumerate(response_ids, start=1):
+            conn.execute(update(Response).where(Response.id == response_id).values(participant_id=keeper, version=-position))
+        conn.execute(update(Response).where(Response.participant_id == keeper).values(version=-Response.version))
+        conn.execute(update(Participant).where(Participant.id == keeper).values(response_version=len(response_ids)))
+        conn.execute(delete(Participant).where(Participant.id.in_(others)))
+        merged += len(others)
+        rooms.add(room_id)
+
+    for room_id in rooms:
+        conn.execute(delete(RoomSlotMember).where(RoomSlotMember.room_id == room_id))
+        conn.execute(delete(RoomSlotTally).where(RoomSlotTally.room_id == room_id))
+        conn.execute(delete(RoomTally).where(RoomTally.room_id == room_id))
+        conn.execute(update(Room).where(Room.id == room_id).values(change_version=Room.change_version + 1, updated_at=Room.updated_at))
+    return merged
+
+
+def backfill_response_versions(conn: Connection) -> None:
+    """참여자별 응답 버전 카운터를 기존 응답의 최대 버전으로 채움"""
+    conn.execute(
+        update(Participant).values(
+            response_version=select(func.coalesce(func.max(Response.version), 0))
+            .where(Response.participant_id == Participant.id)
+            .scalar_subquery()
+        )
+    )
+
+
+# 컬럼을 새로 추가한 뒤 기존 행을 채우는 함수
+BACKFILLS = {
+    ("participants", "response_version"): backfill_response_versions,
+}
+
+
+def add_missing_columns(conn: Connection, table) -> None:
+    """모델에 선언되었지만 테이블에 없는 컬럼 추가 (NOT NULL 컬럼은 server_default가 있어야 함)"""
+    existing_columns = {column["name"] for column in inspect(conn).get_columns(table.name)}
+    preparer = conn.dialect.identifier_preparer
+
+    for column in table.columns:
+        if column.name in existing_columns:
+            continue
+        ddl = f"ALTER TABLE {preparer.format_table(table)} ADD COLUMN {preparer.format_column(column)} {column.type.compile(conn.dialect)}"
+        if column.server_default is not None:
+            ddl += f" DEFAULT {column.server_default.arg}"
+        if not column.nullable:
+            ddl += " NOT NULL"
+        conn.exec_driver_sql(ddl)
+        logger.info("%s.%s 컬럼 추가", table.name, column.name)
+
+        backfill = BACKFILLS.get((table.name, column.name))
+        if backfill:
+            backfill(conn)
+
+
+def convert_json_columns(conn: Connection, table) -> None:
+    """PostgreSQL: 모델에서 JSONB인 컬럼이 TEXT로 남아 있으면 JSONB로 변환"""
+    if conn.dialect.name != "postgresql":
+        return
+    existing_types = {column["name"]: column["type"] for column in inspect(conn).get_columns(table.name)}
+    preparer = conn.dialect.identifier_preparer
+
+    for column in table.columns:
+        existing_type = existing_types.get(column.name)
+        if existing_type is None or isinstance(existing_type, JSONB) or column.type.compile(conn.dialect) != "JSONB":
+            continue
+        name = preparer.format_column(column)
+        conn.exec_driver_sql(f"ALTER TABLE {preparer.format_table(table)} ALTER COLUMN {name} TYPE JSONB USING {name}::jsonb")
+        logger.info("%s.%s 컬럼을 JSONB로 변환", table.name, column.name)
+
+
+# 더 이상 모델에 없는 인덱스 (쓰기마다 갱신 비용만 드므로 기존 데이터베이스에서 지움)
+OBSOLETE_INDEXES = {
+    # 방은 항상 기본 키로 조회하므로 활성 방 부분 인덱스를 쓰는 쿼리가 없음
+    "rooms": ["ix_rooms_active_id"],
+}
+
+
+# 더 이상 모델에 없는 컬럼 (NOT NULL이라 남아 있으면 새 행을 INSERT할 수 없음)
+OBSOLETE_COLUMNS = {
+    # 슬롯별 참여자 ID JSON 배열은 room_slot_members 행으로 옮김 (집계 형식 3, 다음 조회 때 재구축)
+    "room_slot_tallies": ["participant_ids"],
+}
+
+
+def drop_obsolete_columns(conn: Connection, table) -> None:
+    """OBSOLETE_COLUMNS 중 테이블에 남아 있는 컬럼 삭제 (PostgreSQL은 컬럼의 인덱스도 함께 삭제됨)"""
+    existing_columns = {column["name"] for column in inspect(conn).get_columns(table.name)}
+    preparer = conn.dialect.identifier_preparer
+    for column_name in OBSOLETE_COLUMNS.get(table.name, []):
+        if column_name in existing_columns:
+            conn.exec_driver_sql(f"ALTER TABLE {preparer.format_table(table)} DROP COLUMN {preparer.quote(column_name)}")
+            logger.info("%s.%s 컬럼 삭제", table.name, column_name)
+
+
+def drop_obsolete_indexes(conn: Connection, table_name: str, existing_indexes) -> None:
+    preparer = conn.dialect.identifier_preparer
+    for index_name in OBSOLETE_INDEXES.get(table_name, []):
+        if index_name in existing_indexes:
+            conn.exec_driver_sql(f"DROP INDEX {preparer.quote(index_name)}")
+            logger.info("%s 인덱스 삭제", index_name)
+
+
+def creates_index(index, dialect_name: str) -> bool:
+    """ddl_if(dialect=...)로 다른 데이터베이스 전용으로 선언한 인덱스가 아닌지"""
+    ddl_if = getattr(index, "_ddl_if", None)
+    return ddl_if is None or ddl_if.dialect is None or ddl_if.dialect == dialect_name
+
+
+def upgrade(conn: Connection) -> List[str]:
+    """모델에 선언된 컬럼/인덱스 중 데이터베이스에 없는 것을 생성하고 만들지 못한 인덱스 이름 반환
+
+    같은 방의 같은 이름 참여자는 참여자 이름 유니크 인덱스를 만들기 전에 한 명으로 합친다.
+    (응답 제출의 INSERT ... ON CONFLICT가 이 인덱스를 필요로 함)
+    """
+    inspector = inspect(conn)
+    existing_tables = set(inspector.get_table_names())
+    skipped = []
+
+    for table in Base.metadata.sorted_tables:
+        if table.name not in existing_tables:
+            continue
+        add_missing_columns(conn, table)
+        drop_obsolete_columns(conn, table)
+        convert_json_columns(conn, table)
+        existing_indexes = {index["name"] for index in inspector.get_indexes(table.name)}
+        drop_obsolete_indexes(conn, table.name, existing_indexes)
+
+        for index in sorted(table.indexes, key=lambda index: index.name):
+            if index.name in existing_indexes or not creates_index(index, conn.dialect.name):
+                continue
+            if index.name == "ux_participants_room_id_name":
+                merged = merge_duplicate_participants(conn)
+                if merged:
+                    logger.warning("%s 생성 전 같은 방의 중복된 이름 참여자 %d명을 합침", index.name, merged)
+            try:
+                with conn.begin_nested():
+                    index.create(conn)
+            except IntegrityError:
+                logger.warning("%s 생성 실패: 기존 데이터가 유니크 조건을 만족하지 않음", index.name)
+                skipped.append(index.name)
+                continue
+            logger.info("%s 인덱스 생성", index.name)
+
+    return skipped
+
+
+# 주요 조회 쿼리와 사용해야 하는 인덱스 (None이면 테이블 전체 탐색만 없으면 됨)
+HOT_QUERIES = [
+    (
+        "active room by id",
+        select(Room).where(Room.id == "room", Room.is_active == True),
+        None,
+    ),
+    (
+        "participant by room and name",
+        select(Participant).where(Participant.room_id == "room", Participant.name == "name"),
+        "ux_participants_room_id_name",
+    ),
+    (
+        "participants by room",
+        select(Participant).where(Participant.room_id == "room").order_by(Participant.created_at, Participant.id),
+        "ix_participants_room_id_created_at_id",
+    ),
+    (
+        "active response by participant",
+        select(Response).where(
+            Response.participant_id == "participant",
+            Response.is_active == True
+        ).order_by(Response.created_at.desc()).limit(1),
+        "ix_responses_participant_id_is_active_created_at",
+    ),
+    (
+        "response history by participant",
+        select(Response).where(Response.participant_id == "participant").order_by(Response.created_at.desc()),
+        "ix_responses_participant_id_created_at",
+    ),
+    (
+        "latest response version",
+        select(Response).where(Response.participant_id == "participant").order_by(Response.version.desc()).limit(1),
+        "ux_responses_participant_id_version",
+    ),
+    (
+        "delta children",
+        select(Response).where(Response.parent_id == "response"),
+        "ix_responses_parent_id",
+    ),
+    (
+        "active responses in room",
+        select(Response.id).join(Participant, Participant.id == Response.participant_id).where(
+            Participant.room_id == "room",
+            Response.is_active == True
+        ),
+        "ix_responses_participant_id_is_active_created_at",
+    ),
+    (
+        "tally slots of participant",
+        select(RoomSlotMember.slot).where(RoomSlotMember.room_id == "room", RoomSlotMember.participant_id == "participant"),
+        None,
+    ),
+]
+
+
+# 전체 탐색하면 안 되는 테이블 (방/참여자 수에 비례해 커짐)
+SCANNED_TABLES = {table.name for table in (Room.__table__, Participant.__table__, Response.__table__, RoomSlotTally.__table__, RoomSlotMember.__table__, RoomTally.__table__)}
+
+
+def explain_prefix(conn: Connection) -> str:
+    return "EXPLAIN" if conn.dialect.name == "postgresql" else "EXPLAIN QUERY PLAN"
+
+
+def query_plan(conn: Connection, statement: str, parameters: Any = ()) -> str:
+    """SQL 문(드라이버 형식 파라미터 포함)의 실행 계획을 한 줄로"""
+    return " / ".join(str(row[-1]) for row in conn.exec_driver_sql(f"{explain_prefix(conn)} {statement}", parameters))
+
+
+def full_scans(plan: str) -> List[str]:
+    """실행 계획에서 인덱스 없이 전체 탐색하는 테이블 이름 목록 (SQLite: SCAN t, PostgreSQL: Seq Scan on t)"""
+    tables = re.findall(r"(?:^|/ )SCAN (?:TABLE )?(\w+)(?! USING)(?:$| /)", plan) + re.findall(r"Seq Scan on (\w+)", plan)
+    return [table for table in tables if table in SCANNED_TABLES]
+
+
+def explain(conn: Connection) -> List[str]:
+    """주요 쿼리의 실행 계획을 검사하여 기대한 인덱스를 쓰지 않거나 테이블 전체를 탐색하는 쿼리 목록 반환
+
+    PostgreSQL은 행이 적으면 순차 탐색을 고르므로 순차 탐색을 끄고 인덱스를 쓸 수 있는지 본다.
+    """
+    if conn.dialect.name == "postgresql":
+        conn.exec_driver_sql("SET LOCAL enable_seqscan = off")
+
+    problems = []
+    for label, query, index_name in HOT_QUERIES:
+        compiled = query.compile(conn, compile_kwargs={"literal_binds": True})
+        plan = query_plan(conn, str(compiled))
+        if (index_name is not None and index_name not in plan) or full_scans(plan):
+            problems.append(f"{label}: expected {index_name or 'no full scan'}, got {plan}")
+    return problems
+
+
+async def run(command: str) -> int:
+    from app.database import engine, init_db
+
+    if command == "upgrade":
+        # init_db()가 테이블 생성 후 upgrade()를 실행
+        await init_db()
+        async with engine.connect() as conn:
+            duplicates = await conn.run_sync(find_duplicate_participants)
+        for room_id, name, count in duplicates:
+            print(f"duplicate participant: {room_id}/{name} x{count}")
+        return 1 if duplicates else 0
+
+    if engine.dialect.name not in ("sqlite", "postgresql"):
+        print("explain: SQLite, PostgreSQL 데이터베이스에서만 지원")
+        return 1
+    await init_db()
+    async with engine.connect() as conn:
+        problems = await conn.run_sync(explain)
+    for problem in problems:
+        print(f"  - {problem}")
+    print("explain: ok" if not problems else f"explain: {len(problems)} queries without expected index")
+    return 1 if problems else 0
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    import argparse
+    import asyncio
+
+    parser = argparse.ArgumentParser(prog="python -m app.migrations", description="스키마 업그레이드 / 실행 계획 검사")
+    parser.add_argument("command", choices=["upgrade", "explain"])
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+    return asyncio.run(disposing(run(args.command)))
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
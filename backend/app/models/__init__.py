@@ -1,5 +1,7 @@
 from .room import Room
 from .participant import Participant
 from .response import Response
+from .slot_tally import RoomTally, RoomSlotTally, RoomSlotMember
+from .slot_universe import SlotUniverse
 
-__all__ = ["Room", "Participant", "Response"]
+__all__ = ["Room", "Participant", "Response", "RoomTally", "RoomSlotTally", "RoomSlotMember", "SlotUniverse"]
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, String, DateTime, ForeignKey
+from sqlalchemy import Column, String, DateTime, ForeignKey, Index, Integer
 from sqlalchemy.orm import relationship
 from app.database import Base
 from datetime import datetime
@@ -6,14 +6,19 @@ import uuid
 
 class Participant(Base):
     __tablename__ = "participants"
+    __table_args__ = (
+        # 방 내 이름 중복 방지 + 이름으로 참여자 조회
+        Index("ux_participants_room_id_name", "room_id", "name", unique=True),
+        # 방별 참여자 목록 (참여 순서, 커서 페이지네이션)
+        Index("ix_participants_room_id_created_at_id", "room_id", "created_at", "id"),
+    )
     
     id = Column(String, primary_key=True, default=lambda: str(uuid.uuid4()))
     room_id = Column(String, ForeignKey("rooms.id", ondelete="CASCADE"), nullable=False)
     name = Column(String(100), nullable=False)
+    response_version = Column(Integer, nullable=False, default=0, server_default="0")  # 마지막으로 발급한 응답 버전
     created_at = Column(DateTime, default=datetime.utcnow)
     
     # 관계 설정
     room = relationship("Room", back_populates="participants")
     responses = relationship("Response", back_populates="participant", cascade="all, delete-orphan")
-    
-    # 방 내에서 이름 중복 방지를 위한 유니크 제약조건은 애플리케이션 레벨에서 처리
@@ -1,17 +1,32 @@
-from sqlalchemy import Column, String, DateTime, ForeignKey, Text, Integer, Boolean
+from sqlalchemy import Column, String, DateTime, ForeignKey, Integer, Boolean, Index, LargeBinary
 from sqlalchemy.orm import relationship
-from sqlalchemy.ext.hybrid import hybrid_property
 from app.database import Base
+from app.models.types import JSONText
+from app import json_codec
+from app.services.availability import decode_bitmap, encode_bitmap
 from datetime import datetime
 import uuid
-import json
 
 class Response(Base):
     __tablename__ = "responses"
+    __table_args__ = (
+        # 참여자별 응답 기록 (created_at 역순)
+        Index("ix_responses_participant_id_created_at", "participant_id", "created_at"),
+        # 참여자별 최신 활성 응답, 활성 응답 일괄 비활성화
+        Index("ix_responses_participant_id_is_active_created_at", "participant_id", "is_active", "created_at"),
+        # 참여자별 최신 버전 (델타 기준 응답 선택), 버전 중복 방지
+        Index("ux_responses_participant_id_version", "participant_id", "version", unique=True),
+        # 델타 기준 응답을 바꾸거나 지울 때 자식 응답 조회
+        Index("ix_responses_parent_id", "parent_id"),
+    )
     
     id = Column(String, primary_key=True, default=lambda: str(uuid.uuid4()))
     participant_id = Column(String, ForeignKey("participants.id", ondelete="CASCADE"), nullable=False)
-    _response_data = Column("response_data", Text, nullable=False)  # JSON 문자열로 저장
+    _response_data = Column("response_data", JSONText, nullable=False)  # JSON 문자열로 저장 (키프레임은 전체 데이터, 나머지는 델타, PostgreSQL은 JSONB)
+    parent_id = Column(String)  # 델타의 기준 응답 ID (NULL이면 키프레임)
+    delta_depth = Column(Integer, nullable=False, default=0, server_default="0")  # 마지막 키프레임으로부터의 델타 수
+    slot_universe_id = Column(Integer, ForeignKey("slot_universes.id"))  # 비트맵 키프레임의 슬롯 유니버스 (NULL이면 JSON)
+    slot_bitmap = Column(LargeBinary)  # 비트맵으로 저장한 슬롯 목록들 (키마다 유니버스 크기만큼의 바이트를 이어 붙임)
     version = Column(Integer, default=1)
     is_active = Column(Boolean, default=True)  # 활성화 상태
     created_at = Column(DateTime, default=datetime.utcnow)
@@ -20,23 +35,96 @@ class Response(Base):
     # 관계 설정
     participant = relationship("Participant", back_populates="responses")
     
-    @hybrid_property
+    @property
+    def is_keyframe(self):
+        """전체 데이터를 저장한 응답인지 여부 (아니면 parent_id 응답에 대한 델타를 저장)"""
+        return self.parent_id is None
+    
+    @property
     def response_data(self):
-        """JSON 문자열을 파이썬 객체로 변환"""
+        """응답 데이터 (처음 읽을 때 한 번만 파싱하고 setter가 갱신, 델타로 저장된 응답은 response_history.load()로 복원한 뒤 사용)"""
+        data = self.__dict__.get("_data")
+        if data is not None:
+            return data
+        if not self.is_keyframe:
+            raise RuntimeError(f"Response {self.id} is stored as a delta; restore it with response_history.load()")
+        if self.slot_universe_id is not None:
+            return self._decode_bitmap()
         try:
-            return json.loads(self._response_data)
-        except (json.JSONDecodeError, TypeError):
+            data = json_codec.loads(self._response_data)
+        except (ValueError, TypeError):
             return {}
+        self._data = data
+        return data
     
     @response_data.setter
     def response_data(self, value):
-        """파이썬 객체를 JSON 문자열로 변환하여 저장 (한글 지원)"""
+        """파이썬 객체를 JSON 문자열로 변환하여 키프레임으로 저장 (한글 지원)"""
         if isinstance(value, str):
             # 이미 JSON 문자열인 경우
-            self._response_data = value
-        else:
-            # 딕셔너리나 다른 객체인 경우
-            self._response_data = json.dumps(value, ensure_ascii=False)
+            value = json_codec.loads(value)
+        self._response_data = json_codec.dumps(value)
+        self.parent_id = None
+        self.delta_depth = 0
+        self.slot_universe_id = None
+        self.slot_bitmap = None
+        self._data = value
+    
+    def set_bitmap_data(self, universe, data, keys):
+        """keys의 슬롯 목록은 유니버스 비트맵으로, 나머지는 JSON으로 저장 (키프레임)
+        
+        슬롯 목록은 유니버스 순서로 바뀌므로 복원 결과(유니버스 순서)를 보관한다.
+        하나라도 비트맵으로 만들 수 없으면 False를 반환하고 아무것도 바꾸지 않는다.
+        """
+        slots = universe.get_slots()
+        slot_index = {slot: index for index, slot in enumerate(slots)}
+        segments = [encode_bitmap(data[key], slot_index) for key in keys]
+        if not keys or any(segment is None for segment in segments):
+            return False
+        
+        self.response_data = {key: value for key, value in data.items() if key not in keys}
+        self._response_data = json_codec.dumps({"bitmap_keys": list(keys), "data": self._data})
+        self.slot_universe_id = universe.id
+        self.slot_bitmap = b"".join(segments)
+        self._universe = slots
+        self._data = self._decode_bitmap()
+        return True
+    
+    def set_universe(self, slots):
+        """비트맵 키프레임을 복원할 슬롯 유니버스 보관 (response_history.load()에서 호출)"""
+        self._universe = slots
+    
+    def _decode_bitmap(self):
+        slots = self.__dict__.get("_universe")
+        if slots is None:
+            raise RuntimeError(f"Response {self.id} is stored as a bitmap; restore it with response_history.load()")
+        stored = json_codec.loads(self._response_data)
+        size = (len(slots) + 7) // 8
+        data = {}
+        for position, key in enumerate(stored["bitmap_keys"]):
+            data[key] = decode_bitmap(self.slot_bitmap[position * size:(position + 1) * size], slots)
+        data.update(stored["data"])
+        self._data = data
+        return data
+    
+    def get_delta(self):
+        """저장된 델타 (키프레임이면 None)"""
+        if self.is_keyframe:
+            return None
+        return json_codec.loads(self._response_data)
+    
+    def set_delta(self, parent, delta, data):
+        """parent 응답에 대한 델타로 저장 (data는 복원 결과로 보관)"""
+        self._response_data = json_codec.dumps(delta)
+        self.parent_id = parent.id
+        self.delta_depth = parent.delta_depth + 1
+        self.slot_universe_id = None
+        self.slot_bitmap = None
+        self._data = data
+    
+    def set_restored_data(self, data):
+        """델타를 적용해 복원한 데이터 보관"""
+        self._data = data
     
     def get_response_data(self):
         """JSON 문자열을 파이썬 객체로 변환 (하위 호환성)"""
@@ -1,9 +1,10 @@
 from sqlalchemy import Column, String, Integer, DateTime, Boolean, Text
 from sqlalchemy.orm import relationship
 from app.database import Base
+from app.models.types import JSONText
+from app import json_codec
 from datetime import datetime
 import uuid
-import json
 
 class Room(Base):
     __tablename__ = "rooms"
@@ -14,26 +15,35 @@ class Room(Base):
     room_type = Column(Integer, nullable=False)  # 1: 시간기준, 2: 블럭기준, 3: 날짜기준
     creator_name = Column(String(100), nullable=False)
     deadline = Column(DateTime)
-    settings = Column(Text)  # JSON 문자열로 저장 (블럭 기준일 때 커스텀 블럭 정보)
+    settings = Column(JSONText)  # JSON 문자열로 저장 (블럭 기준일 때 커스텀 블럭 정보, PostgreSQL은 JSONB)
     created_at = Column(DateTime, default=datetime.utcnow)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     is_active = Column(Boolean, default=True)
+    change_version = Column(Integer, nullable=False, default=0, server_default="0")  # 방/참여자/응답이 바뀔 때마다 증가 (ETag)
     
     # 관계 설정
     participants = relationship("Participant", back_populates="room", cascade="all, delete-orphan")
     
     def get_settings(self):
-        """JSON 문자열을 파이썬 객체로 변환"""
+        """JSON 문자열을 파이썬 객체로 변환 (settings 값이 바뀌기 전까지 파싱 결과 재사용)"""
+        cached = self.__dict__.get("_settings_cache")
+        if cached is not None and cached[0] is self.settings:
+            return cached[1]
+        
         if not self.settings:
-            return {}
-        try:
-            return json.loads(self.settings)
-        except:
-            return {}
+            settings = {}
+        else:
+            try:
+                settings = json_codec.loads(self.settings)
+            except:
+                settings = {}
+        self._settings_cache = (self.settings, settings)
+        return settings
     
     def set_settings(self, data):
         """파이썬 객체를 JSON 문자열로 변환하여 저장 (한글 지원)"""
+        self.__dict__.pop("_settings_cache", None)
         if data:
-            self.settings = json.dumps(data, ensure_ascii=False)
+            self.settings = json_codec.dumps(data)
         else:
             self.settings = None
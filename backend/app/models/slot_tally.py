@@ -0,0 +1,34 @@
+from sqlalchemy import Column, String, DateTime, ForeignKey, Integer
+from app.database import Base
+from datetime import datetime
+
+class RoomTally(Base):
+    """방 단위 집계 상태 (집계가 만들어진 방만 행이 존재)"""
+    __tablename__ = "room_tallies"
+    
+    room_id = Column(String, ForeignKey("rooms.id", ondelete="CASCADE"), primary_key=True)
+    format_version = Column(Integer, nullable=False)  # 슬롯 추출 규칙이 바뀌면 재구축
+    respondent_count = Column(Integer, nullable=False, default=0)  # 활성 응답이 있는 참여자 수
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+class RoomSlotTally(Base):
+    """방의 슬롯별 가능 인원수 (인원이 있는 슬롯만 행이 존재)"""
+    __tablename__ = "room_slot_tallies"
+    
+    room_id = Column(String, ForeignKey("rooms.id", ondelete="CASCADE"), primary_key=True)
+    slot = Column(String(255), primary_key=True)
+    participant_count = Column(Integer, nullable=False, default=0)
+
+class RoomSlotMember(Base):
+    """방 슬롯에 가능한 참여자 (슬롯 하나에 참여자 한 명씩 한 행)
+
+    응답이 바뀌면 바뀐 슬롯의 행만 추가/삭제하므로 쓰기 비용이 방 인원수와 무관하다.
+    기본 키가 (방, 참여자, 슬롯) 순서라 방 전체 조회와 참여자의 슬롯 조회 모두 기본 키 인덱스를 쓴다.
+    """
+    __tablename__ = "room_slot_members"
+    
+    room_id = Column(String, ForeignKey("rooms.id", ondelete="CASCADE"), primary_key=True)
+    # 참여자 외래 키는 두지 않음 (참여자를 지울 때 참여자 ID로 시작하는 인덱스가 없어 이 테이블을 전체 탐색하게 됨)
+    # 참여자 삭제 시 행은 slot_tally.apply_participant_change()가 함께 지운다.
+    participant_id = Column(String, primary_key=True)
+    slot = Column(String(255), primary_key=True)
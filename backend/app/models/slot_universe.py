@@ -0,0 +1,28 @@
+from sqlalchemy import Column, String, DateTime, ForeignKey, Text, Integer, Index
+from app.database import Base
+from app import json_codec
+from datetime import datetime
+
+class SlotUniverse(Base):
+    """방 설정에서 만든 슬롯 목록 (응답 비트맵의 비트 순서, 만들어진 뒤에는 바뀌지 않음)
+
+    방 설정이 바뀌면 새 유니버스가 추가되고, 이전 유니버스로 저장된 응답은 그대로 복원된다.
+    """
+    __tablename__ = "slot_universes"
+    __table_args__ = (
+        Index("ux_slot_universes_room_id_digest", "room_id", "digest", unique=True),
+    )
+    
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    room_id = Column(String, ForeignKey("rooms.id", ondelete="CASCADE"), nullable=False)
+    digest = Column(String(64), nullable=False)  # 슬롯 목록의 SHA-256
+    _slots = Column("slots", Text, nullable=False)  # JSON 배열로 저장
+    created_at = Column(DateTime, default=datetime.utcnow)
+    
+    def get_slots(self):
+        """JSON 문자열을 슬롯 목록으로 변환"""
+        return json_codec.loads(self._slots)
+    
+    def set_slots(self, slots):
+        """슬롯 목록을 JSON 배열로 저장"""
+        self._slots = json_codec.dumps(slots)
@@ -0,0 +1,7 @@
+"""모델 공통 컬럼 타입"""
+from sqlalchemy import Text
+from sqlalchemy.dialects.postgresql import JSONB
+
+# JSON 문자열 컬럼: SQLite에서는 TEXT, PostgreSQL에서는 JSONB (GIN 인덱스와 @> 포함 조회 사용 가능)
+# 어느 쪽이든 파이썬 쪽 값은 JSON 문자열이다. (PostgreSQL 엔진의 json_serializer/json_deserializer가 그대로 전달)
+JSONText = Text().with_variant(JSONB(none_as_null=True), "postgresql")
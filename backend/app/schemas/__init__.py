@@ -1,13 +1,20 @@
-from .room import RoomCreate, RoomUpdate, RoomResponse, RoomWithParticipants
+from .room import RoomCreate, RoomUpdate, RoomResponse, RoomWithParticipants, RoomBundle
 from .participant import ParticipantCreate, ParticipantResponse, ParticipantWithResponses
-from .response import ResponseCreate, ResponseUpdate, ResponseResponse, OptimalTimeSlot
+from .response import (
+    ResponseCreate, ResponseUpdate, ResponseResponse, SubmissionCreate, SubmissionResult,
+    ImportRowError, ImportResult,
+    OptimalTimeSlot, SlotAvailability, DateAvailability, RoomAvailability
+)
 
 # Forward reference 해결을 위한 모델 재빌드
 ParticipantWithResponses.model_rebuild()
 RoomWithParticipants.model_rebuild()
+RoomBundle.model_rebuild()
 
 __all__ = [
-    "RoomCreate", "RoomUpdate", "RoomResponse", "RoomWithParticipants",
+    "RoomCreate", "RoomUpdate", "RoomResponse", "RoomWithParticipants", "RoomBundle",
     "ParticipantCreate", "ParticipantResponse", "ParticipantWithResponses",
-    "ResponseCreate", "ResponseUpdate", "ResponseResponse", "OptimalTimeSlot"
+    "ResponseCreate", "ResponseUpdate", "ResponseResponse", "SubmissionCreate", "SubmissionResult",
+    "ImportRowError", "ImportResult", "OptimalTimeSlot",
+    "SlotAvailability", "DateAvailability", "RoomAvailability"
 ]
@@ -1,4 +1,4 @@
-from pydantic import BaseModel, ConfigDict
+from pydantic import BaseModel, ConfigDict, Field
 from typing import Optional, List, TYPE_CHECKING, ForwardRef
 from datetime import datetime
 
@@ -6,7 +6,7 @@ if TYPE_CHECKING:
     from .response import ResponseResponse
 
 class ParticipantBase(BaseModel):
-    name: str
+    name: str = Field(min_length=1, max_length=100)
 
 class ParticipantCreate(ParticipantBase):
     room_id: str
@@ -1,5 +1,5 @@
-from pydantic import BaseModel, ConfigDict
-from typing import Any, Dict, List
+from pydantic import BaseModel, ConfigDict, Field
+from typing import Any, Dict, List, Optional
 from datetime import datetime
 
 class ResponseBase(BaseModel):
@@ -21,8 +21,45 @@ class ResponseResponse(ResponseBase):
     created_at: datetime
     updated_at: datetime
 
+class SubmissionCreate(ResponseBase):
+    name: str = Field(min_length=1, max_length=100)
+
+class SubmissionResult(BaseModel):
+    participant_id: str
+    response_id: str
+    version: int
+
+class ImportRowError(BaseModel):
+    line: int
+    name: Optional[str] = None
+    error: str
+
+class ImportResult(BaseModel):
+    room_id: str
+    imported: int
+    created_participants: int
+    failed: int
+    errors: List[ImportRowError]  # 최대 1000개
+
 class OptimalTimeSlot(BaseModel):
     time_slot: str
     available_participants: List[str]
     participant_count: int
     availability_rate: float
+
+class SlotAvailability(BaseModel):
+    slot: str  # 시간(HH:MM) 또는 블럭 ID (날짜 기준 방은 빈 문자열)
+    label: str
+    available_participants: List[str]
+    participant_count: int
+    availability_rate: float
+
+class DateAvailability(BaseModel):
+    date: str  # 날짜가 없는 이전 구조의 응답은 빈 문자열
+    slots: List[SlotAvailability]
+
+class RoomAvailability(BaseModel):
+    room_id: str
+    room_type: int
+    respondent_count: int
+    dates: List[DateAvailability]
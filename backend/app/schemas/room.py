@@ -3,7 +3,8 @@ from typing import Optional, List, Dict, Any, TYPE_CHECKING, ForwardRef
 from datetime import datetime
 
 if TYPE_CHECKING:
-    from .participant import ParticipantResponse
+    from .participant import ParticipantResponse, ParticipantWithResponses
+    from .response import OptimalTimeSlot
 
 class TimeBlock(BaseModel):
     id: str
@@ -40,3 +41,10 @@ class RoomWithParticipants(RoomResponse):
     model_config = ConfigDict(from_attributes=True)
     
     participants: List[ForwardRef('ParticipantResponse')] = []
+
+class RoomBundle(BaseModel):
+    """결과 페이지용 묶음 응답 (방 + 참여자별 응답 + 최적 시간대)"""
+    room: RoomResponse
+    participants: List[ForwardRef('ParticipantWithResponses')] = []  # 참여자별 응답은 최신 버전부터
+    respondent_count: int
+    optimal_times: List[ForwardRef('OptimalTimeSlot')] = []
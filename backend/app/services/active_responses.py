@@ -0,0 +1,51 @@
+from typing import List, Optional, Tuple
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.models.participant import Participant
+from app.models.response import Response
+from app.services import response_history
+
+
+async def get_active_response(db: AsyncSession, participant_id: str) -> Optional[Response]:
+    """참여자의 활성화된 최신 응답"""
+    response = await db.scalar(
+        select(Response).where(
+            Response.participant_id == participant_id,
+            Response.is_active == True
+        ).order_by(Response.created_at.desc()).limit(1)
+    )
+    if response is not None:
+        await response_history.load(db, [response])
+    return response
+
+
+async def load_active_responses(db: AsyncSession, room_id: str) -> List[Tuple[Participant, Response]]:
+    """방 참여자별 활성화된 최신 응답을 한 번의 쿼리로 조회 (활성 응답이 없는 참여자는 제외)
+
+    참여자마다 최신 응답을 따로 조회하지 않도록 윈도우 함수로 참여자별 순위를 매긴다.
+    """
+    ranked = select(
+        Response.id.label("response_id"),
+        func.row_number().over(
+            partition_by=Response.participant_id,
+            order_by=Response.created_at.desc()
+        ).label("position")
+    ).join(
+        Participant, Participant.id == Response.participant_id
+    ).where(
+        Participant.room_id == room_id,
+        Response.is_active == True
+    ).subquery()
+
+    result = await db.execute(
+        select(Participant, Response).join(
+            Response, Response.participant_id == Participant.id
+        ).join(
+            ranked, ranked.c.response_id == Response.id
+        ).where(
+            ranked.c.position == 1
+        )
+    )
+    rows = result.all()
+    await response_history.load(db, [response for _, response in rows])
+    return rows
@@ -0,0 +1,190 @@
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+from itertools import compress
+import operator
+
+# 시간 기준 방의 슬롯 간격 (분)
+SLOT_MINUTES = 30
+
+
+def parse_time_slot(slot: str) -> Optional[Tuple[str, int]]:
+    """'YYYY-MM-DD|HH:MM' 슬롯을 (날짜, 자정 기준 분)으로 변환 (형식이 다르면 None)"""
+    date, _, time = slot.rpartition('|')
+    hour, sep, minute = time.partition(':')
+    if not sep or not hour.isdigit() or not minute.isdigit():
+        return None
+    return date, int(hour) * 60 + int(minute)
+
+
+def format_minutes(minutes: int) -> str:
+    """자정 기준 분을 'HH:MM'으로 변환"""
+    return f"{minutes // 60:02d}:{minutes % 60:02d}"
+
+
+def sliding_reduce(values: List[int], width: int, op: Callable[[int, int], int] = operator.and_) -> List[int]:
+    """길이 width인 모든 연속 구간의 비트 연산 결과 (2의 거듭제곱 구간을 합성, O(n log width))
+
+    result[i] = values[i] op values[i + 1] op ... op values[i + width - 1]
+    """
+    if width <= 0 or width > len(values):
+        return []
+
+    result = None
+    covered = 0       # result[i]가 덮는 구간 길이
+    power = values    # power[i]가 덮는 구간 길이 = span
+    span = 1
+    remaining = width
+
+    while remaining:
+        if remaining & 1:
+            if result is None:
+                result = list(power)
+            else:
+                result = [op(result[i], power[i + covered]) for i in range(len(values) - covered - span + 1)]
+            covered += span
+        remaining >>= 1
+        if remaining:
+            power = [op(power[i], power[i + span]) for i in range(len(power) - span)]
+            span *= 2
+
+    return result
+
+
+class AvailabilityMatrix:
+    """방의 슬롯 유니버스를 정수 인덱스로 매핑한 참여자 × 슬롯 비트 행렬
+
+    - rows[p]: 참여자 p가 가능한 슬롯들의 비트마스크 (bit i = slots[i])
+    - columns[i]: 슬롯 i가 가능한 참여자들의 비트마스크 (bit p = participants[p])
+
+    슬롯별 인원수는 열 비트마스크의 popcount로 계산하고,
+    참여자 이름 목록은 실제로 반환되는 슬롯에 대해서만 펼친다.
+    """
+
+    __slots__ = ("slots", "slot_index", "participants", "rows", "columns")
+
+    def __init__(self, slots: Optional[Iterable[str]] = None):
+        self.slots: List[str] = []
+        self.slot_index: Dict[str, int] = {}
+        self.participants: List[str] = []
+        self.rows: List[int] = []
+        self.columns: List[int] = []
+
+        for slot in slots or ():
+            self.add_slot(slot)
+
+    def add_slot(self, slot: str) -> int:
+        """슬롯을 유니버스에 추가하고 인덱스 반환 (이미 있으면 기존 인덱스)"""
+        index = self.slot_index.get(slot)
+        if index is None:
+            index = len(self.slots)
+            self.slot_index[slot] = index
+            self.slots.append(slot)
+            self.columns.append(0)
+        return index
+
+    def add_slot_members(self, slot: str, positions: Iterable[int]) -> int:
+        """슬롯 하나에 가능한 참여자 위치들을 열로 추가하고 슬롯 인덱스 반환"""
+        index = self.add_slot(slot)
+        slot_bit = 1 << index
+        column = self.columns[index]
+
+        for position in positions:
+            column |= 1 << position
+            self.rows[position] |= slot_bit
+
+        self.columns[index] = column
+        return index
+
+    def add_participant(self, name: str, slots: Iterable[str]) -> int:
+        """참여자 한 명의 가능 슬롯을 행으로 추가하고 참여자 인덱스 반환"""
+        position = len(self.participants)
+        participant_bit = 1 << position
+        row = 0
+
+        for slot in slots:
+            index = self.add_slot(slot)
+            slot_bit = 1 << index
+            if row & slot_bit:
+                continue
+            row |= slot_bit
+            self.columns[index] |= participant_bit
+
+        self.participants.append(name)
+        self.rows.append(row)
+        return position
+
+    @property
+    def participant_count(self) -> int:
+        return len(self.participants)
+
+    def counts(self) -> List[int]:
+        """슬롯별 가능 인원수 (열 비트마스크 popcount)"""
+        return [column.bit_count() for column in self.columns]
+
+    def time_axes(self, step: int = SLOT_MINUTES) -> Dict[str, Tuple[int, List[int]]]:
+        """날짜별 연속 시간축 (시작 분, step 간격의 열 비트마스크 목록)
+
+        아무도 선택하지 않은 중간 슬롯은 빈 마스크(0)로 채워 인덱스 차이가 곧 시간 차이가 되도록 한다.
+        'YYYY-MM-DD|HH:MM' 형식이 아닌 슬롯은 제외된다.
+        """
+        slots_by_date: Dict[str, Dict[int, int]] = {}
+        for index, slot in enumerate(self.slots):
+            parsed = parse_time_slot(slot)
+            if parsed is None:
+                continue
+            date, minutes = parsed
+            slots_by_date.setdefault(date, {})[minutes] = self.columns[index]
+
+        axes = {}
+        for date, masks in slots_by_date.items():
+            start = min(masks)
+            end = max(masks)
+            axes[date] = (start, [masks.get(minutes, 0) for minutes in range(start, end + 1, step)])
+        return axes
+
+    def names_for_mask(self, mask: int) -> List[str]:
+        """참여자 비트마스크를 이름 목록으로 펼침 (참여자 추가 순서 유지)"""
+        names = []
+        while mask:
+            lowest = mask & -mask
+            names.append(self.participants[lowest.bit_length() - 1])
+            mask ^= lowest
+        return names
+
+    def names_for(self, index: int) -> List[str]:
+        """슬롯 인덱스에 가능한 참여자 이름 목록"""
+        return self.names_for_mask(self.columns[index])
+
+
+def encode_bitmap(slots: Iterable[str], slot_index: Dict[str, int]) -> Optional[bytes]:
+    """슬롯 목록을 유니버스(slot_index) 위의 비트맵 바이트로 변환 (유니버스에 없거나 중복된 슬롯이 있으면 None)"""
+    mask = 0
+    for slot in slots:
+        index = slot_index.get(slot)
+        if index is None or mask >> index & 1:
+            return None
+        mask |= 1 << index
+    return mask.to_bytes((len(slot_index) + 7) // 8, "little")
+
+
+def decode_bitmap(bitmap: bytes, universe: List[str]) -> List[str]:
+    """비트맵 바이트를 유니버스 순서의 슬롯 목록으로 변환
+
+    비트맵 전체를 정수 하나로 읽어, 켜진 비트가 적으면 가장 낮은 비트를 하나씩 떼어 내고
+    많으면 이진 문자열(낮은 비트부터)을 0/1 바이트로 바꿔 itertools.compress로 유니버스에서 골라낸다.
+    (슬롯 수만큼 파이썬 반복을 돌지 않으므로 바이트별 표를 쓰던 방식보다 빠름)
+    """
+    mask = int.from_bytes(bitmap, "little")
+    if mask.bit_count() * _SPARSE_RATIO < len(universe):
+        slots = []
+        while mask:
+            low = mask & -mask
+            slots.append(universe[low.bit_length() - 1])
+            mask ^= low
+        return slots
+    return list(compress(universe, f"{mask:b}"[::-1].encode().translate(_BIT_FLAGS)))
+
+
+# 켜진 비트가 유니버스의 1/_SPARSE_RATIO보다 적으면 비트를 하나씩 떼어 냄 (672슬롯 기준 측정한 교차점)
+_SPARSE_RATIO = 16
+# 이진 문자열 '0'/'1' -> compress 선택자 0/1
+_BIT_FLAGS = bytes.maketrans(b"01", b"\x00\x01")
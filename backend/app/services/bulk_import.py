@@ -0,0 +1,256 @@
+"""방 응답 일괄 가져오기 (스프레드시트/다른 도구에서 옮겨 올 때)
+
+행 형식
+- jsonl: 한 줄에 {"name": "홍길동", "slots": ["2025-03-04|09:30", ...]}
+- csv: 헤더 name,slots 와 ;로 구분한 슬롯 목록 (예: 홍길동,2025-03-04|09:30;2025-03-04|10:00)
+
+슬롯은 방 설정으로 만든 슬롯 유니버스(response_storage.compile_universe)에 있어야 한다.
+행을 CHUNK_SIZE개씩 묶어 참여자 upsert 한 문장 + 응답 일괄 INSERT로 저장하고 묶음마다 커밋한다.
+(묶음 저장은 쓰기 큐 작업으로 넣으므로 가져오는 동안에도 다른 쓰기 요청이 묶음 사이에 처리된다)
+잘못된 행(UTF-8이 아닌 줄 포함)은 오류 목록에 남기고 건너뛰며, 이미 있는 이름은 새 응답 버전으로 추가된다.
+방 집계와 변경 버전은 묶음마다 같은 트랜잭션에서 고치므로, 가져오기가 중간에 끊겨도 커밋된 묶음까지는 집계가 맞다.
+
+    python -m app.services.bulk_import ROOM_ID FILE [--format jsonl|csv] [--chunk-size N]
+"""
+from typing import Any, AsyncIterable, AsyncIterator, Dict, Iterable, List, Optional, Set, Tuple, TypeVar, Union
+from functools import partial
+from sqlalchemy import select
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.ext.asyncio import AsyncSession
+from app import json_codec
+from app.models.participant import Participant
+from app.models.response import Response
+from app.models.room import Room
+from app.services import response_storage, slot_tally
+from app.services.response_versions import upsert_participant_versions
+from app.services.room_changes import bump_room_version, publish_room_change
+from app.services.schedule_optimizer import ScheduleOptimizer
+from app.services.write_queue import after_commit, write_queue
+import csv
+
+T = TypeVar("T")
+
+CHUNK_SIZE = 500
+FORMATS = ("jsonl", "csv")
+
+# 오류 목록에 남길 최대 행 수 (전체 오류 수는 failed로 보고)
+MAX_REPORTED_ERRORS = 1000
+
+
+class RowError(ValueError):
+    pass
+
+
+def parse_line(line: str, fmt: str) -> Tuple[str, List[str]]:
+    """한 줄을 (이름, 슬롯 목록)으로 변환 (형식이 잘못되면 RowError)"""
+    if fmt == "csv":
+        fields = next(csv.reader([line]))
+        if len(fields) != 2:
+            raise RowError("expected 2 columns: name,slots")
+        name, slots = fields[0], [slot.strip() for slot in fields[1].split(";") if slot.strip()]
+    else:
+        try:
+            row = json_codec.loads(line)
+        except ValueError as e:
+            raise RowError(f"invalid JSON: {e}")
+        if not isinstance(row, dict):
+            raise RowError("expected a JSON object")
+        name, slots = row.get("name"), row.get("slots")
+        if not isinstance(slots, list) or not all(isinstance(slot, str) for slot in slots):
+            raise RowError("slots must be a list of strings")
+
+    if not isinstance(name, str) or not name.strip():
+        raise RowError("name is required")
+    name = name.strip()
+    if len(name) > 100:
+        raise RowError("name is longer than 100 characters")
+    return name, list(dict.fromkeys(slots))
+
+
+async def read_rows(lines: AsyncIterable[Union[str, RowError]], fmt: str) -> AsyncIterator[Tuple[int, Union[str, RowError]]]:
+    """(줄 번호, 줄) 스트림 (빈 줄과 csv 헤더는 건너뛰고, 디코딩하지 못한 줄은 RowError 그대로)"""
+    number = 0
+    async for line in lines:
+        number += 1
+        if isinstance(line, RowError):
+            yield number, line
+            continue
+        line = line.strip()
+        if not line or (fmt == "csv" and number == 1 and line.lower().replace(" ", "") == "name,slots"):
+            continue
+        yield number, line
+
+
+def decode_line(line: bytes) -> Union[str, RowError]:
+    """UTF-8 줄 디코딩 (실패하면 예외 대신 RowError를 돌려줘 그 줄만 오류로 기록)"""
+    try:
+        return line.decode("utf-8-sig")
+    except UnicodeDecodeError as e:
+        return RowError(f"invalid UTF-8 at byte {e.start}")
+
+
+async def split_lines(chunks: AsyncIterable[bytes]) -> AsyncIterator[Union[str, RowError]]:
+    """바이트 스트림(요청 본문, 파일 등)을 줄 단위 문자열로 (UTF-8이 아닌 줄은 RowError)"""
+    buffer = b""
+    async for chunk in chunks:
+        buffer += chunk
+        *lines, buffer = buffer.split(b"\n")
+        for line in lines:
+            yield decode_line(line)
+    if buffer:
+        yield decode_line(buffer)
+
+
+async def iterate(items: Iterable[T]) -> AsyncIterator[T]:
+    for item in items:
+        yield item
+
+
+class BulkImporter:
+    """한 방에 대한 일괄 가져오기 (행 검증, 묶음 저장, 결과 집계)"""
+
+    def __init__(self, room: Room, chunk_size: int = CHUNK_SIZE):
+        self.room = room
+        self.chunk_size = chunk_size
+        self.slot_key = response_storage.SLOT_KEYS[room.room_type][0]
+        # 설정에 슬롯이 없는 방(이전 구조)은 슬롯을 검사하지 않음
+        self.universe = set(response_storage.compile_universe(room.room_type, room.get_settings()))
+        self.optimizer = ScheduleOptimizer(room.room_type)
+        self.imported = 0
+        self.created = 0
+        self.failed = 0
+        self.errors: List[Dict[str, Any]] = []
+
+    def error(self, line: int, message: str, name: Optional[str] = None) -> None:
+        self.failed += 1
+        if len(self.errors) < MAX_REPORTED_ERRORS:
+            self.errors.append({"line": line, "name": name, "error": message})
+
+    def validate(self, line: int, text: Union[str, RowError], fmt: str) -> Optional[Tuple[int, str, List[str]]]:
+        try:
+            if isinstance(text, RowError):
+                raise text
+            name, slots = parse_line(text, fmt)
+        except RowError as e:
+            self.error(line, str(e))
+            return None
+        unknown = [slot for slot in slots if slot not in self.universe] if self.universe else []
+        if unknown:
+            self.error(line, f"{len(unknown)} slots not in room settings: {', '.join(unknown[:5])}", name)
+            return None
+        return line, name, slots
+
+    async def run(self, lines: AsyncIterable[Union[str, RowError]], fmt: str) -> Dict[str, Any]:
+        chunk: List[Tuple[int, str, List[str]]] = []
+        names = set()
+        async for line, text in read_rows(lines, fmt):
+            row = self.validate(line, text, fmt)
+            if row is None:
+                continue
+            # 한 묶음 안에서는 이름마다 한 행 (같은 이름이 다시 나오면 묶음을 먼저 저장해 버전 순서 유지)
+            if len(chunk) >= self.chunk_size or row[1] in names:
+                await self.store(chunk)
+                chunk, names = [], set()
+            chunk.append(row)
+            names.add(row[1])
+        if chunk:
+            await self.store(chunk)
+
+        return {
+            "room_id": self.room.id,
+            "imported": self.imported,
+            "created_participants": self.created,
+            "failed": self.failed,
+            "errors": self.errors,
+        }
+
+    async def store(self, chunk: List[Tuple[int, str, List[str]]]) -> None:
+        """한 묶음 저장 (참여자 upsert 한 문장 + 응답 일괄 INSERT, 실패하면 묶음 전체를 오류로 기록)"""
+        try:
+            participants = await write_queue.submit(partial(self.write_chunk, chunk))
+        except SQLAlchemyError as e:
+            for line, name, _ in chunk:
+                self.error(line, f"batch failed: {e}", name)
+            return
+        self.imported += len(chunk)
+        self.created += sum(created for _, created in participants.values())
+
+    async def write_chunk(self, chunk: List[Tuple[int, str, List[str]]], db: AsyncSession) -> Dict[str, Tuple[Participant, bool]]:
+        """묶음의 응답 저장과 함께 방 집계(있으면)와 변경 버전을 고침 (쓰기 큐 작업)"""
+        # 참여자 행(upsert)보다 방을 먼저 잠금 (다른 쓰기와 같은 순서)
+        await slot_tally.lock_room(db, self.room.id)
+        participants = await upsert_participant_versions(db, self.room.id, [name for _, name, _ in chunk])
+        tally = await slot_tally.get_room_tally(db, self.room.id)
+        before: Dict[str, Optional[Set[str]]] = {}
+        if tally is not None:
+            existing = [participant.id for participant, created in participants.values() if not created]
+            before = await slot_tally.tallied_participant_slots(db, self.room.id, existing)
+
+        universe = None
+        if response_storage.RESPONSE_STORAGE == "bitmap":
+            universe = await response_storage.get_universe(db, self.room)
+        changes = {}
+        for _, name, slots in chunk:
+            participant, _ = participants[name]
+            response = Response(participant_id=participant.id, version=participant.response_version)
+            data = {self.slot_key: slots}
+            if universe is None or not response.set_bitmap_data(universe, data, [self.slot_key]):
+                response.response_data = data
+            db.add(response)
+            changes[participant.id] = (before.get(participant.id), set(self.optimizer.extract_slots(data)))
+
+        aggregate = None
+        if tally is not None:
+            aggregate = await slot_tally.apply_slot_changes(db, tally, changes)
+        version = await bump_room_version(db, self.room.id)
+        after_commit(db, publish_room_change, self.room.id, version, "responses_imported", None, aggregate)
+        return participants
+
+
+async def import_rows(room: Room, lines: AsyncIterable[Union[str, RowError]], fmt: str = "jsonl", chunk_size: int = CHUNK_SIZE) -> Dict[str, Any]:
+    """줄 스트림을 방 응답으로 가져오고 결과(가져온 행 수, 새 참여자 수, 실패 행과 오류) 반환"""
+    if fmt not in FORMATS:
+        raise ValueError(f"format must be one of {', '.join(FORMATS)}")
+    return await BulkImporter(room, chunk_size).run(lines, fmt)
+
+
+async def run(room_id: str, path: str, fmt: str, chunk_size: int) -> int:
+    from app.database import SessionLocal, init_db
+    import time
+
+    await init_db()
+    async with SessionLocal() as db:
+        room = await db.scalar(select(Room).where(Room.id == room_id, Room.is_active == True))
+        if room is None:
+            print(f"{room_id}: room not found")
+            return 1
+
+        started = time.perf_counter()
+        with open(path, "rb") as file:
+            result = await import_rows(room, split_lines(iterate(file)), fmt, chunk_size)
+        elapsed = time.perf_counter() - started
+
+    print(f"{room_id}: imported {result['imported']} rows ({result['created_participants']} new participants) in {elapsed:.2f}s, {result['failed']} failed")
+    for error in result["errors"]:
+        print(f"  - line {error['line']}: {error['error']}")
+    return 1 if result["failed"] else 0
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    import argparse
+    import asyncio
+    from app.database import disposing
+
+    parser = argparse.ArgumentParser(prog="python -m app.services.bulk_import", description="방 응답 일괄 가져오기")
+    parser.add_argument("room_id")
+    parser.add_argument("path", help="jsonl 또는 csv 파일")
+    parser.add_argument("--format", choices=FORMATS, help="생략하면 파일 확장자로 판단")
+    parser.add_argument("--chunk-size", type=int, default=CHUNK_SIZE)
+    args = parser.parse_args(argv)
+
+    fmt = args.format or ("csv" if args.path.lower().endswith(".csv") else "jsonl")
+    return asyncio.run(disposing(run(args.room_id, args.path, fmt, args.chunk_size)))
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
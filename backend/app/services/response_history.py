@@ -0,0 +1,165 @@
+"""참여자별 응답 기록을 키프레임 + 델타로 저장
+
+응답을 새로 만들 때마다 전체 데이터를 복사하지 않고, 직전 버전 응답(parent)에 대해
+키별로 추가/제거된 슬롯만 저장한다. KEYFRAME_INTERVAL개마다 전체 데이터를 저장하므로
+어떤 버전이든 최대 KEYFRAME_INTERVAL개의 델타만 적용하면 복원된다.
+
+델타 형식: {"added": {키: [값, ...]}, "removed": {키: [값, ...]}, "set": {키: 값}, "unset": [키, ...]}
+- added/removed: 목록 값에서 추가/제거된 항목 (남은 항목은 기준 순서 유지, 추가 항목은 뒤에 붙음)
+- set/unset: 목록이 아니거나 순서까지 달라진 값은 통째로 저장, 삭제된 키는 unset
+"""
+from typing import Any, Dict, Iterable, List, Optional
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from app import json_codec
+from app.models.response import Response
+from app.services import response_storage
+
+# 키프레임 사이 최대 델타 수
+KEYFRAME_INTERVAL = 16
+
+
+def apply_delta(data: Dict[str, Any], delta: Dict[str, Any]) -> Dict[str, Any]:
+    """기준 데이터에 델타를 적용한 새 데이터 (data는 변경하지 않음)"""
+    result = dict(data)
+    for key in delta.get("unset", ()):
+        result.pop(key, None)
+
+    added = delta.get("added", {})
+    removed = delta.get("removed", {})
+    for key in added.keys() | removed.keys():
+        dropped = set(removed.get(key, ()))
+        result[key] = [value for value in result.get(key) or () if value not in dropped] + added.get(key, [])
+
+    result.update(delta.get("set", {}))
+    return result
+
+
+def diff_data(parent: Dict[str, Any], data: Dict[str, Any]) -> Dict[str, Any]:
+    """parent에 적용하면 data가 되는 델타"""
+    delta: Dict[str, Any] = {}
+    unset = [key for key in parent if key not in data]
+    if unset:
+        delta["unset"] = unset
+
+    for key, value in data.items():
+        previous = parent.get(key)
+        if value == previous:
+            continue
+
+        if isinstance(value, list) and isinstance(previous, list):
+            try:
+                kept = set(value)
+                dropped = set(previous) - kept
+                existing = set(previous)
+            except TypeError:
+                # 해시할 수 없는 값이 든 목록
+                delta.setdefault("set", {})[key] = value
+                continue
+            added = [item for item in value if item not in existing]
+            candidate = [item for item in previous if item not in dropped] + added
+            if candidate == value:
+                if added:
+                    delta.setdefault("added", {})[key] = added
+                if dropped:
+                    delta.setdefault("removed", {})[key] = [item for item in previous if item in dropped]
+                continue
+
+        delta.setdefault("set", {})[key] = value
+
+    return delta
+
+
+async def encode(db: AsyncSession, response: Response, parent: Optional[Response], data: Dict[str, Any]) -> None:
+    """response를 parent에 대한 델타로 저장 (기준이 없거나 간격이 찼거나 델타가 더 크면 키프레임)
+
+    parent는 복원된 상태여야 한다.
+    """
+    if parent is None or parent.delta_depth + 1 >= KEYFRAME_INTERVAL:
+        await response_storage.store_keyframe(db, response, data)
+        return
+
+    delta = diff_data(parent.response_data, data)
+    if len(json_codec.dumps(delta)) >= len(json_codec.dumps(data)):
+        await response_storage.store_keyframe(db, response, data)
+    else:
+        response.set_delta(parent, delta, data)
+
+
+async def load(db: AsyncSession, responses: Iterable[Response]) -> None:
+    """델타로 저장된 응답들의 데이터를 복원 (필요한 기준 응답은 재귀 쿼리 한 번으로 조회)"""
+    responses = list(responses)
+    by_id = {response.id: response for response in responses}
+    missing = {
+        response.parent_id
+        for response in responses
+        if not response.is_keyframe and "_data" not in response.__dict__ and response.parent_id not in by_id
+    }
+
+    if missing:
+        chain = select(Response.id, Response.parent_id).where(Response.id.in_(missing)).cte("chain", recursive=True)
+        chain = chain.union(
+            select(Response.id, Response.parent_id).join(chain, Response.id == chain.c.parent_id)
+        )
+        for response in await db.scalars(select(Response).where(Response.id.in_(select(chain.c.id)))):
+            by_id[response.id] = response
+
+    await response_storage.attach_universes(db, by_id.values())
+    for response in responses:
+        restore(response, by_id)
+
+
+def restore(response: Response, by_id: Dict[str, Response]) -> Dict[str, Any]:
+    """기준 응답을 따라 올라가 키프레임(또는 이미 복원된 응답)부터 델타를 차례로 적용"""
+    pending: List[Response] = []
+    node = response
+    while not node.is_keyframe and "_data" not in node.__dict__:
+        pending.append(node)
+        node = by_id[node.parent_id]
+
+    data = node.response_data
+    for node in reversed(pending):
+        data = apply_delta(data, node.get_delta())
+        node.set_restored_data(data)
+    return data
+
+
+async def latest_response(db: AsyncSession, participant_id: str) -> Optional[Response]:
+    """참여자의 가장 높은 버전 응답"""
+    return await db.scalar(
+        select(Response).where(
+            Response.participant_id == participant_id
+        ).order_by(Response.version.desc()).limit(1)
+    )
+
+
+async def append(db: AsyncSession, response: Response, data: Dict[str, Any]) -> None:
+    """새 응답을 참여자의 최신 버전 응답에 대한 델타로 저장 (db.add 전에 호출)"""
+    parent = await latest_response(db, response.participant_id)
+    if parent is not None:
+        await load(db, [parent])
+    await encode(db, response, parent, data)
+
+
+async def _load_neighbors(db: AsyncSession, response: Response):
+    """응답의 기준 응답과 자식 응답들을 복원된 상태로 조회"""
+    parent = None if response.is_keyframe else await db.get(Response, response.parent_id)
+    children = (await db.scalars(select(Response).where(Response.parent_id == response.id))).all()
+    await load(db, [response, *children] + ([parent] if parent is not None else []))
+    return parent, children
+
+
+async def rewrite(db: AsyncSession, response: Response, data: Dict[str, Any]) -> None:
+    """기존 응답의 데이터를 바꾸고, 이 응답을 기준으로 하는 델타들을 새 데이터에 맞춰 다시 인코딩"""
+    parent, children = await _load_neighbors(db, response)
+    await encode(db, response, parent, data)
+    for child in children:
+        await encode(db, child, response, child.response_data)
+
+
+async def remove(db: AsyncSession, response: Response) -> None:
+    """응답 삭제 (이 응답을 기준으로 하는 델타들은 이 응답의 기준 응답으로 옮겨 다시 인코딩)"""
+    parent, children = await _load_neighbors(db, response)
+    for child in children:
+        await encode(db, child, parent, child.response_data)
+    await db.delete(response)
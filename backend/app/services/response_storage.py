@@ -0,0 +1,131 @@
+"""응답 키프레임 저장 형식 (RESPONSE_STORAGE=json | bitmap)
+
+bitmap 형식은 방 설정으로 만든 슬롯 유니버스(SlotUniverse) 위의 비트맵(BLOB)으로 슬롯 목록을 저장한다.
+슬롯 목록은 유니버스 순서(날짜/시간 순)로 정규화되며, 유니버스에 없는 슬롯이 있으면 JSON으로 저장한다.
+읽을 때는 response_history.load()가 유니버스를 붙여 두고, 실제로 데이터를 읽을 때 복원한다.
+
+    python -m app.services.response_storage   # JSON / 비트맵 키프레임 크기와 복원 시간 비교
+"""
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+from sqlalchemy import select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.models.participant import Participant
+from app.models.response import Response
+from app.models.room import Room
+from app.models.slot_universe import SlotUniverse
+import hashlib
+import json
+import os
+
+RESPONSE_STORAGE = os.getenv("RESPONSE_STORAGE", "json")
+
+# 방 유형별 슬롯 목록 키 (ScheduleOptimizer.extract_slots와 동일)
+SLOT_KEYS = {
+    1: ("available_time_slots", "available_times"),
+    2: ("available_block_slots", "available_blocks"),
+    3: ("available_dates",),
+}
+
+# 유니버스는 바뀌지 않으므로 프로세스 안에서 캐시 (id -> 슬롯 목록)
+_universe_slots: Dict[int, List[str]] = {}
+
+
+def compile_universe(room_type: int, settings: Dict[str, Any]) -> List[str]:
+    """방 설정에서 선택 가능한 슬롯 키 목록 (날짜 순, 날짜 안에서는 설정 순서)"""
+    if room_type == 1:  # 시간 기준
+        slots_by_date = settings.get("time_slots_by_date") or {}
+        return [f"{date}|{time}" for date in sorted(slots_by_date) for time in slots_by_date[date]]
+    if room_type == 2:  # 블럭 기준
+        blocks_by_date = settings.get("block_slots_by_date")
+        if not blocks_by_date:
+            block_ids = [block["id"] for block in settings.get("time_blocks") or () if "id" in block]
+            blocks_by_date = {date: block_ids for date in settings.get("selected_dates") or ()}
+        return [f"{date}-{block_id}" for date in sorted(blocks_by_date) for block_id in blocks_by_date[date]]
+    return sorted(settings.get("selected_dates") or ())
+
+
+async def get_universe(db: AsyncSession, room: Room) -> Optional[SlotUniverse]:
+    """방의 현재 설정에 해당하는 슬롯 유니버스 (없으면 생성, 설정에 슬롯이 없으면 None)"""
+    slots = list(dict.fromkeys(compile_universe(room.room_type, room.get_settings())))
+    if not slots:
+        return None
+
+    digest = hashlib.sha256(json.dumps(slots, ensure_ascii=False).encode()).hexdigest()
+    query = select(SlotUniverse).where(SlotUniverse.room_id == room.id, SlotUniverse.digest == digest)
+    universe = await db.scalar(query)
+    if universe is None:
+        universe = SlotUniverse(room_id=room.id, digest=digest)
+        universe.set_slots(slots)
+        try:
+            async with db.begin_nested():
+                db.add(universe)
+        except IntegrityError:
+            # 다른 요청이 같은 유니버스를 먼저 만든 경우
+            universe = await db.scalar(query)
+    _universe_slots.setdefault(universe.id, slots)
+    return universe
+
+
+async def store_keyframe(db: AsyncSession, response: Response, data: Dict[str, Any]) -> None:
+    """응답을 키프레임으로 저장 (bitmap 형식이면 가능한 경우 비트맵으로)"""
+    if RESPONSE_STORAGE == "bitmap":
+        participant = await db.get(Participant, response.participant_id)
+        room = await db.get(Room, participant.room_id)
+        keys = [key for key in SLOT_KEYS.get(room.room_type, ()) if isinstance(data.get(key), list)]
+        universe = await get_universe(db, room) if keys else None
+        if universe is not None and response.set_bitmap_data(universe, data, keys):
+            return
+    response.response_data = data
+
+
+async def attach_universes(db: AsyncSession, responses: Iterable[Response]) -> None:
+    """비트맵 키프레임에 슬롯 유니버스를 붙임 (캐시에 없는 유니버스는 한 번에 조회)"""
+    pending = [
+        response for response in responses
+        if response.slot_universe_id is not None and "_data" not in response.__dict__
+    ]
+    missing = {response.slot_universe_id for response in pending} - _universe_slots.keys()
+    if missing:
+        for universe in await db.scalars(select(SlotUniverse).where(SlotUniverse.id.in_(missing))):
+            _universe_slots[universe.id] = universe.get_slots()
+    for response in pending:
+        response.set_universe(_universe_slots[response.slot_universe_id])
+
+
+def bench(slot_count: int = 672, selected: int = 300, rounds: int = 2000) -> List[Tuple[str, int, float]]:
+    """JSON / 비트맵 키프레임의 저장 크기(바이트)와 복원 시간(마이크로초) 비교
+
+    기본값: 2주 × 하루 48개(30분) 슬롯 중 300개 선택
+    """
+    import random
+    import timeit
+
+    universe = SlotUniverse(id=0, room_id="bench", digest="")
+    universe.set_slots([f"2025-03-{day:02d}|{minutes // 60:02d}:{minutes % 60:02d}" for day in range(1, 15) for minutes in range(0, 24 * 60, 30)][:slot_count])
+    slots = universe.get_slots()
+    data = {"available_time_slots": random.Random(0).sample(slots, selected)}
+
+    as_json = Response(response_data=data)
+    as_bitmap = Response()
+    as_bitmap.set_bitmap_data(universe, data, ["available_time_slots"])
+
+    def decode_json():
+        as_json.__dict__.pop("_data", None)
+        return as_json.response_data
+
+    def decode_bitmap():
+        as_bitmap.__dict__.pop("_data", None)
+        return as_bitmap.response_data
+
+    results = []
+    for label, response, decode in (("json", as_json, decode_json), ("bitmap", as_bitmap, decode_bitmap)):
+        size = len(response._response_data.encode()) + len(response.slot_bitmap or b"")
+        seconds = timeit.timeit(decode, number=rounds) / rounds
+        results.append((label, size, seconds * 1e6))
+    return results
+
+
+if __name__ == "__main__":
+    for label, size, micros in bench():
+        print(f"{label:7s} {size:6d} bytes  {micros:8.1f} us/decode")
@@ -0,0 +1,57 @@
+from typing import Dict, List, Tuple
+from sqlalchemy import update
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.models.participant import Participant
+from datetime import datetime
+import uuid
+
+# INSERT ... ON CONFLICT를 지원하는 방언별 insert
+UPSERT_INSERTS = {
+    "sqlite": sqlite.insert,
+    "postgresql": postgresql.insert,
+}
+
+
+async def allocate_version(db: AsyncSession, participant_id: str) -> int:
+    """참여자의 다음 응답 버전 발급 (커밋은 호출자가 수행)
+
+    참여자 행의 카운터를 UPDATE ... RETURNING 한 번으로 올리므로 기존 응답 수와 무관하게 O(1)이고,
+    행 잠금(SQLite는 쓰기 잠금) 때문에 동시에 제출해도 같은 버전이 나오지 않는다.
+    응답 INSERT와 같은 트랜잭션에서 호출하면 롤백 시 카운터도 함께 되돌아가 버전에 빈 번호가 생기지 않는다.
+    """
+    return await db.scalar(
+        update(Participant)
+        .where(Participant.id == participant_id)
+        .values(response_version=Participant.response_version + 1)
+        .returning(Participant.response_version)
+    )
+
+
+async def upsert_participant_version(db: AsyncSession, room_id: str, name: str) -> Tuple[Participant, bool]:
+    """(room_id, name) 참여자를 만들거나 찾으면서 다음 응답 버전을 발급 (커밋은 호출자가 수행)
+
+    INSERT ... ON CONFLICT (room_id, name) DO UPDATE 한 문장으로 참여자 생성과 버전 카운터 증가를 함께 처리한다.
+    반환: (response_version이 새 버전인 참여자, 새로 만들어졌는지 여부)
+    """
+    return (await upsert_participant_versions(db, room_id, [name]))[name]
+
+
+async def upsert_participant_versions(db: AsyncSession, room_id: str, names: List[str]) -> Dict[str, Tuple[Participant, bool]]:
+    """여러 이름에 대한 upsert_participant_version()을 한 문장으로 (names에 같은 이름이 두 번 있으면 안 됨)
+
+    반환: 이름 -> (참여자, 새로 만들어졌는지 여부)
+    """
+    created_at = datetime.utcnow()
+    new_ids = {name: str(uuid.uuid4()) for name in names}
+    insert = UPSERT_INSERTS[db.bind.dialect.name]
+    statement = insert(Participant).values([
+        {"id": new_ids[name], "room_id": room_id, "name": name, "response_version": 1, "created_at": created_at}
+        for name in names
+    ])
+    statement = statement.on_conflict_do_update(
+        index_elements=[Participant.room_id, Participant.name],
+        set_={"response_version": Participant.response_version + 1}
+    ).returning(Participant)
+    participants = await db.scalars(statement, execution_options={"populate_existing": True})
+    return {participant.name: (participant, participant.id == new_ids[participant.name]) for participant in participants}
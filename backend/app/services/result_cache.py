@@ -0,0 +1,229 @@
+"""최적 시간대 계산 결과 캐시
+
+키에 방 ID와 방 변경 버전(Room.change_version)이 들어가므로 쓰기 이후에는 이전 결과가 조회되지 않고,
+bump_room_version()이 해당 방의 항목만 지워 메모리를 바로 돌려준다.
+값은 렌더링된 JSON 바이트를 그대로 저장한다.
+
+환경 변수
+- RESULT_CACHE: memory(기본) | external | off
+- RESULT_CACHE_URL: external 백엔드의 Redis URL (redis 패키지 필요)
+- RESULT_CACHE_TTL: 항목 유효 시간(초, 기본 300)
+- RESULT_CACHE_MAX_BYTES: memory 백엔드의 최대 저장 크기(바이트, 기본 32MB)
+- RESULT_CACHE_MAX_ENTRIES: memory 백엔드의 최대 항목 수 (기본 10000)
+"""
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Optional, Set, Tuple
+import os
+import time
+
+RESULT_CACHE = os.getenv("RESULT_CACHE", "memory")
+RESULT_CACHE_URL = os.getenv("RESULT_CACHE_URL", "redis://localhost:6379/0")
+RESULT_CACHE_TTL = int(os.getenv("RESULT_CACHE_TTL", "300"))
+RESULT_CACHE_MAX_BYTES = int(os.getenv("RESULT_CACHE_MAX_BYTES", str(32 * 1024 * 1024)))
+RESULT_CACHE_MAX_ENTRIES = int(os.getenv("RESULT_CACHE_MAX_ENTRIES", "10000"))
+
+
+class CacheBackend(ABC):
+    """캐시 저장소 인터페이스 (키는 문자열, 값은 바이트)"""
+
+    @abstractmethod
+    async def get(self, key: str) -> Optional[bytes]:
+        ...
+
+    @abstractmethod
+    async def set(self, room_id: str, key: str, value: bytes, ttl: int) -> None:
+        ...
+
+    @abstractmethod
+    async def invalidate(self, room_id: str) -> None:
+        """방의 모든 항목 삭제"""
+
+    def stats(self) -> Dict[str, Any]:
+        return {}
+
+
+class MemoryBackend(CacheBackend):
+    """프로세스 내 LRU (TTL 만료 + 전체 바이트 수/항목 수 상한)"""
+
+    def __init__(self, max_bytes: int, max_entries: int = RESULT_CACHE_MAX_ENTRIES):
+        self.max_bytes = max_bytes
+        self.max_entries = max_entries
+        self.entries: "OrderedDict[str, Tuple[str, float, bytes]]" = OrderedDict()  # key -> (room_id, 만료 시각, 값)
+        self.room_keys: Dict[str, Set[str]] = {}
+        self.size = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    async def get(self, key: str) -> Optional[bytes]:
+        entry = self.entries.get(key)
+        if entry is None:
+            return None
+        if entry[1] <= time.monotonic():
+            self.expirations += 1
+            self._remove(key)
+            return None
+        self.entries.move_to_end(key)
+        return entry[2]
+
+    async def set(self, room_id: str, key: str, value: bytes, ttl: int) -> None:
+        if len(value) > self.max_bytes:
+            return
+        if key in self.entries:
+            self._remove(key)
+        self.entries[key] = (room_id, time.monotonic() + ttl, value)
+        self.room_keys.setdefault(room_id, set()).add(key)
+        self.size += len(value)
+
+        # 가장 오래 사용하지 않은 항목부터 제거
+        while self.size > self.max_bytes or len(self.entries) > self.max_entries:
+            self.evictions += 1
+            self._remove(next(iter(self.entries)))
+
+    async def invalidate(self, room_id: str) -> None:
+        for key in self.room_keys.pop(room_id, ()):
+            self._remove(key)
+
+    def _remove(self, key: str) -> None:
+        room_id, _, value = self.entries.pop(key)
+        self.size -= len(value)
+        keys = self.room_keys.get(room_id)
+        if keys is not None:
+            keys.discard(key)
+            if not keys:
+                del self.room_keys[room_id]
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "entries": len(self.entries),
+            "bytes": self.size,
+            "max_bytes": self.max_bytes,
+            "max_entries": self.max_entries,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+        }
+
+
+class ExternalBackend(CacheBackend):
+    """외부 키-값 저장소 백엔드 (redis.asyncio.Redis와 같은 get/set/delete/sadd/smembers/expire 인터페이스)
+
+    방별 키 목록을 집합으로 함께 저장해 두고 무효화할 때 한 번에 지운다.
+    만료와 메모리 상한은 저장소 설정(TTL, maxmemory)을 따른다.
+    """
+
+    def __init__(self, client: Any, prefix: str = "yakjeong:result:"):
+        self.client = client
+        self.prefix = prefix
+
+    async def get(self, key: str) -> Optional[bytes]:
+        return await self.client.get(self.prefix + key)
+
+    async def set(self, room_id: str, key: str, value: bytes, ttl: int) -> None:
+        index = f"{self.prefix}room:{room_id}"
+        await self.client.set(self.prefix + key, value, ex=ttl)
+        await self.client.sadd(index, self.prefix + key)
+        await self.client.expire(index, ttl)
+
+    async def invalidate(self, room_id: str) -> None:
+        index = f"{self.prefix}room:{room_id}"
+        keys = await self.client.smembers(index)
+        await self.client.delete(index, *keys)
+
+
+class LocalStore:
+    """ExternalBackend가 기대하는 클라이언트 인터페이스의 프로세스 내 구현 (개발/검증용 대역)"""
+
+    def __init__(self):
+        self.values: Dict[str, Tuple[Optional[float], Any]] = {}
+
+    def _live(self, key: str) -> Optional[Any]:
+        entry = self.values.get(key)
+        if entry is None:
+            return None
+        if entry[0] is not None and entry[0] <= time.monotonic():
+            del self.values[key]
+            return None
+        return entry[1]
+
+    async def get(self, key: str) -> Optional[bytes]:
+        return self._live(key)
+
+    async def set(self, key: str, value: bytes, ex: Optional[int] = None) -> None:
+        self.values[key] = (time.monotonic() + ex if ex else None, value)
+
+    async def sadd(self, key: str, *members: str) -> None:
+        members_set = self._live(key) or set()
+        members_set.update(members)
+        expires = self.values[key][0] if key in self.values else None
+        self.values[key] = (expires, members_set)
+
+    async def smembers(self, key: str) -> Set[str]:
+        return set(self._live(key) or ())
+
+    async def expire(self, key: str, seconds: int) -> None:
+        if self._live(key) is not None:
+            self.values[key] = (time.monotonic() + seconds, self.values[key][1])
+
+    async def delete(self, *keys: str) -> None:
+        for key in keys:
+            self.values.pop(key, None)
+
+
+class ResultCache:
+    """백엔드 앞에서 적중/실패/무효화 횟수를 세는 캐시"""
+
+    def __init__(self, backend: Optional[CacheBackend], ttl: int = RESULT_CACHE_TTL):
+        self.backend = backend
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+
+    async def get_or_compute(self, room_id: str, key: str, compute: Callable[[], Awaitable[bytes]]) -> bytes:
+        """캐시된 값이 있으면 반환하고, 없으면 compute() 결과를 저장 후 반환"""
+        if self.backend is None:
+            return await compute()
+
+        value = await self.backend.get(key)
+        if value is not None:
+            self.hits += 1
+            return value
+
+        self.misses += 1
+        value = await compute()
+        await self.backend.set(room_id, key, value, self.ttl)
+        return value
+
+    async def invalidate(self, room_id: str) -> None:
+        if self.backend is None:
+            return
+        self.invalidations += 1
+        await self.backend.invalidate(room_id)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "backend": type(self.backend).__name__ if self.backend else None,
+            "ttl": self.ttl,
+            "hits": self.hits,
+            "misses": self.misses,
+            "invalidations": self.invalidations,
+            **(self.backend.stats() if self.backend else {}),
+        }
+
+
+def create_backend(kind: str = RESULT_CACHE) -> Optional[CacheBackend]:
+    if kind == "off":
+        return None
+    if kind == "external":
+        import redis.asyncio as redis  # 선택 의존성
+
+        return ExternalBackend(redis.from_url(RESULT_CACHE_URL))
+    return MemoryBackend(RESULT_CACHE_MAX_BYTES)
+
+
+result_cache = ResultCache(create_backend())
+
+
+def optimal_times_key(room_id: str, change_version: int, *params: Any) -> str:
+    """최적 시간대 결과 키 (방 변경 버전 + 조회 옵션)"""
+    return ":".join(["optimal-times", room_id, str(change_version), *map(str, params)])
@@ -0,0 +1,45 @@
+from typing import Any, Dict, Optional
+from sqlalchemy import update
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.models.room import Room
+from app.services.result_cache import result_cache
+from app.services.room_events import room_events
+
+
+async def bump_room_version(db: AsyncSession, room_id: str) -> int:
+    """방의 변경 버전을 올리고 방의 결과 캐시를 비움 (방/참여자/응답을 바꾸는 쓰기와 같은 트랜잭션에서 호출, 커밋은 호출자가 수행)
+
+    updated_at은 방 정보 자체가 바뀐 경우에만 갱신되도록 그대로 둔다.
+    캐시 키에 변경 버전이 들어가므로 커밋 전에 비워도 이전 버전 결과가 다시 조회되지 않는다.
+    새 변경 버전을 반환한다.
+    """
+    version = await db.scalar(
+        update(Room)
+        .where(Room.id == room_id)
+        .values(change_version=Room.change_version + 1, updated_at=Room.updated_at)
+        .returning(Room.change_version)
+    )
+    await result_cache.invalidate(room_id)
+    return version
+
+
+def publish_room_change(
+    room_id: str,
+    version: int,
+    change: str,
+    participant: Optional[str] = None,
+    aggregate: Optional[Dict[str, Any]] = None
+) -> None:
+    """커밋된 변경을 방 이벤트 구독자에게 알림 (커밋 후 호출)
+
+    aggregate(apply_participant_change 결과)가 있으면 바뀐 슬롯의 새 인원수와 응답자 수를 함께 보내고,
+    없으면(방 정보 변경, 집계 미생성 등) 클라이언트가 전체를 다시 받도록 resync를 표시한다.
+    """
+    data: Dict[str, Any] = {"change": change, "version": version}
+    if participant is not None:
+        data["participant"] = participant
+    if aggregate is not None:
+        data.update(aggregate)
+    else:
+        data["resync"] = True
+    room_events.publish(room_id, "change", data, event_id=version)
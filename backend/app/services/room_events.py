@@ -0,0 +1,103 @@
+"""방별 변경 이벤트 pub/sub (Server-Sent Events 스트림용, 프로세스 내)
+
+쓰기 요청이 커밋 후 publish()로 집계 변화를 한 번 직렬화해 보내면, 구독자들은 같은 문자열을 받아 그대로 전송한다.
+구독자마다 큐 크기가 제한되어 있고, 큐가 가득 찬(따라오지 못하는) 구독자는 끊는다.
+끊긴 클라이언트는 EventSource가 다시 연결하면서 전체 결과를 새로 받는다.
+
+여러 워커 프로세스로 실행하면 같은 프로세스에 연결된 구독자에게만 전달된다.
+"""
+from typing import Any, Dict, Optional, Set
+from app import json_codec
+import asyncio
+import os
+
+ROOM_EVENTS_QUEUE_SIZE = int(os.getenv("ROOM_EVENTS_QUEUE_SIZE", "32"))
+
+
+class Subscription:
+    """구독자 한 명의 이벤트 큐"""
+
+    def __init__(self, room_id: str, maxsize: int):
+        self.room_id = room_id
+        self.queue: "asyncio.Queue[Optional[str]]" = asyncio.Queue(maxsize)
+        self.dropped = False
+
+    def push(self, frame: str) -> bool:
+        """이벤트를 큐에 넣음 (가득 차면 False)"""
+        try:
+            self.queue.put_nowait(frame)
+            return True
+        except asyncio.QueueFull:
+            return False
+
+    def drop(self) -> None:
+        """느린 구독자 끊기 (대기 중인 이벤트를 버리고 종료 신호를 넣음)"""
+        self.dropped = True
+        while not self.queue.empty():
+            self.queue.get_nowait()
+        self.queue.put_nowait(None)
+
+    async def next(self, timeout: float) -> Optional[str]:
+        """다음 이벤트 (timeout 동안 없으면 빈 문자열, 끊기면 None)"""
+        try:
+            return await asyncio.wait_for(self.queue.get(), timeout)
+        except asyncio.TimeoutError:
+            return ""
+
+
+class RoomEventHub:
+    def __init__(self, queue_size: int = ROOM_EVENTS_QUEUE_SIZE):
+        self.queue_size = queue_size
+        self.subscribers: Dict[str, Set[Subscription]] = {}
+        self.published = 0
+        self.dropped = 0
+
+    def subscribe(self, room_id: str) -> Subscription:
+        subscription = Subscription(room_id, self.queue_size)
+        self.subscribers.setdefault(room_id, set()).add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription) -> None:
+        subscriptions = self.subscribers.get(subscription.room_id)
+        if subscriptions is not None:
+            subscriptions.discard(subscription)
+            if not subscriptions:
+                del self.subscribers[subscription.room_id]
+
+    def publish(self, room_id: str, event: str, data: Dict[str, Any], event_id: Optional[int] = None) -> int:
+        """방 구독자들에게 이벤트 전송 (직렬화는 한 번만) 후 전달한 구독자 수 반환"""
+        subscriptions = self.subscribers.get(room_id)
+        if not subscriptions:
+            return 0
+
+        frame = format_event(event, data, event_id)
+        self.published += 1
+        delivered = 0
+        for subscription in list(subscriptions):
+            if subscription.push(frame):
+                delivered += 1
+            else:
+                self.dropped += 1
+                subscription.drop()
+                self.unsubscribe(subscription)
+        return delivered
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "rooms": len(self.subscribers),
+            "subscribers": sum(len(subscriptions) for subscriptions in self.subscribers.values()),
+            "published": self.published,
+            "dropped": self.dropped,
+        }
+
+
+def format_event(event: str, data: Dict[str, Any], event_id: Optional[int] = None) -> str:
+    """SSE 프레임 (event/id/data 필드)"""
+    lines = [f"event: {event}"]
+    if event_id is not None:
+        lines.append(f"id: {event_id}")
+    lines.append(f"data: {json_codec.dumps(data)}")
+    return "\n".join(lines) + "\n\n"
+
+
+room_events = RoomEventHub()
@@ -1,111 +1,342 @@
-from typing import List, Dict, Any, Optional
-from collections import defaultdict
+from typing import List, Dict, Any, Optional, Callable, Iterable, Tuple
+import heapq
+import operator
+import re
+from app.services.availability import AvailabilityMatrix, SLOT_MINUTES, format_minutes, sliding_reduce
+from app.services.worker_pool import run_cpu_bound
+
+# 연속 구간 점수 방식
+# - all: 구간 전체에 참여 가능한 인원 기준
+# - count: 구간 내 슬롯별 참여 인원 합계(평균 참여율) 기준 (참여자 목록/인원수는 두 방식 모두 구간 전체 참석 가능 인원)
+WINDOW_SCORINGS = ("all", "count")
+
+# 블럭 슬롯 키 'YYYY-MM-DD-blockId'의 날짜 부분
+_DATE_PREFIX = re.compile(r"\d{4}-\d{2}-\d{2}$")
 
 class ScheduleOptimizer:
     def __init__(self, room_type: int):
         self.room_type = room_type
-    
-    async def find_optimal_times(self, responses: List[Dict[str, Any]], room_settings: Optional[Dict[str, Any]] = None) -> List[Dict[str, Any]]:
-        """최적의 시간대 찾기"""
+
+    async def find_optimal_times(
+        self,
+        responses: List[Dict[str, Any]],
+        room_settings: Optional[Dict[str, Any]] = None,
+        duration: Optional[int] = None,
+        scoring: str = "all",
+        limit: Optional[int] = None,
+        min_count: Optional[int] = None,
+        min_rate: Optional[float] = None
+    ) -> List[Dict[str, Any]]:
+        """최적의 시간대 찾기
+
+        - duration(분): 시간 기준 방에서 연속 구간 단위로 계산
+        - limit: 상위 limit개만 부분 선택 (힙 기반)
+        - min_count / min_rate: 참여 인원수 / 참여율 하한
+        """
         if not responses:
             return []
-            
+
+        # 큰 방의 계산은 워커 풀에서 실행하여 이벤트 루프를 막지 않음
+        # (크기는 응답을 훑지 않고 응답 수 × 방의 슬롯 수로 어림, 설정이 없으면 첫 응답의 슬롯 수)
+        slot_count = self.slot_count(room_settings) or len(self.extract_slots(responses[0].get('response_data', {})))
+        size = len(responses) * slot_count
+        return await run_cpu_bound(
+            self.optimal_times_from_responses,
+            responses, room_settings, duration, scoring, limit, min_count, min_rate,
+            size=size
+        )
+
+    async def find_optimal_times_from_tally(
+        self,
+        participant_names: List[str],
+        slot_members: List[Tuple[str, List[int]]],
+        total: int,
+        room_settings: Optional[Dict[str, Any]] = None,
+        duration: Optional[int] = None,
+        scoring: str = "all",
+        limit: Optional[int] = None,
+        min_count: Optional[int] = None,
+        min_rate: Optional[float] = None
+    ) -> List[Dict[str, Any]]:
+        """방 슬롯 집계(slot_tally.load_room_slots)로부터 최적의 시간대 찾기 (옵션은 find_optimal_times와 동일)"""
+        if not total:
+            return []
+
+        size = len(participant_names) * len(slot_members)
+        return await run_cpu_bound(
+            self.optimal_times_from_tally,
+            participant_names, slot_members, total, room_settings, duration, scoring, limit, min_count, min_rate,
+            size=size
+        )
+
+    def optimal_times_from_responses(
+        self,
+        responses: List[Dict[str, Any]],
+        room_settings: Optional[Dict[str, Any]] = None,
+        *options: Any
+    ) -> List[Dict[str, Any]]:
+        """find_optimal_times의 동기 계산부 (워커에서 실행)"""
+        matrix = self.build_matrix(responses, room_settings)
+        return self.rank(matrix, len(responses), *options)
+
+    def optimal_times_from_tally(
+        self,
+        participant_names: List[str],
+        slot_members: List[Tuple[str, List[int]]],
+        total: int,
+        room_settings: Optional[Dict[str, Any]] = None,
+        *options: Any
+    ) -> List[Dict[str, Any]]:
+        """find_optimal_times_from_tally의 동기 계산부 (워커에서 실행)"""
+        matrix = self.build_matrix_from_tally(participant_names, slot_members, room_settings)
+        return self.rank(matrix, total, *options)
+
+    def slot_count(self, room_settings: Optional[Dict[str, Any]]) -> int:
+        """방 설정에서 선택 가능한 슬롯 수 (슬롯 키를 만들지 않고 날짜별 목록 길이만 더함, 설정이 없으면 0)"""
+        if not room_settings:
+            return 0
+        if self.room_type == 1:
+            return sum(len(times) for times in (room_settings.get('time_slots_by_date') or {}).values())
+        if self.room_type == 2:
+            blocks_by_date = room_settings.get('block_slots_by_date')
+            if blocks_by_date:
+                return sum(len(blocks) for blocks in blocks_by_date.values())
+            return len(room_settings.get('time_blocks') or ()) * len(room_settings.get('selected_dates') or ())
+        return len(room_settings.get('selected_dates') or ())
+
+    def extract_slots(self, response_data: Dict[str, Any]) -> List[str]:
+        """응답 데이터에서 방 유형에 맞는 원본 슬롯 키 목록 추출 (중복 제거, 순서 유지)
+
+        - 시간 기준: available_time_slots ('YYYY-MM-DD|HH:MM') + available_times (이전 구조)
+        - 블럭 기준: available_block_slots ('YYYY-MM-DD-blockId') + available_blocks (이전 구조)
+        - 날짜 기준: available_dates ('YYYY-MM-DD')
+        """
         if self.room_type == 1:  # 시간 기준
-            return await self._optimize_hourly_schedule(responses)
+            keys = ('available_time_slots', 'available_times')
         elif self.room_type == 2:  # 블럭 기준
-            return await self._optimize_block_schedule(responses, room_settings)
+            keys = ('available_block_slots', 'available_blocks')
         else:  # 날짜 기준
-            return await self._optimize_daily_schedule(responses)
-    
-    async def _optimize_hourly_schedule(self, responses: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
-        """시간 단위 최적화 알고리즘"""
-        time_availability = defaultdict(list)
-        
-        # 각 참여자의 가능한 시간대 수집
+            keys = ('available_dates',)
+
+        slots = {}
+        for key in keys:
+            # Set이 객체로 직렬화된 경우 키를 슬롯으로 사용
+            for slot in response_data.get(key) or ():
+                if isinstance(slot, str):
+                    slots[slot] = None
+        return list(slots)
+
+    def split_slot(self, slot: str) -> Tuple[str, str]:
+        """슬롯 키를 (날짜, 시간/블럭 ID)로 분리 (날짜가 없는 이전 구조는 빈 문자열)"""
+        if self.room_type == 1:  # 시간 기준
+            date, _, time = slot.rpartition('|')
+            return date, time
+        elif self.room_type == 2:  # 블럭 기준
+            if len(slot) > 11 and slot[10] == '-' and _DATE_PREFIX.match(slot[:10]):
+                return slot[:10], slot[11:]
+            return '', slot
+        else:  # 날짜 기준
+            return slot, ''
+
+    def build_matrix(self, responses: List[Dict[str, Any]], room_settings: Optional[Dict[str, Any]] = None) -> AvailabilityMatrix:
+        """참여자별 응답을 가용성 행렬로 수집"""
+        matrix = AvailabilityMatrix()
+        label = self.slot_labeler(room_settings)
+
         for response in responses:
             participant_name = response.get('participant_name', 'Unknown')
-            available_times = response.get('response_data', {}).get('available_times', [])
-            
-            for time_slot in available_times:
-                time_availability[time_slot].append(participant_name)
-        
-        # 참여 가능 인원수 기준으로 정렬
-        optimal_times = []
-        for time_slot, participants in time_availability.items():
-            optimal_times.append({
-                'time_slot': time_slot,
-                'available_participants': participants,
-                'participant_count': len(participants),
-                'availability_rate': len(participants) / len(responses) if responses else 0
+            slots = self.extract_slots(response.get('response_data', {}))
+            matrix.add_participant(participant_name, (label(slot) for slot in slots))
+
+        return matrix
+
+    def build_matrix_from_tally(
+        self,
+        participant_names: List[str],
+        slot_members: Iterable[Tuple[str, Iterable[int]]],
+        room_settings: Optional[Dict[str, Any]] = None
+    ) -> AvailabilityMatrix:
+        """슬롯별 참여자 위치(participant_names 인덱스) 집계로부터 가용성 행렬 구성"""
+        matrix = AvailabilityMatrix()
+        label = self.slot_labeler(room_settings)
+
+        for name in participant_names:
+            matrix.add_participant(name, ())
+        for slot, positions in slot_members:
+            matrix.add_slot_members(label(slot), positions)
+
+        return matrix
+
+    def group_by_date(
+        self,
+        participant_names: List[str],
+        slot_members: Iterable[Tuple[str, Iterable[int]]],
+        total: int,
+        room_settings: Optional[Dict[str, Any]] = None
+    ) -> List[Dict[str, Any]]:
+        """슬롯별 참여자 집계를 날짜 -> 시간/블럭 단위로 묶음 (날짜, 시간/블럭 순 정렬)"""
+        block_order = {}
+        block_labels = self._block_labels(room_settings)
+        if self.room_type == 2:
+            block_order = {block_id: order for order, block_id in enumerate(block_labels)}
+
+        dates: Dict[str, List[Dict[str, Any]]] = {}
+        for slot, positions in slot_members:
+            names = [participant_names[position] for position in sorted(positions)]
+            if not names:
+                continue
+            date, key = self.split_slot(slot)
+            dates.setdefault(date, []).append({
+                'slot': key,
+                'label': block_labels.get(key, key),
+                'available_participants': names,
+                'participant_count': len(names),
+                'availability_rate': len(names) / total if total else 0
             })
-        
-        # 참여 가능 인원수 내림차순 정렬
-        optimal_times.sort(key=lambda x: x['participant_count'], reverse=True)
-        
-        return optimal_times
-    
-    async def _optimize_block_schedule(self, responses: List[Dict[str, Any]], room_settings: Optional[Dict[str, Any]] = None) -> List[Dict[str, Any]]:
-        """블럭 단위 최적화 알고리즘"""
-        block_availability = defaultdict(list)
-        
-        # 방 설정에서 커스텀 블럭 정보 가져오기
-        custom_blocks = {}
+
+        return [
+            {
+                'date': date,
+                'slots': sorted(dates[date], key=lambda item: (block_order.get(item['slot'], len(block_order)), item['slot']))
+            }
+            for date in sorted(dates)
+        ]
+
+    def rank(
+        self,
+        matrix: AvailabilityMatrix,
+        total: int,
+        duration: Optional[int] = None,
+        scoring: str = "all",
+        limit: Optional[int] = None,
+        min_count: Optional[int] = None,
+        min_rate: Optional[float] = None
+    ) -> List[Dict[str, Any]]:
+        """가용성 행렬에서 최적 시간대 목록 계산 (total: 응답한 참여자 수)"""
+        threshold = _Threshold(total, min_count, min_rate)
+        if self.room_type == 1 and duration:
+            return self._rank_windows(matrix, total, duration, scoring, limit, threshold)
+        return self._rank_slots(matrix, total, limit, threshold)
+
+    def slot_labeler(self, room_settings: Optional[Dict[str, Any]]) -> Callable[[str], str]:
+        """슬롯 키 -> 표시용 라벨 변환 함수 (블럭 기준 방은 커스텀 블럭 이름 사용, 그 외는 키 그대로)"""
+        if self.room_type != 2:
+            return lambda slot: slot
+
+        block_labels = self._block_labels(room_settings)
+        cache: Dict[str, str] = {}
+
+        def label(slot: str) -> str:
+            cached = cache.get(slot)
+            if cached is None:
+                date, block_id = self.split_slot(slot)
+                block_label = block_labels.get(block_id, block_id)
+                cached = cache[slot] = f"{date}|{block_label}" if date else block_label
+            return cached
+
+        return label
+
+    def _block_labels(self, room_settings: Optional[Dict[str, Any]]) -> Dict[str, str]:
+        """블럭 ID -> 표시용 라벨 매핑"""
+        labels = {}
         if room_settings and 'time_blocks' in room_settings:
             for block in room_settings['time_blocks']:
-                custom_blocks[block['id']] = block
-        
-        # 각 참여자의 가능한 블럭 수집
-        for response in responses:
-            participant_name = response.get('participant_name', 'Unknown')
-            available_blocks = response.get('response_data', {}).get('available_blocks', [])
-            
-            for block_id in available_blocks:
-                # 커스텀 블럭이 있으면 해당 정보 사용, 없으면 기본 블럭으로 처리
-                if block_id in custom_blocks:
-                    block_info = custom_blocks[block_id]
-                    block_key = f"{block_info['name']} ({block_info['time_range']})"
-                else:
-                    # 기본 블럭 처리 (하위 호환성)
-                    block_key = block_id
-                
-                block_availability[block_key].append(participant_name)
-        
-        # 참여 가능 인원수 기준으로 정렬
-        optimal_times = []
-        for block_key, participants in block_availability.items():
-            optimal_times.append({
-                'time_slot': block_key,
-                'available_participants': participants,
-                'participant_count': len(participants),
-                'availability_rate': len(participants) / len(responses) if responses else 0
-            })
-        
-        optimal_times.sort(key=lambda x: x['participant_count'], reverse=True)
-        
-        return optimal_times
-    
-    async def _optimize_daily_schedule(self, responses: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
-        """날짜 단위 최적화 알고리즘"""
-        date_availability = defaultdict(list)
-        
-        # 각 참여자의 가능한 날짜 수집
-        for response in responses:
-            participant_name = response.get('participant_name', 'Unknown')
-            available_dates = response.get('response_data', {}).get('available_dates', [])
-            
-            for date in available_dates:
-                date_availability[date].append(participant_name)
-        
-        # 참여 가능 인원수 기준으로 정렬
-        optimal_times = []
-        for date, participants in date_availability.items():
-            optimal_times.append({
-                'time_slot': date,
+                labels[block['id']] = f"{block['name']} ({block['time_range']})"
+        return labels
+
+    def _rank_slots(self, matrix: AvailabilityMatrix, total: int, limit: Optional[int], threshold: "_Threshold") -> List[Dict[str, Any]]:
+        """슬롯별 인원수로 정렬하고 반환되는 슬롯만 참여자 목록으로 펼침"""
+        counts = matrix.counts()
+
+        # 참여 가능 인원수 내림차순 (동률이면 처음 등장한 순서 유지)
+        candidates = [index for index, count in enumerate(counts) if threshold.accepts(count, count)]
+        order = _select(candidates, lambda index: (-counts[index], index), limit)
+
+        return [
+            {
+                'time_slot': matrix.slots[index],
+                'available_participants': matrix.names_for(index),
+                'participant_count': counts[index],
+                'availability_rate': counts[index] / total if total else 0
+            }
+            for index in order
+        ]
+
+    def _rank_windows(
+        self,
+        matrix: AvailabilityMatrix,
+        total: int,
+        duration: int,
+        scoring: str,
+        limit: Optional[int],
+        threshold: "_Threshold"
+    ) -> List[Dict[str, Any]]:
+        """날짜별 연속 구간(duration 분)을 슬라이딩 비트 연산/누적합으로 점수화하여 정렬
+
+        참여자 목록/인원수는 어느 방식이든 구간 전체에 참여 가능한 인원(구간 내 열 비트마스크의 AND)이고,
+        count 방식은 정렬 점수와 참여율만 구간 내 슬롯별 인원수 합계(평균 참여 인원)로 계산한다.
+        """
+        width = duration // SLOT_MINUTES
+        candidates = []  # (점수, 날짜, 시작 분, 구간 전체 참여자 비트마스크)
+
+        for date, (start, masks) in matrix.time_axes().items():
+            full = sliding_reduce(masks, width)
+            if scoring == "count":
+                # 슬롯별 인원수 누적합으로 구간 합계를 O(1)에 계산
+                prefix = [0]
+                for mask in masks:
+                    prefix.append(prefix[-1] + mask.bit_count())
+                for offset, mask in enumerate(full):
+                    attendance = prefix[offset + width] - prefix[offset]
+                    if threshold.accepts(mask.bit_count(), attendance / width):
+                        candidates.append((attendance, date, start + offset * SLOT_MINUTES, mask))
+            else:
+                for offset, mask in enumerate(full):
+                    count = mask.bit_count()
+                    if threshold.accepts(count, count):
+                        candidates.append((count, date, start + offset * SLOT_MINUTES, mask))
+
+        # 점수 내림차순, 동점이면 이른 날짜/시간 우선
+        selected = _select(candidates, lambda candidate: (-candidate[0], candidate[1], candidate[2]), limit)
+
+        results = []
+        for score, date, start, mask in selected:
+            participants = matrix.names_for_mask(mask)
+            if scoring == "count":
+                rate = score / (width * total) if total else 0
+            else:
+                rate = score / total if total else 0
+            results.append({
+                'time_slot': f"{date}|{format_minutes(start)}-{format_minutes(start + duration)}",
                 'available_participants': participants,
                 'participant_count': len(participants),
-                'availability_rate': len(participants) / len(responses) if responses else 0
+                'availability_rate': rate
             })
-        
-        optimal_times.sort(key=lambda x: x['participant_count'], reverse=True)
-        
-        return optimal_times
+
+        return results
+
+
+class _Threshold:
+    """참여 인원수 / 참여율 하한 (아무도 참여할 수 없는 후보는 항상 제외)"""
+
+    __slots__ = ("total", "min_count", "min_rate")
+
+    def __init__(self, total: int, min_count: Optional[int] = None, min_rate: Optional[float] = None):
+        self.total = total
+        self.min_count = min_count or 0
+        self.min_rate = min_rate
+
+    def accepts(self, count: int, attendance: float) -> bool:
+        """count: 후보 전체에 참여 가능한 인원수, attendance: 참여율 계산에 쓰이는 (평균) 인원수"""
+        if not attendance or count < self.min_count:
+            return False
+        if self.min_rate is not None and self.total and attendance / self.total < self.min_rate:
+            return False
+        return True
+
+
+def _select(candidates: List[Any], key: Callable[[Any], Any], limit: Optional[int]) -> List[Any]:
+    """limit이 있으면 힙으로 상위 limit개만 부분 선택, 없으면 전체 정렬"""
+    if limit is not None and limit < len(candidates):
+        return heapq.nsmallest(limit, candidates, key=key)
+    return sorted(candidates, key=key)
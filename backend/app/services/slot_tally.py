@@ -0,0 +1,368 @@
+"""방별 슬롯 집계(슬롯 -> 인원수, (슬롯, 참여자) 행) 관리
+
+응답이 바뀌는 쓰기 요청과 같은 트랜잭션 안에서 참여자 한 명분의 변화만 반영하여
+최적 시간대 조회가 전체 응답을 다시 읽지 않고 O(슬롯 수)로 끝나도록 한다.
+쓰기는 바뀐 슬롯의 인원수 행과 (슬롯, 참여자) 행만 고치므로 방 인원수와 무관하다.
+
+참여자의 현재 슬롯은 응답을 복원하지 않고 (슬롯, 참여자) 행에서 조회하며,
+PostgreSQL에서는 슬롯별 참여자 위치 목록을 서버 집계(array_agg)로 가져온다.
+
+    python -m app.services.slot_tally rebuild [room_id ...]   # 집계 재구축
+    python -m app.services.slot_tally check [room_id ...]     # 원본 응답과 집계 비교
+"""
+from typing import Any, Dict, List, Optional, Set, Tuple
+from collections import Counter
+from sqlalchemy import bindparam, delete, func, insert, select, update
+from sqlalchemy.dialects.postgresql import aggregate_order_by
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.models.room import Room
+from app.models.participant import Participant
+from app.models.response import Response
+from app.models.slot_tally import RoomTally, RoomSlotTally, RoomSlotMember
+from app.services.active_responses import get_active_response, load_active_responses
+from app.services.schedule_optimizer import ScheduleOptimizer
+from app.services.write_queue import write_queue
+import asyncio
+
+# 슬롯 추출 규칙(ScheduleOptimizer.extract_slots)이나 집계 저장 형식이 바뀌면 올려서 기존 집계를 재구축
+# (3: 슬롯별 참여자 ID JSON 배열 대신 (슬롯, 참여자) 행)
+TALLY_FORMAT_VERSION = 3
+
+# 방별로 진행 중인 집계 재구축 (같은 프로세스에서 동시에 몰린 첫 조회가 한 작업을 함께 기다림)
+_rebuilding: Dict[str, "asyncio.Future[RoomTally]"] = {}
+
+
+async def load_active_slots(db: AsyncSession, room: Room) -> Dict[str, Set[str]]:
+    """방 참여자별 활성 응답의 슬롯 집합 (활성 응답이 없는 참여자는 제외)"""
+    optimizer = ScheduleOptimizer(room.room_type)
+    return {
+        participant.id: set(optimizer.extract_slots(active_response.response_data))
+        for participant, active_response in await load_active_responses(db, room.id)
+    }
+
+
+async def lock_room(db: AsyncSession, room_id: str) -> None:
+    """방 행을 SELECT ... FOR UPDATE로 잠가 같은 방의 집계 변경을 커밋까지 한 트랜잭션씩 처리
+
+    집계 행은 읽어서 고친 뒤 다시 쓰므로, 동시에 쓰면 서로의 변경을 덮어쓰거나 같은 슬롯 행을 함께 INSERT할 수 있다.
+    참여자 행보다 먼저 잠가야 하므로(교착 방지) 쓰기 작업에서 참여자를 바꾸기 전에 호출한다.
+    SQLite는 쓰기 트랜잭션이 하나뿐이라 잠그지 않는다.
+    """
+    if db.bind.dialect.name != "sqlite":
+        await db.execute(select(Room.id).where(Room.id == room_id).with_for_update())
+
+
+async def participant_slots(db: AsyncSession, participant: Participant) -> Optional[Set[str]]:
+    """참여자의 현재 활성 응답 슬롯 집합 (활성 응답이 없으면 None)
+
+    쓰기 전에 호출해 두었다가 apply_participant_change()에 넘긴다. (방을 먼저 잠금)
+    방 집계가 있으면 응답을 복원하지 않고 집계에서 참여자가 들어 있는 슬롯을 조회한다.
+    """
+    await lock_room(db, participant.room_id)
+    if await get_room_tally(db, participant.room_id) is not None:
+        return await tallied_slots(db, participant)
+    return await response_slots(db, participant)
+
+
+async def response_slots(db: AsyncSession, participant: Participant) -> Optional[Set[str]]:
+    """참여자의 활성 응답을 읽어 만든 슬롯 집합 (활성 응답이 없으면 None)"""
+    active_response = await get_active_response(db, participant.id)
+    if not active_response:
+        return None
+    room = await db.get(Room, participant.room_id)
+    optimizer = ScheduleOptimizer(room.room_type)
+    return set(optimizer.extract_slots(active_response.response_data))
+
+
+async def tallied_slots(db: AsyncSession, participant: Participant) -> Optional[Set[str]]:
+    """방 집계에서 참여자가 들어 있는 슬롯 집합 (활성 응답이 없으면 None)"""
+    return (await tallied_participant_slots(db, participant.room_id, [participant.id]))[participant.id]
+
+
+async def tallied_participant_slots(db: AsyncSession, room_id: str, participant_ids: List[str]) -> Dict[str, Optional[Set[str]]]:
+    """여러 참여자의 방 집계상 슬롯 집합 (참여자 ID -> 슬롯 집합, 활성 응답이 없으면 None)"""
+    if not participant_ids:
+        return {}
+    active = set(await db.scalars(
+        select(Response.participant_id).where(
+            Response.participant_id.in_(participant_ids),
+            Response.is_active == True
+        ).distinct()
+    ))
+    slots: Dict[str, Set[str]] = {participant_id: set() for participant_id in active}
+    for slot, participant_id in await db.execute(
+        select(RoomSlotMember.slot, RoomSlotMember.participant_id).where(
+            RoomSlotMember.room_id == room_id,
+            RoomSlotMember.participant_id.in_(participant_ids)
+        )
+    ):
+        if participant_id in slots:
+            slots[participant_id].add(slot)
+    return {participant_id: slots.get(participant_id) for participant_id in participant_ids}
+
+
+async def get_room_tally(db: AsyncSession, room_id: str) -> Optional[RoomTally]:
+    """현재 형식으로 만들어진 방 집계 상태 (없거나 형식이 다르면 None)"""
+    tally = await db.get(RoomTally, room_id)
+    if tally is None or tally.format_version != TALLY_FORMAT_VERSION:
+        return None
+    return tally
+
+
+async def apply_participant_change(db: AsyncSession, participant: Participant, before: Optional[Set[str]], deleted: bool = False) -> Optional[Dict[str, Any]]:
+    """참여자 한 명의 활성 응답 변화(before -> 현재)를 방 집계에 반영 (커밋은 호출자가 수행)
+
+    반환: {"respondent_count": 응답자 수, "slots": {바뀐 슬롯: 새 인원수}} (실시간 이벤트용)
+    집계가 아직 없는 방은 건너뛰고(None 반환), 처음 조회할 때 재구축된다.
+    before를 구한 participant_slots()가 잡은 방 잠금 안에서 호출해야 한다.
+    """
+    tally = await get_room_tally(db, participant.room_id)
+    if tally is None:
+        return None
+
+    await db.flush()
+    after = None if deleted else await response_slots(db, participant)
+    return await apply_slot_changes(db, tally, {participant.id: (before, after)})
+
+
+async def apply_slot_changes(db: AsyncSession, tally: RoomTally, changes: Dict[str, Tuple[Optional[Set[str]], Optional[Set[str]]]]) -> Dict[str, Any]:
+    """참여자별 활성 응답 슬롯 변화 {참여자 ID: (before, after)}를 방 집계에 반영 (None은 활성 응답 없음)
+
+    바뀐 (슬롯, 참여자) 행만 추가/삭제하고 바뀐 슬롯의 인원수 행만 고친다. 반환은 apply_participant_change()와 같다.
+    """
+    room_id = tally.room_id
+    added: List[Dict[str, str]] = []
+    removed: List[Dict[str, str]] = []
+    deltas: Counter = Counter()
+    respondent_change = 0
+    for participant_id, (before, after) in changes.items():
+        before_slots = before or set()
+        after_slots = after or set()
+        for slot in sorted(after_slots - before_slots):
+            added.append({"room_id": room_id, "participant_id": participant_id, "slot": slot})
+            deltas[slot] += 1
+        for slot in sorted(before_slots - after_slots):
+            removed.append({"room": room_id, "participant": participant_id, "member_slot": slot})
+            deltas[slot] -= 1
+        respondent_change += (after is not None) - (before is not None)
+
+    if removed:
+        members = RoomSlotMember.__table__
+        await db.execute(
+            delete(members).where(
+                members.c.room_id == bindparam("room"),
+                members.c.participant_id == bindparam("participant"),
+                members.c.slot == bindparam("member_slot")
+            ),
+            removed
+        )
+    if added:
+        await db.execute(insert(RoomSlotMember), added)
+
+    counts: Dict[str, int] = {}
+    if deltas:
+        rows = {
+            row.slot: row
+            for row in await db.scalars(
+                select(RoomSlotTally).where(
+                    RoomSlotTally.room_id == room_id,
+                    RoomSlotTally.slot.in_(deltas)
+                )
+            )
+        }
+        for slot in sorted(deltas):
+            row = rows.get(slot)
+            count = (row.participant_count if row else 0) + deltas[slot]
+            if row is None:
+                db.add(RoomSlotTally(room_id=room_id, slot=slot, participant_count=count))
+            elif count > 0:
+                row.participant_count = count
+            else:
+                await db.delete(row)
+            counts[slot] = count
+
+    respondent_count = tally.respondent_count
+    if respondent_change:
+        respondent_count = await db.scalar(
+            update(RoomTally)
+            .where(RoomTally.room_id == room_id)
+            .values(respondent_count=RoomTally.respondent_count + respondent_change)
+            .returning(RoomTally.respondent_count)
+        )
+    return {"respondent_count": respondent_count, "slots": counts}
+
+
+async def rebuild_room(db: AsyncSession, room: Room) -> RoomTally:
+    """원본 응답으로부터 방 집계를 다시 만든다 (커밋은 호출자가 수행)"""
+    await lock_room(db, room.id)
+    active_slots = await load_active_slots(db, room)
+
+    await db.execute(delete(RoomSlotMember).where(RoomSlotMember.room_id == room.id))
+    await db.execute(delete(RoomSlotTally).where(RoomSlotTally.room_id == room.id))
+    members = [
+        {"room_id": room.id, "participant_id": participant_id, "slot": slot}
+        for participant_id, slots in active_slots.items()
+        for slot in sorted(slots)
+    ]
+    if members:
+        await db.execute(insert(RoomSlotMember), members)
+        counts = Counter(member["slot"] for member in members)
+        await db.execute(insert(RoomSlotTally), [
+            {"room_id": room.id, "slot": slot, "participant_count": count} for slot, count in sorted(counts.items())
+        ])
+
+    tally = await db.get(RoomTally, room.id)
+    if tally is None:
+        tally = RoomTally(room_id=room.id)
+        db.add(tally)
+    tally.format_version = TALLY_FORMAT_VERSION
+    tally.respondent_count = len(active_slots)
+    await db.flush()
+    return tally
+
+
+async def build_room_tally(room: Room) -> RoomTally:
+    """쓰기 큐에서 방 집계를 만들고 커밋된 집계 반환 (같은 방의 재구축이 진행 중이면 그 결과를 기다림)"""
+    pending = _rebuilding.get(room.id)
+    if pending is None:
+        pending = asyncio.ensure_future(write_queue.submit(lambda writer: ensure_room_tally(writer, room)))
+        _rebuilding[room.id] = pending
+        pending.add_done_callback(lambda _: _rebuilding.pop(room.id, None))
+    # 기다리던 요청 하나가 취소되어도 다른 요청이 기다리는 재구축은 계속
+    return await asyncio.shield(pending)
+
+
+async def ensure_room_tally(db: AsyncSession, room: Room) -> RoomTally:
+    """방 집계가 아직 없을 때만 재구축 (쓰기 작업, 커밋은 호출자가 수행)
+
+    다른 프로세스나 앞선 쓰기 작업이 이미 만들었을 수 있으므로 방을 잠근 뒤 다시 확인한다.
+    """
+    await lock_room(db, room.id)
+    tally = await get_room_tally(db, room.id)
+    if tally is None:
+        tally = await rebuild_room(db, room)
+    return tally
+
+
+async def load_room_slots(db: AsyncSession, room: Room) -> Tuple[List[str], List[Tuple[str, List[int]]], int]:
+    """집계 조회 (집계가 없으면 쓰기 큐에서 재구축)
+
+    반환: (참여자 이름 목록, [(슬롯 키, 참여자 이름 목록 내 위치들)], 응답자 수)
+    """
+    tally = await get_room_tally(db, room.id)
+    if tally is None:
+        tally = await build_room_tally(room)
+
+    participants = (await db.scalars(select(Participant).where(Participant.room_id == room.id).order_by(Participant.created_at, Participant.id))).all()
+    if db.bind.dialect.name == "postgresql":
+        return [participant.name for participant in participants], await aggregate_slot_positions(db, room), tally.respondent_count
+
+    positions = {participant.id: position for position, participant in enumerate(participants)}
+    members: Dict[str, List[int]] = {}
+    for slot, participant_id in await db.execute(
+        select(RoomSlotMember.slot, RoomSlotMember.participant_id).where(RoomSlotMember.room_id == room.id)
+    ):
+        if participant_id in positions:
+            members.setdefault(slot, []).append(positions[participant_id])
+    slot_members = [(slot, sorted(members[slot])) for slot in sorted(members)]
+    return [participant.name for participant in participants], slot_members, tally.respondent_count
+
+
+async def aggregate_slot_positions(db: AsyncSession, room: Room) -> List[Tuple[str, List[int]]]:
+    """슬롯별 참여자 위치 목록을 서버에서 집계 (PostgreSQL 전용)
+
+    (슬롯, 참여자) 행의 참여자 ID를 참여 순서(created_at, id) 위치로 바꿔 array_agg로 묶으므로
+    참여자 ID 목록 대신 정수 배열만 전송된다. (위치는 load_room_slots()의 참여자 목록 순서와 같음)
+    """
+    positions = select(
+        Participant.id,
+        (func.row_number().over(order_by=(Participant.created_at, Participant.id)) - 1).label("position")
+    ).where(Participant.room_id == room.id).subquery()
+    position = positions.c.position
+    rows = await db.execute(
+        select(RoomSlotMember.slot, func.array_agg(aggregate_order_by(position, position)))
+        .join(positions, positions.c.id == RoomSlotMember.participant_id)
+        .where(RoomSlotMember.room_id == room.id)
+        .group_by(RoomSlotMember.slot)
+        .order_by(RoomSlotMember.slot)
+    )
+    return [(slot, list(member_positions)) for slot, member_positions in rows]
+
+
+async def check_room(db: AsyncSession, room: Room) -> List[str]:
+    """저장된 집계와 원본 응답을 비교하여 불일치 내역 반환 (비어 있으면 일치)"""
+    tally = await get_room_tally(db, room.id)
+    if tally is None:
+        return ["tally not built"]
+
+    expected: Dict[str, Set[str]] = {}
+    active_slots = await load_active_slots(db, room)
+    for participant_id, slots in active_slots.items():
+        for slot in slots:
+            expected.setdefault(slot, set()).add(participant_id)
+
+    problems = []
+    if tally.respondent_count != len(active_slots):
+        problems.append(f"respondent_count: stored {tally.respondent_count}, expected {len(active_slots)}")
+
+    stored: Dict[str, Set[str]] = {}
+    for slot, participant_id in await db.execute(
+        select(RoomSlotMember.slot, RoomSlotMember.participant_id).where(RoomSlotMember.room_id == room.id)
+    ):
+        stored.setdefault(slot, set()).add(participant_id)
+    counts = {
+        row.slot: row.participant_count
+        for row in await db.scalars(select(RoomSlotTally).where(RoomSlotTally.room_id == room.id))
+    }
+    for slot in sorted(set(stored) | set(expected) | set(counts)):
+        stored_ids = stored.get(slot, set())
+        expected_ids = expected.get(slot, set())
+        if stored_ids != expected_ids:
+            problems.append(f"{slot}: stored {sorted(stored_ids)}, expected {sorted(expected_ids)}")
+        elif counts.get(slot, 0) != len(stored_ids):
+            problems.append(f"{slot}: participant_count {counts.get(slot, 0)} != {len(stored_ids)}")
+    return problems
+
+
+async def run(command: str, room_ids: List[str]) -> int:
+    from app.database import SessionLocal, init_db
+
+    await init_db()
+    async with SessionLocal() as db:
+        query = select(Room)
+        if room_ids:
+            query = query.where(Room.id.in_(room_ids))
+
+        failed = 0
+        for target in (await db.scalars(query)).all():
+            if command == "rebuild":
+                tally = await rebuild_room(db, target)
+                await db.commit()
+                print(f"{target.id}: rebuilt ({tally.respondent_count} respondents)")
+            else:
+                problems = await check_room(db, target)
+                if problems:
+                    failed += 1
+                    print(f"{target.id}: {len(problems)} mismatches")
+                    for problem in problems:
+                        print(f"  - {problem}")
+                else:
+                    print(f"{target.id}: ok")
+        return 1 if failed else 0
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    import argparse
+    import asyncio
+    from app.database import disposing
+
+    parser = argparse.ArgumentParser(prog="python -m app.services.slot_tally", description="방별 슬롯 집계 관리")
+    parser.add_argument("command", choices=["rebuild", "check"])
+    parser.add_argument("room_ids", nargs="*", help="대상 방 ID (생략하면 전체)")
+    args = parser.parse_args(argv)
+
+    return asyncio.run(disposing(run(args.command, args.room_ids)))
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
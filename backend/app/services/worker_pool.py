@@ -0,0 +1,57 @@
+"""CPU 사용량이 큰 계산(최적 시간대 계산 등)을 이벤트 루프 밖 워커 풀에서 실행
+
+작은 계산은 풀로 넘기는 비용이 더 크므로 크기(size)가 임계값 미만이면 그대로 실행하고,
+큰 방의 계산만 풀로 보내 /health, 방 조회 같은 가벼운 요청의 지연을 막는다.
+
+환경 변수
+- OPTIMIZER_EXECUTOR: process(기본) | thread
+- OPTIMIZER_WORKERS: 워커 수 (기본: CPU 수, 최대 4)
+- OPTIMIZER_OFFLOAD_THRESHOLD: 풀로 넘기는 최소 계산 크기 (기본 20000, 참여자 수 × 슬롯 수)
+"""
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from functools import partial
+from typing import Any, Callable, Optional
+import asyncio
+import multiprocessing
+import os
+
+OPTIMIZER_EXECUTOR = os.getenv("OPTIMIZER_EXECUTOR", "process")
+OPTIMIZER_WORKERS = int(os.getenv("OPTIMIZER_WORKERS", "0")) or min(4, os.cpu_count() or 1)
+OPTIMIZER_OFFLOAD_THRESHOLD = int(os.getenv("OPTIMIZER_OFFLOAD_THRESHOLD", "20000"))
+
+_executor: Optional[Executor] = None
+
+
+def get_executor() -> Executor:
+    """워커 풀 (처음 사용할 때 생성)"""
+    global _executor
+    if _executor is None:
+        if OPTIMIZER_EXECUTOR == "thread":
+            _executor = ThreadPoolExecutor(max_workers=OPTIMIZER_WORKERS, thread_name_prefix="optimizer")
+        else:
+            # 이벤트 루프/DB 드라이버 스레드가 있는 프로세스를 fork하지 않도록 spawn 사용
+            _executor = ProcessPoolExecutor(
+                max_workers=OPTIMIZER_WORKERS,
+                mp_context=multiprocessing.get_context("spawn")
+            )
+    return _executor
+
+
+def shutdown_executor() -> None:
+    """워커 풀 종료 (앱 종료 시)"""
+    global _executor
+    if _executor is not None:
+        _executor.shutdown(wait=False, cancel_futures=True)
+        _executor = None
+
+
+async def run_cpu_bound(func: Callable[..., Any], *args: Any, size: int = 0, **kwargs: Any) -> Any:
+    """size가 임계값 이상이면 워커 풀에서, 아니면 현재 스레드에서 바로 실행
+
+    프로세스 풀을 쓰는 경우 func와 인자는 pickle 가능해야 한다.
+    """
+    if size < OPTIMIZER_OFFLOAD_THRESHOLD:
+        return func(*args, **kwargs)
+
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(get_executor(), partial(func, *args, **kwargs))
@@ -0,0 +1,181 @@
+"""단일 작성자 쓰기 큐 (프로세스 내, SQLite 쓰기를 한 연결로 모아 묶음 커밋)
+
+SQLite는 데이터베이스 파일마다 한 번에 한 트랜잭션만 쓸 수 있어, 요청마다 세션을 열고 쓰면
+쓰기 잠금을 기다리느라 지연되거나 busy_timeout을 넘겨 "database is locked"로 실패한다.
+방/참여자/응답을 바꾸는 요청은 작업(세션을 받아 변경하고 결과를 반환하는 코루틴 함수)을 submit()으로 넣고,
+전용 작성자 태스크가 그동안 쌓인 작업들을 한 트랜잭션(SQLite는 BEGIN IMMEDIATE)에서 차례로 실행한 뒤 한 번에 커밋한다.
+- 작업마다 SAVEPOINT를 두어 한 작업이 실패(HTTPException, IntegrityError 등)하면 그 작업만 되돌리고 호출자에게 예외를 전달한다.
+- 커밋이 끝나면 각 호출자의 future에 결과를 넣고, after_commit()으로 등록한 콜백(방 이벤트 발행 등)을 실행한다.
+- 작업이 끝나면 세션에서 분리하므로, 반환할 ORM 객체는 작업 안에서 필요한 속성을 모두 읽어 두어야 한다. (커밋 후 지연 로딩 불가)
+
+여러 워커 프로세스로 실행하면 프로세스마다 작성자가 하나씩이다. (프로세스 사이의 잠금 경합은 busy_timeout으로 기다림)
+
+환경 변수
+- WRITE_QUEUE: auto(기본, SQLite일 때만 사용) | on | off (off면 작업마다 새 세션에서 실행하고 바로 커밋)
+- WRITE_QUEUE_MAX_BATCH: 한 트랜잭션으로 묶을 최대 작업 수 (기본 64)
+"""
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple, TypeVar
+from functools import partial
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.database import DATABASE_URL, SessionLocal
+import asyncio
+import logging
+import os
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+WriteJob = Callable[[AsyncSession], Awaitable[T]]
+
+WRITE_QUEUE = os.getenv("WRITE_QUEUE", "auto")
+WRITE_QUEUE_MAX_BATCH = int(os.getenv("WRITE_QUEUE_MAX_BATCH", "64"))
+
+# 작업별 커밋 후 콜백 목록을 두는 세션 info 키
+AFTER_COMMIT_KEY = "write_queue.after_commit"
+
+
+def after_commit(db: AsyncSession, callback: Callable[..., Any], *args: Any) -> None:
+    """작업의 변경이 커밋된 뒤 실행할 콜백 등록 (작업이 실패해 되돌려지면 실행하지 않음)"""
+    db.info.setdefault(AFTER_COMMIT_KEY, []).append(partial(callback, *args))
+
+
+def run_callbacks(callbacks: List[Callable[[], Any]]) -> None:
+    for callback in callbacks:
+        try:
+            callback()
+        except Exception:
+            # 이미 커밋된 변경이므로 알림 실패는 기록만 함
+            logger.exception("after-commit callback failed")
+
+
+class WriteQueue:
+    def __init__(self, enabled: bool, max_batch: int = WRITE_QUEUE_MAX_BATCH):
+        self.enabled = enabled
+        self.max_batch = max_batch
+        self.queue: Optional["asyncio.Queue[Tuple[WriteJob, asyncio.Future]]"] = None
+        self.writer: Optional[asyncio.Task] = None
+        self.loop: Optional[asyncio.AbstractEventLoop] = None
+        self.batches = 0
+        self.committed = 0
+        self.failed = 0
+        self.largest_batch = 0
+
+    async def submit(self, job: WriteJob[T]) -> T:
+        """작업을 실행하고 커밋된 뒤 결과 반환 (작업이 던진 예외는 그대로 전달)"""
+        if not self.enabled:
+            return await self.run_direct(job)
+        self.start()
+        future = self.loop.create_future()
+        self.queue.put_nowait((job, future))
+        return await future
+
+    async def run_direct(self, job: WriteJob[T]) -> T:
+        """큐 없이 새 세션에서 실행하고 바로 커밋 (WRITE_QUEUE=off)"""
+        async with SessionLocal() as db:
+            result = await job(db)
+            await db.commit()
+            run_callbacks(db.info.pop(AFTER_COMMIT_KEY, []))
+            return result
+
+    def start(self) -> None:
+        """현재 이벤트 루프에서 작성자 태스크 시작 (이미 실행 중이면 그대로)"""
+        loop = asyncio.get_running_loop()
+        if self.writer is not None and self.loop is loop and not self.writer.done():
+            return
+        self.loop = loop
+        self.queue = asyncio.Queue()
+        self.writer = loop.create_task(self.run())
+
+    async def close(self) -> None:
+        """남은 작업을 처리한 뒤 작성자 종료 (앱 종료 시)"""
+        if self.writer is None or self.loop is not asyncio.get_running_loop():
+            self.writer = None
+            return
+        await self.queue.join()
+        self.writer.cancel()
+        try:
+            await self.writer
+        except asyncio.CancelledError:
+            pass
+        self.writer = None
+
+    async def run(self) -> None:
+        while True:
+            batch = [await self.queue.get()]
+            # 앞 묶음을 처리하는 동안 쌓인 작업을 함께 커밋
+            while len(batch) < self.max_batch and not self.queue.empty():
+                batch.append(self.queue.get_nowait())
+            try:
+                await self.commit_batch(batch)
+            except Exception as e:
+                logger.exception("write batch failed")
+                for _, future in batch:
+                    if not future.done():
+                        future.set_exception(e)
+            for _ in batch:
+                self.queue.task_done()
+
+    async def commit_batch(self, batch: List[Tuple[WriteJob, asyncio.Future]]) -> None:
+        """작업들을 한 트랜잭션에서 실행 (작업마다 SAVEPOINT) 후 한 번 커밋하고 결과 전달"""
+        outcomes: List[Tuple[asyncio.Future, Any, Optional[BaseException], List[Callable[[], Any]]]] = []
+        async with SessionLocal() as db:
+            await begin_write(db)
+            for job, future in batch:
+                if future.cancelled():
+                    # 기다리던 요청이 취소됨 (클라이언트 연결 끊김 등)
+                    continue
+                callbacks: List[Callable[[], Any]] = []
+                db.info[AFTER_COMMIT_KEY] = callbacks
+                try:
+                    async with db.begin_nested():
+                        result = await job(db)
+                except Exception as e:
+                    outcomes.append((future, None, e, []))
+                else:
+                    outcomes.append((future, result, None, callbacks))
+                # 다음 작업이 이전 작업의 객체를 식별자 맵에서 재사용하지 않도록 분리
+                db.expunge_all()
+            await db.commit()
+
+        self.batches += 1
+        self.largest_batch = max(self.largest_batch, len(batch))
+        for future, result, error, callbacks in outcomes:
+            if error is not None:
+                self.failed += 1
+                if not future.done():
+                    future.set_exception(error)
+                continue
+            self.committed += 1
+            run_callbacks(callbacks)
+            if not future.done():
+                future.set_result(result)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "enabled": self.enabled,
+            "pending": self.queue.qsize() if self.queue is not None else 0,
+            "batches": self.batches,
+            "committed": self.committed,
+            "failed": self.failed,
+            "largest_batch": self.largest_batch,
+        }
+
+
+async def begin_write(db: AsyncSession) -> None:
+    """묶음 트랜잭션 시작 (SQLite는 처음부터 쓰기 잠금을 잡음)
+
+    pysqlite는 DML 전에만 BEGIN을 보내므로, 그대로 두면 첫 작업의 SAVEPOINT가 트랜잭션을 시작하고
+    그 SAVEPOINT를 해제할 때 바로 커밋되어 버린다.
+    """
+    connection = await db.connection()
+    if connection.dialect.name == "sqlite":
+        await connection.exec_driver_sql("BEGIN IMMEDIATE")
+
+
+def queue_enabled(setting: str = WRITE_QUEUE, database_url: str = DATABASE_URL) -> bool:
+    if setting == "auto":
+        return database_url.startswith("sqlite")
+    return setting == "on"
+
+
+write_queue = WriteQueue(queue_enabled())
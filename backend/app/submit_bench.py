@@ -0,0 +1,90 @@
+"""응답 제출 지연 시간 벤치마크 (이름으로 한 번에 제출 vs 참여자 생성 후 응답 생성)
+
+같은 방에 이름 풀에서 고른 참여자로 응답을 하나씩 차례로 제출하며 제출 한 번의 지연 시간과
+(앱을 직접 호출할 때) 제출당 SQL 문 수를 방식별로 출력한다.
+- submission: POST /rooms/{id}/submissions 한 번
+- two-step: POST /participants/ (같은 이름이면 기존 참여자) 후 POST /responses/ (이전 응답 페이지 방식)
+
+    python -m app.submit_bench [--submits 200] [--names 50]
+    python -m app.submit_bench --url http://localhost:8000   # 실행 중인 서버 (SQL 문 수는 세지 않음)
+"""
+from typing import Any, Dict, List, Optional
+import os
+import random
+import tempfile
+import time
+from app.http_bench import close_client, create_room, open_client, percentile, random_slots
+
+MODES = ("submission", "two-step")
+
+
+async def submit(client, mode: str, room_id: str, name: str, response_data: Dict[str, Any]) -> None:
+    if mode == "submission":
+        response = await client.post(f"/api/v1/rooms/{room_id}/submissions", json={"name": name, "response_data": response_data})
+        response.raise_for_status()
+        return
+    participant = await client.post("/api/v1/participants/", json={"room_id": room_id, "name": name})
+    participant.raise_for_status()
+    response = await client.post("/api/v1/responses/", json={"participant_id": participant.json()["id"], "response_data": response_data})
+    response.raise_for_status()
+
+
+async def bench(url: Optional[str], submits: int, names: int, seed: int = 0) -> Dict[str, Dict[str, float]]:
+    """방식마다 새 방에서 같은 순서의 제출을 차례로 실행"""
+    statements: List[str] = []
+    if not url:
+        from sqlalchemy import event
+        from app.database import engine
+
+        event.listen(engine.sync_engine, "before_cursor_execute", lambda *args: statements.append(args[2]))
+
+    client = await open_client(url)
+    results = {}
+    try:
+        for mode in MODES:
+            rng = random.Random(seed)
+            room_id = await create_room(client, f"submit bench ({mode})")
+            latencies = []
+            statements.clear()
+            for _ in range(submits):
+                name, response_data = f"참여자{rng.randrange(names)}", random_slots(rng)
+                started = time.perf_counter()
+                await submit(client, mode, room_id, name, response_data)
+                latencies.append(time.perf_counter() - started)
+            results[mode] = {
+                "p50": percentile(latencies, 0.5),
+                "p90": percentile(latencies, 0.9),
+                "p99": percentile(latencies, 0.99),
+                "statements": len(statements) / submits if not url else None,
+            }
+    finally:
+        await close_client(client)
+    return results
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    import argparse
+    import asyncio
+
+    parser = argparse.ArgumentParser(prog="python -m app.submit_bench", description="응답 제출 지연 시간 벤치마크")
+    parser.add_argument("--submits", type=int, default=200, help="방식별 제출 수")
+    parser.add_argument("--names", type=int, default=50, help="제출에 사용할 참여자 이름 수")
+    parser.add_argument("--url", help="실행 중인 서버 주소 (생략하면 임시 SQLite 데이터베이스로 앱을 직접 호출)")
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as directory:
+        if not args.url:
+            # app.database가 가져올 때 DATABASE_URL을 읽으므로 앱을 가져오기 전에 정함
+            os.environ.setdefault("DATABASE_URL", f"sqlite:///{os.path.join(directory, 'bench.db')}")
+        results = asyncio.run(bench(args.url, args.submits, args.names))
+
+    for mode, stats in results.items():
+        line = f"{mode:10s} p50 {stats['p50'] * 1000:.1f} ms, p90 {stats['p90'] * 1000:.1f} ms, p99 {stats['p99'] * 1000:.1f} ms"
+        if stats["statements"] is not None:
+            line += f", {stats['statements']:.1f} SQL statements/submit"
+        print(line)
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
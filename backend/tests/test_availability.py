@@ -0,0 +1,14 @@
+import random
+import pytest
+from app.services.availability import decode_bitmap, encode_bitmap
+
+
+@pytest.mark.parametrize("size", [1, 8, 9, 672])
+def test_bitmap_round_trip_keeps_universe_order(size):
+    """드문/빽빽한 비트맵 모두 유니버스 순서의 슬롯 목록으로 복원"""
+    universe = [f"slot-{index}" for index in range(size)]
+    slot_index = {slot: index for index, slot in enumerate(universe)}
+    rng = random.Random(size)
+    for selected in sorted({0, 1, size // 20, size // 2, size}):
+        slots = rng.sample(universe, selected)
+        assert decode_bitmap(encode_bitmap(slots, slot_index), universe) == sorted(slots, key=slot_index.get)
@@ -0,0 +1,146 @@
+import json
+import pytest
+from sqlalchemy.exc import OperationalError
+from app.database import SessionLocal
+from app.models import Room
+from app.services import bulk_import, slot_tally
+from app.services.bulk_import import BulkImporter, import_rows, iterate
+from tests.conftest import DATES, TIMES, create_room, submit
+
+pytestmark = pytest.mark.anyio
+
+SLOTS = [f"{date}|{time}" for date in DATES for time in TIMES]
+
+
+def row(name: str, slots) -> str:
+    return json.dumps({"name": name, "slots": slots}, ensure_ascii=False)
+
+
+async def tallied_room(client) -> str:
+    """집계가 만들어진 방 (가져오기가 집계를 묶음마다 고치는지 보기 위해)"""
+    room_id = await create_room(client)
+    await submit(client, room_id, "A", SLOTS[:2])
+    assert (await client.get(f"/api/v1/rooms/{room_id}/optimal-times")).status_code == 200
+    return room_id
+
+
+async def check_room(room_id: str):
+    async with SessionLocal() as db:
+        room = await db.get(Room, room_id)
+        return await slot_tally.check_room(db, room)
+
+
+async def test_invalid_rows_are_reported_and_skipped(client):
+    room_id = await tallied_room(client)
+    body = "\n".join([
+        row("B", SLOTS[:3]),
+        row("C", ["2030-01-01|09:00"]),
+        "not json",
+        "",
+        json.dumps({"slots": SLOTS[:1]}),
+        row("D", SLOTS[2:4]),
+    ])
+    response = await client.post(f"/api/v1/rooms/{room_id}/import", content=body.encode())
+    assert response.status_code == 200, response.text
+    result = response.json()
+    assert (result["imported"], result["created_participants"], result["failed"]) == (2, 2, 3)
+    assert [(error["line"], error["name"]) for error in result["errors"]] == [(2, "C"), (3, None), (5, None)]
+    assert await check_room(room_id) == []
+
+
+async def test_csv_rows(client):
+    room_id = await create_room(client)
+    body = "name,slots\n" + f"B,{';'.join(SLOTS[:2])}\n" + "broken\n"
+    result = (await client.post(f"/api/v1/rooms/{room_id}/import?format=csv", content=body.encode())).json()
+    assert (result["imported"], result["failed"]) == (1, 1)
+    assert result["errors"][0]["line"] == 3
+
+
+async def test_undecodable_line_is_reported_with_its_line_number(client):
+    room_id = await tallied_room(client)
+    body = b"\n".join([row("B", SLOTS[:1]).encode(), b'{"name": "\xff\xfe"}', row("C", SLOTS[1:2]).encode()])
+    response = await client.post(f"/api/v1/rooms/{room_id}/import", content=body)
+    assert response.status_code == 200, response.text
+    result = response.json()
+    assert (result["imported"], result["failed"]) == (2, 1)
+    assert result["errors"][0]["line"] == 2
+    assert "UTF-8" in result["errors"][0]["error"]
+    assert await check_room(room_id) == []
+
+
+async def test_repeated_name_in_chunk_keeps_version_order(client):
+    """같은 이름이 다시 나오면 묶음을 나눠 저장하므로 나중 행이 새 버전이자 활성 응답"""
+    room_id = await tallied_room(client)
+    body = "\n".join([row("A", SLOTS[3:5]), row("B", SLOTS[:1]), row("A", SLOTS[5:6])])
+    result = (await client.post(f"/api/v1/rooms/{room_id}/import", content=body.encode())).json()
+    assert (result["imported"], result["created_participants"], result["failed"]) == (3, 1, 0)
+
+    participants = (await client.get(f"/api/v1/participants/room/{room_id}")).json()
+    participant_a = next(participant for participant in participants if participant["name"] == "A")
+    history = (await client.get(f"/api/v1/responses/participant/{participant_a['id']}")).json()
+    assert [response["version"] for response in history] == [3, 2, 1]
+    assert history[0]["response_data"] == {"available_time_slots": SLOTS[5:6]}
+    assert await check_room(room_id) == []
+
+
+async def test_failed_chunk_keeps_committed_chunks_consistent(client, monkeypatch):
+    """묶음 하나가 실패해도 앞뒤 묶음은 커밋되고, 커밋된 묶음마다 집계와 변경 버전이 함께 반영됨"""
+    room_id = await tallied_room(client)
+    write_chunk = BulkImporter.write_chunk
+
+    async def failing_write_chunk(self, chunk, db):
+        if any(name == "D" for _, name, _ in chunk):
+            raise OperationalError("INSERT", {}, Exception("disk I/O error"))
+        return await write_chunk(self, chunk, db)
+
+    monkeypatch.setattr(BulkImporter, "write_chunk", failing_write_chunk)
+    lines = [row(name, SLOTS[index:index + 2]) for index, name in enumerate("BCDEFG")]
+    async with SessionLocal() as db:
+        room = await db.get(Room, room_id)
+        version = room.change_version
+        result = await import_rows(room, iterate(lines), "jsonl", chunk_size=2)
+
+    assert (result["imported"], result["failed"]) == (4, 2)
+    assert [(error["line"], error["name"]) for error in result["errors"]] == [(3, "D"), (4, "E")]
+    assert all(error["error"].startswith("batch failed") for error in result["errors"])
+    assert await check_room(room_id) == []
+    async with SessionLocal() as db:
+        assert (await db.get(Room, room_id)).change_version == version + 2
+
+    optimal = (await client.get(f"/api/v1/rooms/{room_id}/optimal-times")).json()
+    assert {name for slot in optimal for name in slot["available_participants"]} == {"A", "B", "C", "F", "G"}
+
+
+async def test_interrupted_stream_keeps_committed_chunks_consistent(client):
+    """본문 스트림이 중간에 끊겨도(연결 끊김 등) 이미 커밋된 묶음까지는 집계가 원본 응답과 일치"""
+    room_id = await tallied_room(client)
+
+    async def interrupted():
+        for index, name in enumerate("BCD"):
+            yield row(name, SLOTS[index:index + 2])
+        raise ConnectionResetError("client disconnected")
+
+    async with SessionLocal() as db:
+        room = await db.get(Room, room_id)
+        with pytest.raises(ConnectionResetError):
+            await import_rows(room, interrupted(), "jsonl", chunk_size=2)
+    assert await check_room(room_id) == []
+
+
+async def test_import_into_room_without_tally(client):
+    """집계가 없는 방은 집계를 건너뛰고 처음 조회할 때 재구축"""
+    room_id = await create_room(client)
+    body = "\n".join(row(f"p{index}", SLOTS[index:index + 3]) for index in range(5))
+    result = (await client.post(f"/api/v1/rooms/{room_id}/import", content=body.encode())).json()
+    assert result["imported"] == 5
+    assert await check_room(room_id) == ["tally not built"]
+    assert (await client.get(f"/api/v1/rooms/{room_id}/optimal-times")).status_code == 200
+    assert await check_room(room_id) == []
+
+
+async def test_split_lines_decodes_each_line():
+    """줄마다 따로 디코딩하여 UTF-8이 아닌 줄만 RowError (BOM은 제거)"""
+    chunks = [b"a\nb", b"\xff\n", "\ufeffc".encode()]
+    lines = [line async for line in bulk_import.split_lines(iterate(chunks))]
+    assert lines[0] == "a" and lines[2] == "c"
+    assert isinstance(lines[1], bulk_import.RowError)
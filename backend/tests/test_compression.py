@@ -0,0 +1,45 @@
+import pytest
+from tests.conftest import DATES, TIMES, create_room, submit
+
+pytestmark = pytest.mark.anyio
+
+SLOTS = [f"{date}|{time}" for date in DATES for time in TIMES]
+
+
+async def build_room(client) -> str:
+    # 압축 최소 크기(1KB)를 넘는 결과가 나오도록 참여자를 채움
+    room_id = await create_room(client)
+    for i in range(15):
+        await submit(client, room_id, f"participant-{i:02d}", SLOTS)
+    return room_id
+
+
+@pytest.mark.parametrize("path", ["optimal-times", "bundle"])
+async def test_encoded_bodies_have_distinct_etags(client, path):
+    """압축본과 원본은 ETag가 다르고 둘 다 Vary: Accept-Encoding, 어느 ETag로 재검증해도 304"""
+    room_id = await build_room(client)
+    url = f"/api/v1/rooms/{room_id}/{path}"
+
+    identity = await client.get(url, headers={"Accept-Encoding": "identity"})
+    encoded = await client.get(url, headers={"Accept-Encoding": "gzip"})
+    assert identity.status_code == encoded.status_code == 200
+    assert "content-encoding" not in identity.headers
+    assert encoded.headers["content-encoding"] == "gzip"
+    assert identity.headers["vary"] == encoded.headers["vary"] == "Accept-Encoding"
+    assert encoded.headers["etag"] == identity.headers["etag"][:-1] + '-gzip"'
+    assert encoded.content == identity.content  # httpx가 압축을 풀어 줌
+
+    for accept_encoding, etag in (("identity", identity.headers["etag"]), ("gzip", encoded.headers["etag"])):
+        cached = await client.get(url, headers={"Accept-Encoding": accept_encoding, "If-None-Match": etag})
+        assert cached.status_code == 304
+        assert cached.headers["etag"] == etag
+        assert cached.headers["vary"] == "Accept-Encoding"
+
+
+async def test_small_responses_still_vary(client):
+    """압축 최소 크기보다 작은 JSON 응답도 Accept-Encoding에 따라 달라질 수 있음을 알림"""
+    room_id = await create_room(client)
+    response = await client.get(f"/api/v1/rooms/{room_id}/optimal-times", headers={"Accept-Encoding": "gzip"})
+    assert response.status_code == 200
+    assert "content-encoding" not in response.headers
+    assert response.headers["vary"] == "Accept-Encoding"
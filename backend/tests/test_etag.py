@@ -0,0 +1,89 @@
+import pytest
+from tests.conftest import create_room, record_statements, submit
+
+pytestmark = pytest.mark.anyio
+
+PATHS = ["", "/optimal-times", "/availability", "/bundle"]
+
+
+def room_paths(room_id: str):
+    return [f"/api/v1/rooms/{room_id}{path}" for path in PATHS] + [f"/api/v1/participants/room/{room_id}"]
+
+
+async def get(client, url: str, etag=None):
+    headers = {"Accept-Encoding": "identity"}
+    if etag:
+        headers["If-None-Match"] = etag
+    return await client.get(url, headers=headers)
+
+
+async def test_unchanged_poll_returns_304_without_body(client):
+    """같은 ETag로 다시 조회하면 본문 없이 304, 방 조회 한 번만 실행"""
+    room_id = await create_room(client)
+    await submit(client, room_id, "A", ["2025-03-04|09:00"])
+
+    for url in room_paths(room_id):
+        response = await get(client, url)
+        assert response.status_code == 200, url
+        etag = response.headers["etag"]
+        assert etag.startswith(f'"{room_id}-')
+
+        with record_statements() as statements:
+            cached = await get(client, url, etag)
+        assert cached.status_code == 304, url
+        assert cached.content == b""
+        assert cached.headers["etag"] == etag
+        assert len(statements) == 1, url
+        assert statements[0][0].lstrip().upper().startswith("SELECT")
+
+        # 목록의 다른 ETag, 약한 비교(W/)도 일치로 봄
+        assert (await get(client, url, f'"other", W/{etag}')).status_code == 304
+        assert (await get(client, url, '"other"')).status_code == 200
+
+
+async def test_every_write_changes_the_etag(client):
+    room_id = await create_room(client)
+    first = await submit(client, room_id, "A", ["2025-03-04|09:00"])
+    url = f"/api/v1/rooms/{room_id}"
+
+    async def etag():
+        return (await get(client, url)).headers["etag"]
+
+    async def create_response():
+        return await client.post("/api/v1/responses/", json={
+            "participant_id": first["participant_id"], "response_data": {"available_time_slots": ["2025-03-04|09:30"]}
+        })
+
+    async def create_participant():
+        return await client.post("/api/v1/participants/", json={"room_id": room_id, "name": "B"})
+
+    async def delete_participant():
+        participants = (await client.get(f"/api/v1/participants/room/{room_id}")).json()
+        participant = next(participant for participant in participants if participant["name"] == "B")
+        return await client.delete(f"/api/v1/participants/{participant['id']}")
+
+    writes = [
+        lambda: client.post(f"/api/v1/rooms/{room_id}/submissions", json={"name": "C", "response_data": {"available_time_slots": []}}),
+        create_response,
+        lambda: client.put(f"/api/v1/responses/{first['response_id']}", json={"response_data": {"available_time_slots": ["2025-03-04|10:00"]}}),
+        lambda: client.put(f"/api/v1/responses/{first['response_id']}/activate"),
+        create_participant,
+        delete_participant,
+        lambda: client.post(f"/api/v1/rooms/{room_id}/import", content=b'{"name": "D", "slots": ["2025-03-04|09:00"]}\n'),
+        lambda: client.put(url, json={"title": "renamed"}),
+        lambda: client.delete(f"/api/v1/responses/{first['response_id']}"),
+    ]
+    seen = [await etag()]
+    for write in writes:
+        response = await write()
+        assert response.status_code in (200, 201, 204), response.text
+        # 이전 ETag로 조회하면 새 본문과 새 ETag
+        stale = await get(client, url, seen[-1])
+        assert stale.status_code == 200
+        assert stale.headers["etag"] not in seen
+        seen.append(stale.headers["etag"])
+
+    # 실패한 쓰기는 ETag를 바꾸지 않음
+    missing = await client.put("/api/v1/responses/missing", json={"response_data": {"available_time_slots": []}})
+    assert missing.status_code == 404
+    assert (await get(client, url, seen[-1])).status_code == 304
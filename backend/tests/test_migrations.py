@@ -0,0 +1,61 @@
+import pytest
+from sqlalchemy import inspect, select, text, update
+from app.database import engine
+from app.migrations import upgrade
+from app.models import Participant, Response
+from tests.conftest import create_room, submit
+
+pytestmark = pytest.mark.anyio
+
+
+async def test_upgrade_merges_duplicate_participants(client):
+    """중복된 이름의 참여자가 있는 기존 데이터베이스도 이름 유니크 인덱스가 만들어지고 제출이 동작"""
+    room_id = await create_room(client)
+    await submit(client, room_id, "A", ["2025-03-04|09:00"])
+    await submit(client, room_id, "A", ["2025-03-04|09:30"])
+    await submit(client, room_id, "B", ["2025-03-04|10:00"])
+
+    # 유니크 인덱스가 없던 이전 데이터베이스처럼 같은 이름의 참여자를 만듦
+    async with engine.begin() as conn:
+        await conn.execute(text("DROP INDEX ux_participants_room_id_name"))
+        await conn.execute(update(Participant).where(Participant.room_id == room_id, Participant.name == "B").values(name="A"))
+    async with engine.begin() as conn:
+        await conn.run_sync(upgrade)
+
+    async with engine.connect() as conn:
+        participant_ids = (await conn.scalars(select(Participant.id).where(Participant.room_id == room_id))).all()
+        versions = (await conn.scalars(
+            select(Response.version).where(Response.participant_id == participant_ids[0]).order_by(Response.created_at)
+        )).all()
+    assert len(participant_ids) == 1
+    assert versions == [1, 2, 3]
+
+    result = await submit(client, room_id, "A", ["2025-03-05|09:00"])
+    assert result["version"] == 4
+    optimal = (await client.get(f"/api/v1/rooms/{room_id}/optimal-times")).json()
+    assert [(slot["time_slot"], slot["participant_count"]) for slot in optimal] == [("2025-03-05|09:00", 1)]
+
+
+async def test_upgrade_drops_obsolete_indexes(client):
+    """이전 버전이 만든 활성 방 부분 인덱스는 쓰는 쿼리가 없으므로 업그레이드 시 삭제"""
+    async with engine.begin() as conn:
+        await conn.execute(text("CREATE INDEX ix_rooms_active_id ON rooms (id) WHERE is_active"))
+        await conn.run_sync(upgrade)
+        indexes = await conn.run_sync(lambda sync_conn: {index["name"] for index in inspect(sync_conn).get_indexes("rooms")})
+    assert "ix_rooms_active_id" not in indexes
+
+
+async def test_upgrade_moves_tally_members_to_rows(client):
+    """슬롯별 참여자 ID JSON 배열 컬럼이 있는 기존 집계 테이블도 컬럼을 지우고 다음 조회 때 (슬롯, 참여자) 행으로 재구축"""
+    room_id = await create_room(client)
+    await submit(client, room_id, "A", ["2025-03-04|09:00"])
+    async with engine.begin() as conn:
+        await conn.execute(text("ALTER TABLE room_slot_tallies ADD COLUMN participant_ids TEXT NOT NULL DEFAULT '[]'"))
+        await conn.execute(text("UPDATE room_tallies SET format_version = 2"))
+        await conn.run_sync(upgrade)
+        columns = await conn.run_sync(lambda sync_conn: {column["name"] for column in inspect(sync_conn).get_columns("room_slot_tallies")})
+    assert "participant_ids" not in columns
+
+    await submit(client, room_id, "B", ["2025-03-04|09:00", "2025-03-04|09:30"])
+    optimal = (await client.get(f"/api/v1/rooms/{room_id}/optimal-times")).json()
+    assert [(slot["time_slot"], slot["participant_count"]) for slot in optimal][:1] == [("2025-03-04|09:00", 2)]
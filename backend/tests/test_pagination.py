@@ -0,0 +1,26 @@
+import pytest
+from app.api.pagination import DEFAULT_PAGE_SIZE
+from tests.conftest import create_room
+
+pytestmark = pytest.mark.anyio
+
+
+async def test_lists_are_unpaginated_without_limit_or_cursor(client):
+    """limit/cursor를 모르는 이전 클라이언트는 전체 목록을 받고, 페이지는 limit 또는 cursor를 줄 때만 나뉨"""
+    room_id = await create_room(client)
+    total = DEFAULT_PAGE_SIZE + 5
+    for i in range(total):
+        response = await client.post("/api/v1/participants/", json={"room_id": room_id, "name": f"p{i:03d}"})
+        assert response.status_code == 201, response.text
+    url = f"/api/v1/participants/room/{room_id}"
+
+    everything = await client.get(url)
+    assert len(everything.json()) == total
+    assert "x-next-cursor" not in everything.headers
+
+    first = await client.get(url, params={"limit": 60})
+    assert len(first.json()) == 60
+    second = await client.get(url, params={"cursor": first.headers["x-next-cursor"]})
+    assert len(second.json()) == total - 60
+    assert "x-next-cursor" not in second.headers
+    assert [p["name"] for p in first.json() + second.json()] == [p["name"] for p in everything.json()]
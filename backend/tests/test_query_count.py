@@ -0,0 +1,41 @@
+from typing import List
+import pytest
+from app.services.result_cache import result_cache
+from tests.conftest import DATES, TIMES, create_room, record_statements, submit
+
+pytestmark = pytest.mark.anyio
+
+SLOTS = [f"{date}|{time}" for date in DATES for time in TIMES]
+
+
+async def add_participants(client, room_id: str, start: int, count: int) -> None:
+    # 참여자마다 여러 버전을 남겨 델타로 저장된 응답도 복원하게 함
+    for i in range(start, start + count):
+        await submit(client, room_id, f"p{i}", SLOTS[i % 3:i % 3 + 4])
+        await submit(client, room_id, f"p{i}", SLOTS[i % 5:i % 5 + 3])
+
+
+async def measure(client, room_id: str) -> List[int]:
+    counts = []
+    for path in ("optimal-times", "optimal-times?duration=60", "bundle", "bundle?history=all", "bundle?history=1"):
+        # 결과 캐시를 비워 매번 계산하는 경로를 측정
+        await result_cache.invalidate(room_id)
+        with record_statements() as statements:
+            response = await client.get(f"/api/v1/rooms/{room_id}/{path}")
+        assert response.status_code == 200, response.text
+        counts.append(len(statements))
+    return counts
+
+
+async def test_read_paths_issue_constant_queries(client):
+    """참여자 수가 늘어도 최적 시간대/방 묶음 조회의 쿼리 수는 그대로 (N+1 회귀 방지)"""
+    room_id = await create_room(client)
+    await add_participants(client, room_id, 0, 3)
+    # 집계를 처음 만드는 지연 재구성은 측정에서 제외
+    assert (await client.get(f"/api/v1/rooms/{room_id}/optimal-times")).status_code == 200
+    await submit(client, room_id, "p0", SLOTS[:2])
+    small = await measure(client, room_id)
+
+    await add_participants(client, room_id, 3, 12)
+    large = await measure(client, room_id)
+    assert large == small
@@ -0,0 +1,78 @@
+from typing import Any, List, Tuple
+import pytest
+from sqlalchemy.engine import Connection
+from app.database import engine
+from app.migrations import explain, full_scans, query_plan
+from tests.conftest import DATES, TIMES, create_room, record_statements, submit
+
+pytestmark = pytest.mark.anyio
+
+SLOTS = [f"{date}|{time}" for date in DATES for time in TIMES]
+
+
+async def run_routes(client) -> None:
+    """결과 페이지 조회와 참여자/응답 변경 라우트를 한 번씩 실행"""
+    room_id = await create_room(client)
+    first = await submit(client, room_id, "A", SLOTS[:3])
+    second = await submit(client, room_id, "A", SLOTS[2:5])
+    await submit(client, room_id, "B", SLOTS[1:4])
+    created = await client.post("/api/v1/participants/", json={"room_id": room_id, "name": "C"})
+    assert created.status_code == 201, created.text
+
+    paths = [
+        f"/api/v1/rooms/{room_id}",
+        f"/api/v1/rooms/{room_id}/bundle",
+        f"/api/v1/rooms/{room_id}/bundle?history=all",
+        f"/api/v1/rooms/{room_id}/bundle?history=1",
+        f"/api/v1/rooms/{room_id}/optimal-times",
+        f"/api/v1/rooms/{room_id}/optimal-times?duration=60",
+        f"/api/v1/rooms/{room_id}/availability",
+        f"/api/v1/participants/room/{room_id}",
+        f"/api/v1/participants/{first['participant_id']}",
+        f"/api/v1/responses/participant/{first['participant_id']}",
+        f"/api/v1/responses/{second['response_id']}",
+    ]
+    for path in paths:
+        response = await client.get(path)
+        assert response.status_code == 200, f"{path}: {response.text}"
+
+    changes = [
+        client.put(f"/api/v1/responses/{second['response_id']}", json={"response_data": {"available_time_slots": SLOTS[:1]}}),
+        client.put(f"/api/v1/responses/{first['response_id']}/activate"),
+        client.delete(f"/api/v1/responses/{second['response_id']}"),
+        client.put(f"/api/v1/rooms/{room_id}", json={"title": "renamed"}),
+        client.delete(f"/api/v1/participants/{created.json()['id']}"),
+    ]
+    for change in changes:
+        response = await change
+        assert response.status_code in (200, 204), response.text
+
+
+def plan_problems(conn: Connection, statements: List[Tuple[str, Any]]) -> List[str]:
+    if conn.dialect.name == "postgresql":
+        # 행이 적으면 순차 탐색을 고르므로 인덱스를 쓸 수 있는지만 봄
+        conn.exec_driver_sql("SET LOCAL enable_seqscan = off")
+    problems = []
+    seen = set()
+    for statement, parameters in statements:
+        if parameters is None or statement in seen or not statement.lstrip().upper().startswith(("SELECT", "WITH", "UPDATE", "DELETE")):
+            continue
+        seen.add(statement)
+        plan = query_plan(conn, statement, parameters)
+        if full_scans(plan):
+            problems.append(f"{' '.join(statement.split())}\n  -> {plan}")
+    return problems
+
+
+async def test_hot_queries_use_indexes(client):
+    """python -m app.migrations explain과 같은 검사"""
+    async with engine.begin() as conn:
+        assert await conn.run_sync(explain) == []
+
+
+async def test_route_statements_do_not_scan_tables(client):
+    """라우트가 실제로 실행한 조회/수정/삭제 쿼리가 방/참여자/응답/집계 테이블을 전체 탐색하지 않음"""
+    with record_statements() as statements:
+        await run_routes(client)
+    async with engine.begin() as conn:
+        assert await conn.run_sync(plan_problems, statements) == []
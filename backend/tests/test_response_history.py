@@ -0,0 +1,175 @@
+import random
+import pytest
+from sqlalchemy import select
+from app.database import SessionLocal
+from app.models import Participant, Response, Room
+from app.services import response_history, slot_tally
+from app.services.response_history import apply_delta, diff_data
+from tests.conftest import DATES, TIMES, create_room, submit
+
+pytestmark = pytest.mark.anyio
+
+SLOTS = [f"{date}|{time}" for date in DATES for time in TIMES]
+
+
+@pytest.fixture
+def keyframe_interval(monkeypatch) -> int:
+    """슬롯이 10개뿐인 테스트 방에서도 키프레임 경계를 여러 번 넘도록 간격을 줄임"""
+    monkeypatch.setattr(response_history, "KEYFRAME_INTERVAL", 4)
+    return 4
+
+
+def slot_data(rng: random.Random):
+    return {"available_time_slots": rng.sample(SLOTS, rng.randint(0, len(SLOTS)))}
+
+
+def edited(rng: random.Random, data):
+    """직전 데이터에서 슬롯 한두 개만 넣거나 뺀 데이터 (델타로 저장되는 작은 수정)"""
+    slots = list(data["available_time_slots"])
+    for slot in rng.sample(SLOTS, rng.randint(1, 2)):
+        if slot in slots:
+            slots.remove(slot)
+        else:
+            slots.append(slot)
+    return {"available_time_slots": slots}
+
+
+def sorted_slots(data):
+    """슬롯 목록 비교용 (RESPONSE_STORAGE=bitmap이면 슬롯이 유니버스 순서로 저장됨)"""
+    return {**data, "available_time_slots": sorted(data["available_time_slots"])}
+
+
+def test_diff_and_apply_round_trip():
+    rng = random.Random(3)
+    for _ in range(200):
+        parent = {"available_time_slots": rng.sample(SLOTS, rng.randint(0, 6)), "note": rng.choice(["a", "b", None])}
+        data = {"available_time_slots": rng.sample(SLOTS, rng.randint(0, 6))}
+        if rng.random() < 0.5:
+            data["note"] = rng.choice(["a", "c", 1])
+        assert apply_delta(parent, diff_data(parent, data)) == data
+
+
+async def stored_versions(participant_id: str):
+    """응답마다 새 세션에서 그 응답 하나만 복원 (기준 응답 사슬을 재귀 쿼리로 따라감)"""
+    async with SessionLocal() as db:
+        ids = (await db.scalars(select(Response.id).where(Response.participant_id == participant_id))).all()
+    restored = {}
+    for response_id in ids:
+        async with SessionLocal() as db:
+            response = await db.get(Response, response_id)
+            await response_history.load(db, [response])
+            assert response.delta_depth < response_history.KEYFRAME_INTERVAL
+            restored[response_id] = sorted_slots(response.response_data)
+    return restored
+
+
+async def history(client, participant_id: str):
+    response = await client.get(f"/api/v1/responses/participant/{participant_id}")
+    assert response.status_code == 200
+    return {item["id"]: (sorted_slots(item["response_data"]), item["is_active"]) for item in response.json()}
+
+
+async def create(client, participant_id: str, data) -> str:
+    response = await client.post("/api/v1/responses/", json={"participant_id": participant_id, "response_data": data})
+    assert response.status_code == 201, response.text
+    return response.json()["id"]
+
+
+async def test_every_version_restores_across_keyframes(client, keyframe_interval):
+    """키프레임 간격을 여러 번 넘긴 기록의 모든 버전이 각자 따로 읽어도 복원됨"""
+    rng = random.Random(5)
+    room_id = await create_room(client)
+    first_data = {"available_time_slots": SLOTS[:7]}
+    first = await submit(client, room_id, "A", first_data["available_time_slots"])
+    participant_id = first["participant_id"]
+    expected = {first["response_id"]: first_data}
+    data = first_data
+    for _ in range(keyframe_interval * 4 + 2):
+        data = edited(rng, data)
+        expected[await create(client, participant_id, data)] = data
+
+    assert await stored_versions(participant_id) == {response_id: sorted_slots(data) for response_id, data in expected.items()}
+    async with SessionLocal() as db:
+        depths = (await db.scalars(
+            select(Response.delta_depth).where(Response.participant_id == participant_id).order_by(Response.version)
+        )).all()
+    assert depths.count(0) >= 4
+    assert max(depths) == keyframe_interval - 1
+
+
+@pytest.mark.parametrize("change", ["rewrite", "remove"])
+async def test_changing_a_middle_version_keeps_later_versions(client, keyframe_interval, change):
+    """가운데 버전을 고치거나 지워도 그 버전을 기준으로 한 델타들이 다시 인코딩되어 복원 결과가 같음"""
+    rng = random.Random(7)
+    room_id = await create_room(client)
+    first = await submit(client, room_id, "A", SLOTS[:7])
+    participant_id = first["participant_id"]
+    ids = [first["response_id"]]
+    data = {"available_time_slots": SLOTS[:7]}
+    expected = {first["response_id"]: data}
+    for _ in range(keyframe_interval * 2 + 2):
+        data = edited(rng, data)
+        response_id = await create(client, participant_id, data)
+        ids.append(response_id)
+        expected[response_id] = data
+
+    # 키프레임 바로 다음 델타와 델타 사슬 가운데 버전 모두
+    for middle in (ids[1], ids[keyframe_interval + 2]):
+        if change == "rewrite":
+            data = edited(rng, expected[middle])
+            response = await client.put(f"/api/v1/responses/{middle}", json={"response_data": data})
+            assert response.status_code == 200, response.text
+            assert sorted_slots(response.json()["response_data"]) == sorted_slots(data)
+            expected[middle] = data
+        else:
+            assert (await client.delete(f"/api/v1/responses/{middle}")).status_code == 204
+            del expected[middle]
+        assert await stored_versions(participant_id) == {response_id: sorted_slots(data) for response_id, data in expected.items()}
+    assert {response_id: data for response_id, (data, _) in (await history(client, participant_id)).items()} == {
+        response_id: sorted_slots(data) for response_id, data in expected.items()
+    }
+
+
+async def test_random_history_operations(client):
+    """응답 생성/수정/삭제/활성화를 무작위로 섞어도 모든 버전의 데이터, 활성 상태, 방 집계가 모델과 일치"""
+    rng = random.Random(11)
+    room_id = await create_room(client)
+    first = await submit(client, room_id, "A", SLOTS[:2])
+    participant_id = first["participant_id"]
+    # 응답 ID -> [데이터, 활성 여부] (생성 순서대로)
+    model = {first["response_id"]: [{"available_time_slots": SLOTS[:2]}, True]}
+
+    for step in range(120):
+        operation = rng.choice(["create", "create", "update", "delete", "activate"])
+        if operation == "create" or not model:
+            data = edited(rng, model[list(model)[-1]][0]) if model and rng.random() < 0.7 else slot_data(rng)
+            model[await create(client, participant_id, data)] = [data, True]
+            continue
+        response_id = rng.choice(list(model))
+        if operation == "update":
+            data = edited(rng, model[response_id][0])
+            response = await client.put(f"/api/v1/responses/{response_id}", json={"response_data": data})
+            assert response.status_code == 200, response.text
+            model[response_id][0] = data
+        elif operation == "delete":
+            assert (await client.delete(f"/api/v1/responses/{response_id}")).status_code == 204
+            del model[response_id]
+        else:
+            assert (await client.put(f"/api/v1/responses/{response_id}/activate")).status_code == 200
+            for entry in model.values():
+                entry[1] = False
+            model[response_id][1] = True
+
+        if step % 20 == 0:
+            # 집계가 있는 상태에서 이어지도록 중간에 결과를 조회
+            assert (await client.get(f"/api/v1/rooms/{room_id}/optimal-times")).status_code == 200
+
+    expected = {response_id: (sorted_slots(data), active) for response_id, (data, active) in model.items()}
+    assert await history(client, participant_id) == expected
+    assert await stored_versions(participant_id) == {response_id: data for response_id, (data, _) in expected.items()}
+    async with SessionLocal() as db:
+        room = await db.get(Room, room_id)
+        assert await slot_tally.check_room(db, room) == []
+        participant = await db.get(Participant, participant_id)
+        active = [response_id for response_id, (_, is_active) in expected.items() if is_active]
+        assert await slot_tally.response_slots(db, participant) == (set(model[active[-1]][0]["available_time_slots"]) if active else None)
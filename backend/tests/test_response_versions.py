@@ -0,0 +1,72 @@
+import asyncio
+import pytest
+from sqlalchemy import func, select
+from app.database import SessionLocal
+from app.models import Participant, Response
+from app.services.write_queue import write_queue
+from tests.conftest import DATES, TIMES, create_room, submit
+
+pytestmark = pytest.mark.anyio
+
+SLOTS = [f"{date}|{time}" for date in DATES for time in TIMES]
+
+
+@pytest.fixture(params=["on", "off"])
+def queue_mode(request, monkeypatch):
+    """쓰기 큐를 거칠 때와 요청마다 세션을 열어 바로 커밋할 때 모두 확인"""
+    monkeypatch.setattr(write_queue, "enabled", request.param == "on")
+    return request.param
+
+
+async def test_concurrent_updates_allocate_gap_free_versions(client, queue_mode):
+    """한 참여자에게 동시에 제출/응답 생성/수정해도 버전이 빠짐없이 한 번씩만 발급됨"""
+    room_id = await create_room(client)
+    first = await submit(client, room_id, "A", SLOTS[:2])
+    participant_id = first["participant_id"]
+    response_id = first["response_id"]
+
+    requests = []
+    for i in range(30):
+        slots = SLOTS[i % 5:i % 5 + 3]
+        if i % 3 == 0:
+            requests.append(client.post(f"/api/v1/rooms/{room_id}/submissions", json={
+                "name": "A", "response_data": {"available_time_slots": slots},
+            }))
+        elif i % 3 == 1:
+            requests.append(client.post("/api/v1/responses/", json={
+                "participant_id": participant_id, "response_data": {"available_time_slots": slots},
+            }))
+        else:
+            requests.append(client.put(f"/api/v1/responses/{response_id}", json={
+                "response_data": {"available_time_slots": slots},
+            }))
+    results = await asyncio.gather(*requests)
+    assert all(result.status_code in (200, 201) for result in results), [result.text for result in results]
+
+    issued = [1]
+    for result in results:
+        issued.append(result.json()["version"])
+    assert sorted(issued) == list(range(1, len(requests) + 2))
+
+    async with SessionLocal() as db:
+        participant = await db.get(Participant, participant_id)
+        assert participant.response_version == len(requests) + 1
+        duplicates = (await db.execute(
+            select(Response.version, func.count())
+            .where(Response.participant_id == participant_id)
+            .group_by(Response.version)
+            .having(func.count() > 1)
+        )).all()
+        assert duplicates == []
+
+
+@pytest.mark.parametrize("name", ["", "가" * 101])
+async def test_name_length_is_validated(client, name):
+    """이름은 participants.name 열과 같은 1~100자 (제출과 참여자 생성 모두)"""
+    room_id = await create_room(client)
+    submission = await client.post(f"/api/v1/rooms/{room_id}/submissions", json={
+        "name": name, "response_data": {"available_time_slots": []}
+    })
+    participant = await client.post("/api/v1/participants/", json={"room_id": room_id, "name": name})
+    assert (submission.status_code, participant.status_code) == (422, 422)
+    assert (await client.get(f"/api/v1/participants/room/{room_id}")).json() == []
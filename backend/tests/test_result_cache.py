@@ -0,0 +1,161 @@
+import pytest
+from app.services import result_cache as result_cache_module
+from app.services.result_cache import ExternalBackend, LocalStore, MemoryBackend, ResultCache, result_cache
+from tests.conftest import create_room, submit
+
+pytestmark = pytest.mark.anyio
+
+
+class Clock:
+    """time.monotonic 대역 (테스트에서 시간을 직접 진행)"""
+
+    def __init__(self):
+        self.now = 1000.0
+
+    def monotonic(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch) -> Clock:
+    clock = Clock()
+    monkeypatch.setattr(result_cache_module, "time", clock)
+    return clock
+
+
+async def test_memory_backend_evicts_least_recently_used_by_entry_count():
+    backend = MemoryBackend(max_bytes=1024, max_entries=2)
+    await backend.set("room", "a", b"1", 60)
+    await backend.set("room", "b", b"2", 60)
+    assert await backend.get("a") == b"1"  # a를 최근 사용으로
+    await backend.set("room", "c", b"3", 60)
+
+    assert await backend.get("b") is None
+    assert (await backend.get("a"), await backend.get("c")) == (b"1", b"3")
+    assert backend.stats()["evictions"] == 1
+    assert backend.stats()["entries"] == 2
+
+
+async def test_memory_backend_evicts_by_byte_budget():
+    backend = MemoryBackend(max_bytes=10)
+    await backend.set("room-1", "a", b"aaaa", 60)
+    await backend.set("room-1", "b", b"bbbb", 60)
+    await backend.set("room-2", "c", b"cccc", 60)
+
+    assert await backend.get("a") is None
+    assert backend.stats()["bytes"] == 8
+    # 상한보다 큰 값은 저장하지 않고 다른 항목도 밀어내지 않음
+    await backend.set("room-2", "big", b"x" * 11, 60)
+    assert await backend.get("big") is None
+    assert backend.stats()["entries"] == 2
+    assert backend.stats()["evictions"] == 1
+    # 제거된 항목은 방별 키 목록에서도 빠짐
+    assert backend.room_keys == {"room-1": {"b"}, "room-2": {"c"}}
+
+
+async def test_memory_backend_expires_entries(clock):
+    backend = MemoryBackend(max_bytes=1024)
+    await backend.set("room", "a", b"1", 60)
+    clock.now += 59
+    assert await backend.get("a") == b"1"
+    clock.now += 1
+    assert await backend.get("a") is None
+    stats = backend.stats()
+    assert (stats["entries"], stats["bytes"], stats["evictions"], stats["expirations"]) == (0, 0, 0, 1)
+
+
+async def test_memory_backend_invalidates_only_the_room():
+    backend = MemoryBackend(max_bytes=1024)
+    await backend.set("room-1", "a", b"1", 60)
+    await backend.set("room-1", "b", b"2", 60)
+    await backend.set("room-2", "c", b"3", 60)
+    await backend.invalidate("room-1")
+    assert (await backend.get("a"), await backend.get("b"), await backend.get("c")) == (None, None, b"3")
+    assert backend.stats()["bytes"] == 1
+
+
+async def test_external_backend_round_trips_through_local_store(clock):
+    store = LocalStore()
+    backend = ExternalBackend(store, prefix="test:")
+    await backend.set("room-1", "a", b"1", 60)
+    await backend.set("room-1", "b", b"2", 60)
+    await backend.set("room-2", "c", b"3", 60)
+    assert await backend.get("a") == b"1"
+    assert await store.smembers("test:room:room-1") == {"test:a", "test:b"}
+
+    await backend.invalidate("room-1")
+    assert (await backend.get("a"), await backend.get("b"), await backend.get("c")) == (None, None, b"3")
+    assert await store.smembers("test:room:room-1") == set()
+
+    clock.now += 60
+    assert await backend.get("c") is None
+    assert await store.smembers("test:room:room-2") == set()
+
+
+@pytest.mark.parametrize("backend", [MemoryBackend(1024), ExternalBackend(LocalStore())], ids=["memory", "external"])
+async def test_result_cache_counts_hits_misses_and_invalidations(backend):
+    cache = ResultCache(backend, ttl=60)
+    computed = []
+
+    async def compute() -> bytes:
+        computed.append(1)
+        return b"result"
+
+    assert await cache.get_or_compute("room", "key", compute) == b"result"
+    assert await cache.get_or_compute("room", "key", compute) == b"result"
+    await cache.invalidate("room")
+    assert await cache.get_or_compute("room", "key", compute) == b"result"
+
+    assert len(computed) == 2
+    stats = cache.stats()
+    assert (stats["hits"], stats["misses"], stats["invalidations"]) == (1, 2, 1)
+    assert stats["backend"] == type(backend).__name__
+
+
+async def test_writes_invalidate_only_their_room(client, monkeypatch):
+    """responses.py / participants.py의 쓰기는 바뀐 방의 캐시만 지우고, 다음 조회는 새 결과를 계산"""
+    if result_cache.backend is None:
+        pytest.skip("RESULT_CACHE=off")
+    invalidated = []
+    invalidate = result_cache.invalidate
+
+    async def recording_invalidate(room_id: str) -> None:
+        invalidated.append(room_id)
+        await invalidate(room_id)
+
+    monkeypatch.setattr(result_cache, "invalidate", recording_invalidate)
+    room_id = await create_room(client)
+    other_room_id = await create_room(client)
+    first = await submit(client, room_id, "A", ["2025-03-04|09:00"])
+    await submit(client, other_room_id, "B", ["2025-03-04|09:00"])
+
+    async def optimal(target: str):
+        response = await client.get(f"/api/v1/rooms/{target}/optimal-times")
+        assert response.status_code == 200
+        return [(slot["time_slot"], slot["participant_count"]) for slot in response.json()]
+
+    writes = [
+        client.post("/api/v1/responses/", json={"participant_id": first["participant_id"], "response_data": {"available_time_slots": ["2025-03-04|09:30"]}}),
+        client.put(f"/api/v1/responses/{first['response_id']}", json={"response_data": {"available_time_slots": ["2025-03-04|10:00"]}}),
+        client.put(f"/api/v1/responses/{first['response_id']}/activate"),
+        client.post("/api/v1/participants/", json={"room_id": room_id, "name": "C"}),
+    ]
+    # 이전 응답을 고쳐도 활성 응답(가장 최근)은 그대로이고, 활성화하면 바뀜
+    expected = [[("2025-03-04|09:30", 1)], [("2025-03-04|09:30", 1)], [("2025-03-04|10:00", 1)], [("2025-03-04|10:00", 1)]]
+    for write, result in zip(writes, expected):
+        await optimal(room_id)
+        await optimal(other_room_id)
+        invalidated.clear()
+        hits = result_cache.hits
+        response = await write
+        assert response.status_code in (200, 201), response.text
+        assert invalidated == [room_id]
+        assert await optimal(room_id) == result
+        await optimal(other_room_id)
+        assert result_cache.hits == hits + 1  # 다른 방 결과는 그대로 적중
+
+    participant_c = next(p for p in (await client.get(f"/api/v1/participants/room/{room_id}")).json() if p["name"] == "C")
+    invalidated.clear()
+    assert (await client.delete(f"/api/v1/participants/{participant_c['id']}")).status_code == 204
+    assert (await client.delete(f"/api/v1/responses/{first['response_id']}")).status_code in (200, 204)
+    assert invalidated == [room_id, room_id]
@@ -0,0 +1,122 @@
+import json
+import pytest
+from app.api.v1 import rooms
+from app.services import room_events as room_events_module
+from app.services.room_events import RoomEventHub, room_events
+from tests.conftest import create_room, submit
+
+pytestmark = pytest.mark.anyio
+
+
+def frame_data(frame: str):
+    """SSE 프레임의 data 필드"""
+    return json.loads(next(line[len("data: "):] for line in frame.splitlines() if line.startswith("data: ")))
+
+
+async def test_unsubscribe_removes_empty_rooms():
+    hub = RoomEventHub()
+    first = hub.subscribe("room")
+    second = hub.subscribe("room")
+    assert hub.stats()["subscribers"] == 2
+
+    hub.unsubscribe(first)
+    hub.unsubscribe(first)  # 두 번 호출해도 안전 (스트림 종료 경로가 여럿)
+    assert hub.stats() == {"rooms": 1, "subscribers": 1, "published": 0, "dropped": 0}
+    hub.unsubscribe(second)
+    assert hub.subscribers == {}
+    assert hub.publish("room", "change", {"version": 1}) == 0
+    assert hub.stats()["published"] == 0
+
+
+async def test_publish_reaches_only_the_room():
+    hub = RoomEventHub()
+    subscription = hub.subscribe("room-1")
+    other = hub.subscribe("room-2")
+    assert hub.publish("room-1", "change", {"version": 3}, event_id=3) == 1
+
+    frame = await subscription.next(0.1)
+    assert frame.startswith("event: change\nid: 3\n")
+    assert frame_data(frame) == {"version": 3}
+    assert await other.next(0.01) == ""  # 시간 초과 (keepalive)
+
+
+async def test_slow_consumer_is_dropped():
+    """큐가 가득 찬 구독자만 끊고, 따라오는 구독자는 모든 이벤트를 받음"""
+    hub = RoomEventHub(queue_size=2)
+    fast = hub.subscribe("room")
+    slow = hub.subscribe("room")
+
+    received = []
+    for version in range(1, 4):
+        hub.publish("room", "change", {"version": version})
+        received.append(frame_data(await fast.next(0.1))["version"])
+
+    assert received == [1, 2, 3]
+    assert slow.dropped and not fast.dropped
+    # 대기 중이던 이벤트는 버리고 바로 종료 신호를 받음
+    assert await slow.next(0.1) is None
+    assert hub.subscribers == {"room": {fast}}
+    assert hub.stats()["dropped"] == 1
+
+
+async def test_publish_serializes_once_for_all_subscribers(monkeypatch):
+    hub = RoomEventHub()
+    subscriptions = [hub.subscribe("room") for _ in range(50)]
+    calls = []
+    dumps = room_events_module.json_codec.dumps
+
+    def counting_dumps(value):
+        calls.append(value)
+        return dumps(value)
+
+    monkeypatch.setattr(room_events_module.json_codec, "dumps", counting_dumps)
+    assert hub.publish("room", "change", {"version": 1, "slots": {"2025-03-04|09:00": 2}}) == 50
+
+    assert len(calls) == 1
+    frames = [await subscription.next(0.1) for subscription in subscriptions]
+    assert all(frame is frames[0] for frame in frames)
+
+
+async def test_writes_publish_slot_counts_after_commit(client):
+    """응답 제출이 커밋되면 구독자가 바뀐 슬롯의 새 인원수를 받음 (집계가 없으면 resync)"""
+    room_id = await create_room(client)
+    await submit(client, room_id, "A", ["2025-03-04|09:00"])
+    subscription = room_events.subscribe(room_id)
+    try:
+        await submit(client, room_id, "B", ["2025-03-04|09:00"])
+        first = frame_data(await subscription.next(1))
+        assert first["resync"] is True and first["participant"] == "B"
+
+        assert (await client.get(f"/api/v1/rooms/{room_id}/optimal-times")).status_code == 200
+        await submit(client, room_id, "C", ["2025-03-04|09:00", "2025-03-04|09:30"])
+        second = frame_data(await subscription.next(1))
+    finally:
+        room_events.unsubscribe(subscription)
+
+    assert second["version"] == first["version"] + 1
+    assert second["respondent_count"] == 3
+    assert second["slots"] == {"2025-03-04|09:00": 3, "2025-03-04|09:30": 1}
+    assert "resync" not in second
+
+
+class DisconnectingRequest:
+    """첫 확인 뒤에 연결이 끊기는 요청 대역"""
+
+    def __init__(self):
+        self.checks = 0
+
+    async def is_disconnected(self) -> bool:
+        self.checks += 1
+        return self.checks > 1
+
+
+async def test_stream_unsubscribes_when_client_disconnects(client, monkeypatch):
+    monkeypatch.setattr(rooms, "EVENTS_KEEPALIVE_SECONDS", 0.01)
+    room_id = await create_room(client)
+    response = await rooms.stream_room_events(room_id, DisconnectingRequest())
+    assert room_id in room_events.subscribers
+
+    frames = [frame async for frame in response.body_iterator]
+    assert frames[0].startswith("event: hello\n")
+    assert frames[1:] == [": keepalive\n\n"]
+    assert room_id not in room_events.subscribers
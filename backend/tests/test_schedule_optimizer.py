@@ -0,0 +1,64 @@
+import pytest
+from app.services import schedule_optimizer
+from app.services.schedule_optimizer import ScheduleOptimizer
+
+# A는 09:00-10:00 전체, B는 09:00만, C는 09:30-10:30 전체 가능
+MEMBERS = [
+    ("2025-03-04|09:00", [0, 1]),
+    ("2025-03-04|09:30", [0, 2]),
+    ("2025-03-04|10:00", [2]),
+]
+NAMES = ["A", "B", "C"]
+
+
+def windows(scoring: str, **options):
+    return ScheduleOptimizer(1).optimal_times_from_tally(
+        NAMES, MEMBERS, len(NAMES), None, 60, scoring, options.get("limit"), options.get("min_count"), options.get("min_rate")
+    )
+
+
+def test_count_scoring_reports_full_window_participants():
+    """count 방식도 참여자/인원수는 구간 전체에 참여 가능한 사람, 정렬과 참여율만 평균 참여 인원 기준"""
+    results = windows("count")
+    assert [(r["time_slot"], r["available_participants"], r["participant_count"]) for r in results] == [
+        ("2025-03-04|09:00-10:00", ["A"], 1),
+        ("2025-03-04|09:30-10:30", ["C"], 1),
+    ]
+    # 09:00-10:00은 슬롯별 2명, 2명 -> 평균 2명 / 09:30-10:30은 2명, 1명 -> 평균 1.5명
+    assert [r["availability_rate"] for r in results] == [2 / 3, 1.5 / 3]
+
+
+def test_count_scoring_min_count_uses_full_window_participants():
+    # 구간 전체에 가능한 인원은 어느 구간이든 1명뿐 (슬롯 합집합 기준이면 3명)
+    assert windows("count", min_count=2) == []
+    assert len(windows("count", min_count=1)) == 2
+
+
+def test_count_scoring_keeps_windows_without_full_attendance():
+    """구간 전체에 가능한 사람이 없어도 평균 참여 인원이 있으면 count 방식 후보로 남음"""
+    members = [("2025-03-04|09:00", [0]), ("2025-03-04|09:30", [1])]
+    results = ScheduleOptimizer(1).optimal_times_from_tally(["A", "B"], members, 2, None, 60, "count")
+    assert [(r["participant_count"], r["availability_rate"]) for r in results] == [(0, 0.5)]
+    assert ScheduleOptimizer(1).optimal_times_from_tally(["A", "B"], members, 2, None, 60, "all") == []
+
+
+@pytest.mark.anyio
+async def test_offload_size_is_estimated_without_scanning_responses(monkeypatch):
+    """워커 풀로 넘길지 정하는 크기는 응답 수 × 방 슬롯 수 (이벤트 루프에서 응답마다 슬롯을 추출하지 않음)"""
+    optimizer = ScheduleOptimizer(1)
+    settings = {"time_slots_by_date": {"2025-03-04": ["09:00", "09:30"], "2025-03-05": ["09:00", "09:30", "10:00"]}}
+    responses = [{"response_data": {"available_time_slots": ["2025-03-04|09:00"]}} for _ in range(40)]
+    sizes = []
+
+    async def run_inline(func, *args, size=0):
+        sizes.append(size)
+        return func(*args)
+
+    def no_extract(response_data):
+        raise AssertionError("extract_slots called on the event loop")
+
+    monkeypatch.setattr(schedule_optimizer, "run_cpu_bound", run_inline)
+    monkeypatch.setattr(optimizer, "extract_slots", no_extract)
+    monkeypatch.setattr(optimizer, "optimal_times_from_responses", lambda *args: [])
+    await optimizer.find_optimal_times(responses, settings)
+    assert sizes == [40 * 5]
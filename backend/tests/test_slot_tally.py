@@ -0,0 +1,82 @@
+import asyncio
+import random
+import pytest
+from sqlalchemy import select
+from app.database import SessionLocal
+from app.models import Participant, Room, RoomSlotMember
+from app.services import slot_tally
+from tests.conftest import DATES, TIMES, create_room, submit
+
+pytestmark = pytest.mark.anyio
+
+SLOTS = [f"{date}|{time}" for date in DATES for time in TIMES]
+
+
+async def build_room(client, participants: int = 6) -> str:
+    room_id = await create_room(client)
+    rng = random.Random(1)
+    for i in range(participants):
+        await submit(client, room_id, f"p{i}", rng.sample(SLOTS, 4))
+    # 집계 생성
+    assert (await client.get(f"/api/v1/rooms/{room_id}/optimal-times")).status_code == 200
+    return room_id
+
+
+async def test_concurrent_writes_keep_tally_consistent(client):
+    """같은 방에 동시에 제출/참여/삭제해도 집계가 원본 응답과 일치 (PostgreSQL은 방 행 잠금, SQLite는 쓰기 큐)"""
+    room_id = await build_room(client)
+    rng = random.Random(2)
+    participants = (await client.get(f"/api/v1/participants/room/{room_id}")).json()
+
+    requests = [submit(client, room_id, f"p{rng.randrange(10)}", rng.sample(SLOTS, rng.randint(0, 6))) for _ in range(40)]
+    requests += [client.post("/api/v1/participants/", json={"room_id": room_id, "name": "late"}) for _ in range(5)]
+    requests.append(client.delete(f"/api/v1/participants/{participants[0]['id']}"))
+    await asyncio.gather(*requests)
+
+    async with SessionLocal() as db:
+        room = await db.get(Room, room_id)
+        assert await slot_tally.check_room(db, room) == []
+
+
+async def test_tallied_slots_match_responses(client):
+    room_id = await build_room(client)
+    async with SessionLocal() as db:
+        participants = (await db.scalars(select(Participant).where(Participant.room_id == room_id))).all()
+        for participant in participants:
+            assert await slot_tally.tallied_slots(db, participant) == await slot_tally.response_slots(db, participant)
+
+
+@pytest.mark.postgresql
+async def test_aggregate_slot_positions_match_member_rows(client):
+    room_id = await build_room(client)
+    async with SessionLocal() as db:
+        room = await db.get(Room, room_id)
+        participants = (await db.scalars(
+            select(Participant).where(Participant.room_id == room_id).order_by(Participant.created_at, Participant.id)
+        )).all()
+        positions = {participant.id: position for position, participant in enumerate(participants)}
+        expected = {}
+        for slot, participant_id in await db.execute(select(RoomSlotMember.slot, RoomSlotMember.participant_id).where(RoomSlotMember.room_id == room_id)):
+            expected.setdefault(slot, []).append(positions[participant_id])
+
+        aggregated = await slot_tally.aggregate_slot_positions(db, room)
+    assert aggregated == [(slot, sorted(expected[slot])) for slot in sorted(expected)]
+
+
+async def test_concurrent_first_reads_rebuild_once(client, monkeypatch):
+    """집계가 없는 방을 동시에 처음 조회해도 재구축은 한 번만 실행"""
+    room_id = await create_room(client)
+    for i in range(3):
+        await submit(client, room_id, f"p{i}", SLOTS[i:i + 3])
+
+    rebuilds = []
+    rebuild_room = slot_tally.rebuild_room
+
+    async def counting_rebuild(db, room):
+        rebuilds.append(room.id)
+        return await rebuild_room(db, room)
+
+    monkeypatch.setattr(slot_tally, "rebuild_room", counting_rebuild)
+    responses = await asyncio.gather(*(client.get(f"/api/v1/rooms/{room_id}/optimal-times") for _ in range(10)))
+    assert [response.status_code for response in responses] == [200] * 10
+    assert rebuilds == [room_id]
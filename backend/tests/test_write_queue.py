@@ -0,0 +1,94 @@
+import asyncio
+import pytest
+from sqlalchemy import event, select
+from app.database import SessionLocal, engine
+from app.models import Room
+from app.services.write_queue import WriteQueue, after_commit, write_queue
+from tests.conftest import create_room, submit
+
+pytestmark = pytest.mark.anyio
+
+
+def add_room(title: str, fail: bool = False):
+    async def write(db):
+        db.add(Room(title=title, room_type=1, creator_name="tester"))
+        await db.flush()
+        if fail:
+            raise ValueError(title)
+        return title
+    return write
+
+
+async def room_titles(titles) -> set:
+    async with SessionLocal() as db:
+        return set(await db.scalars(select(Room.title).where(Room.title.in_(titles))))
+
+
+async def test_failed_job_rolls_back_only_its_savepoint(client):
+    """한 묶음에서 실패한 작업만 되돌리고 나머지 작업은 커밋되어 결과를 받음"""
+    queue = WriteQueue(True)
+    try:
+        results = await asyncio.gather(
+            queue.submit(add_room("wq-ok-1")),
+            queue.submit(add_room("wq-bad", fail=True)),
+            queue.submit(add_room("wq-ok-2")),
+            return_exceptions=True,
+        )
+    finally:
+        await queue.close()
+
+    assert results[0] == "wq-ok-1" and results[2] == "wq-ok-2"
+    assert isinstance(results[1], ValueError)
+    assert await room_titles(["wq-ok-1", "wq-bad", "wq-ok-2"]) == {"wq-ok-1", "wq-ok-2"}
+    assert queue.stats() == {
+        "enabled": True, "pending": 0, "batches": 1, "committed": 2, "failed": 1, "largest_batch": 3
+    }
+
+
+async def test_concurrent_requests_share_batches(client, monkeypatch):
+    """동시에 들어온 쓰기 요청은 한 트랜잭션으로 묶여 커밋됨"""
+    monkeypatch.setattr(write_queue, "enabled", True)
+    room_id = await create_room(client)
+    await asyncio.gather(*(submit(client, room_id, f"p{i}", ["2025-03-04|09:00"]) for i in range(20)))
+    assert write_queue.largest_batch > 1
+    assert write_queue.batches < write_queue.committed
+
+
+async def test_after_commit_callbacks_run_after_commit(client):
+    """after_commit() 콜백은 COMMIT 이후에만 실행되고 실패한 작업의 콜백은 실행되지 않음"""
+    events = []
+    queue = WriteQueue(True)
+
+    def job(title: str, fail: bool = False):
+        async def write(db):
+            after_commit(db, events.append, f"callback {title}")
+            return await add_room(title, fail)(db)
+        return write
+
+    listener = lambda conn: events.append("commit")
+    event.listen(engine.sync_engine, "commit", listener)
+    try:
+        await asyncio.gather(
+            queue.submit(job("wq-cb-ok")),
+            queue.submit(job("wq-cb-bad", fail=True)),
+            return_exceptions=True,
+        )
+    finally:
+        event.remove(engine.sync_engine, "commit", listener)
+        await queue.close()
+
+    assert events == ["commit", "callback wq-cb-ok"]
+
+
+async def test_close_drains_pending_jobs(client):
+    """close()는 이미 넣은 작업을 모두 커밋한 뒤 작성자를 멈춤"""
+    queue = WriteQueue(True, max_batch=2)
+    titles = [f"wq-drain-{i}" for i in range(5)]
+    tasks = [asyncio.ensure_future(queue.submit(add_room(title))) for title in titles]
+    await asyncio.sleep(0)
+    await queue.close()
+
+    assert all(task.done() for task in tasks)
+    assert [task.result() for task in tasks] == titles
+    assert await room_titles(titles) == set(titles)
+    assert queue.batches == 3
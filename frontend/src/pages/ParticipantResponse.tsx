@@ -1,7 +1,7 @@
 import React, { useState } from 'react';
 import { useParams, useNavigate } from 'react-router-dom';
 import { useQuery, useMutation } from '@tanstack/react-query';
-import { roomApi, participantApi, responseApi } from '../services/api';
+import { roomApi } from '../services/api';
 import { ROOM_TYPES, TimeBlock, DEFAULT_TIME_BLOCKS } from '../types';
 
 const ParticipantResponse: React.FC = () => {
@@ -43,9 +43,9 @@ const ParticipantResponse: React.FC = () => {
     }
   }, [room?.settings?.time_slots_by_date]);
 
-  const createParticipantMutation = useMutation({
-    mutationFn: participantApi.createParticipant,
-    onSuccess: (participant) => {
+  // 참여자 생성(또는 같은 이름의 기존 참여자)과 응답 저장을 한 번의 요청으로
+  const submitResponseMutation = useMutation({
+    mutationFn: (name: string) => {
       // Set을 Array로 변환하여 응답 데이터 준비
       const processedResponseData = { ...responseData };
       
@@ -61,14 +61,14 @@ const ParticipantResponse: React.FC = () => {
 
       console.log('Processed response data:', processedResponseData);
 
-      // 응답 데이터 생성
-      responseApi.createResponse({
-        participant_id: participant.id,
+      return roomApi.submitResponse(id!, {
+        name,
         response_data: processedResponseData,
-      }).then(() => {
-        navigate(`/room/${id}/results`);
       });
     },
+    onSuccess: () => {
+      navigate(`/room/${id}/results`);
+    },
     onError: (error: any) => {
       if (error.response?.status === 400) {
         alert('이미 같은 이름의 참여자가 있습니다. 다른 이름을 사용해주세요.');
@@ -103,10 +103,7 @@ const ParticipantResponse: React.FC = () => {
       const finalResponseData = { ...responseData, available_time_slots: timeSlotArray };
       
       // 참여자 생성 및 응답 저장
-      createParticipantMutation.mutate({
-        room_id: id!,
-        name: participantName,
-      });
+      submitResponseMutation.mutate(participantName);
       
       // 응답 데이터를 미리 설정
       setResponseData(finalResponseData);
@@ -117,10 +114,7 @@ const ParticipantResponse: React.FC = () => {
       }
       
       // 참여자 생성 및 응답 저장
-      createParticipantMutation.mutate({
-        room_id: id!,
-        name: participantName,
-      });
+      submitResponseMutation.mutate(participantName);
     } else if (room.room_type === ROOM_TYPES.BLOCK) {
       if (!responseData.available_block_slots || responseData.available_block_slots.size === 0) {
         alert('최소 하나의 시간 블럭을 선택해주세요.');
@@ -131,10 +125,7 @@ const ParticipantResponse: React.FC = () => {
       const finalResponseData = { ...responseData, available_block_slots: blockSlotArray };
       
       // 참여자 생성 및 응답 저장
-      createParticipantMutation.mutate({
-        room_id: id!,
-        name: participantName,
-      });
+      submitResponseMutation.mutate(participantName);
       
       // 응답 데이터를 미리 설정
       setResponseData(finalResponseData);
@@ -823,10 +814,10 @@ const ParticipantResponse: React.FC = () => {
             </button>
             <button
               type="submit"
-              disabled={createParticipantMutation.isPending}
+              disabled={submitResponseMutation.isPending}
               className="btn-primary flex-1"
             >
-              {createParticipantMutation.isPending ? '제출 중...' : '응답 제출'}
+              {submitResponseMutation.isPending ? '제출 중...' : '응답 제출'}
             </button>
           </div>
         </form>
@@ -1,96 +1,96 @@
-import React, { useState } from 'react';
+import React, { useEffect, useMemo, useState } from 'react';
 import { useParams, Link } from 'react-router-dom';
 import { useQuery, useMutation, useQueryClient } from '@tanstack/react-query';
-import { roomApi, participantApi, responseApi } from '../services/api';
-import { ROOM_TYPE_LABELS, ROOM_TYPES } from '../types';
+import { roomApi, responseApi } from '../services/api';
+import { applyRoomChange } from '../services/roomChanges';
+import { ROOM_TYPE_LABELS, ROOM_TYPES, RoomBundle } from '../types';
 
 const Results: React.FC = () => {
   const { id } = useParams<{ id: string }>();
   const [selectedTab, setSelectedTab] = useState<'optimal' | 'responses'>('optimal');
   const queryClient = useQueryClient();
 
-  const { data: room, isLoading: roomLoading } = useQuery({
-    queryKey: ['room', id],
-    queryFn: () => roomApi.getRoom(id!),
+  // 방, 참여자별 응답 기록, 최적 시간대를 한 번에 조회
+  const { data: bundle, isLoading } = useQuery({
+    queryKey: ['room-bundle', id],
+    queryFn: () => roomApi.getRoomBundle(id!, { history: 'all' }),
     enabled: !!id,
   });
 
-  const { data: participants, isLoading: participantsLoading } = useQuery({
-    queryKey: ['participants', id],
-    queryFn: () => participantApi.getParticipantsByRoom(id!),
-    enabled: !!id,
-  });
+  const room = bundle?.room;
+  const participants = bundle?.participants;
+  const optimalTimes = bundle?.optimal_times;
 
-  const { data: optimalTimes, isLoading: optimalLoading, refetch: refetchOptimalTimes } = useQuery({
-    queryKey: ['optimal-times', id],
-    queryFn: () => roomApi.getOptimalTimes(id!),
-    enabled: !!id,
-  });
+  // 각 참여자의 모든 응답 데이터 (이름별로 그룹화)
+  const participantResponses = useMemo(() => {
+    if (!participants || participants.length === 0) return [];
 
-  // 각 참여자의 모든 응답 데이터 가져오기 (이름별로 그룹화)
-  const participantResponses = useQuery({
-    queryKey: ['participant-responses', id, participants],
-    queryFn: async () => {
-      if (!participants || participants.length === 0) return [];
-      
-      // 이름별로 참여자들을 그룹화
-      const participantsByName = participants.reduce((acc, participant) => {
-        if (!acc[participant.name]) {
-          acc[participant.name] = [];
+    // 이름별로 참여자들을 그룹화
+    const participantsByName = participants.reduce((acc, participant) => {
+      if (!acc[participant.name]) {
+        acc[participant.name] = [];
+      }
+      acc[participant.name].push(participant);
+      return acc;
+    }, {} as Record<string, typeof participants>);
+
+    const groupedResponses = Object.entries(participantsByName).map(([name, participantGroup]) => {
+      // 해당 이름의 모든 참여자들의 응답을 수집하여 버전별로 정렬 (최신 버전이 먼저)
+      const sortedResponses = participantGroup
+        .flatMap(participant => participant.responses || [])
+        .sort((a, b) => b.version - a.version);
+
+      return {
+        name,
+        participantGroup,
+        responses: sortedResponses,
+        hasResponse: sortedResponses.length > 0,
+        activeResponse: sortedResponses.find(r => r.is_active) || null,
+        // 첫 번째 참여 시간 (가장 오래된 참여자 기준)
+        firstParticipationTime: Math.min(...participantGroup.map(p => new Date(p.created_at).getTime()))
+      };
+    });
+
+    // 첫 참여 시간 순으로 정렬
+    return groupedResponses.sort((a, b) => a.firstParticipationTime - b.firstParticipationTime);
+  }, [participants]);
+
+  // 다른 참여자가 응답하면 이벤트의 슬롯 인원수 변화만 캐시된 결과에 반영
+  // (놓친 이벤트가 있거나 다시 연결했을 때 버전이 다르면 묶음 전체를 다시 조회)
+  useEffect(() => {
+    if (!id) return;
+    const queryKey = ['room-bundle', id];
+    return roomApi.subscribeRoomEvents(id, {
+      onHello: ({ version }) => {
+        const cached = queryClient.getQueryData<RoomBundle>(queryKey);
+        if (cached && cached.version !== version) {
+          queryClient.invalidateQueries({ queryKey });
         }
-        acc[participant.name].push(participant);
-        return acc;
-      }, {} as Record<string, typeof participants>);
-
-      const groupedResponses = await Promise.all(
-        Object.entries(participantsByName).map(async ([name, participantGroup]) => {
-          try {
-            // 해당 이름의 모든 참여자들의 응답을 수집
-            const allResponses = [];
-            for (const participant of participantGroup) {
-              const participantResponses = await responseApi.getResponsesByParticipant(participant.id);
-              allResponses.push(...participantResponses);
-            }
-            
-            // 버전별로 정렬 (최신 버전이 먼저)
-            const sortedResponses = allResponses.sort((a, b) => b.version - a.version);
-            
-            return {
-              name,
-              participantGroup,
-              responses: sortedResponses,
-              hasResponse: sortedResponses.length > 0,
-              activeResponse: sortedResponses.find(r => r.is_active) || null,
-              // 첫 번째 참여 시간 (가장 오래된 참여자 기준)
-              firstParticipationTime: Math.min(...participantGroup.map(p => new Date(p.created_at).getTime()))
-            };
-          } catch (error) {
-            console.error(`Error fetching responses for ${name}:`, error);
-            return {
-              name,
-              participantGroup,
-              responses: [],
-              hasResponse: false,
-              activeResponse: null,
-              firstParticipationTime: Math.min(...participantGroup.map(p => new Date(p.created_at).getTime()))
-            };
-          }
-        })
-      );
-      
-      // 첫 참여 시간 순으로 정렬
-      return groupedResponses.sort((a, b) => a.firstParticipationTime - b.firstParticipationTime);
-    },
-    enabled: !!participants && participants.length > 0,
-  });
+      },
+      onChange: (event) => {
+        const result = applyRoomChange(queryClient.getQueryData<RoomBundle>(queryKey), event);
+        if (result === 'refetch') {
+          queryClient.invalidateQueries({ queryKey });
+        } else if (result !== 'ignore') {
+          queryClient.setQueryData(queryKey, result);
+        }
+      },
+    });
+  }, [id, queryClient]);
+
+  // 응답 기록은 이벤트로 고칠 수 없으므로 응답 현황 탭을 볼 때만 다시 조회
+  useEffect(() => {
+    if (selectedTab === 'responses' && bundle?.historyStale) {
+      queryClient.invalidateQueries({ queryKey: ['room-bundle', id] });
+    }
+  }, [selectedTab, bundle?.historyStale, id, queryClient]);
 
   // 응답 활성화 뮤테이션
   const activateResponseMutation = useMutation({
     mutationFn: responseApi.activateResponse,
     onSuccess: () => {
       // 관련 쿼리들 다시 불러오기
-      queryClient.invalidateQueries({ queryKey: ['participant-responses', id] });
-      refetchOptimalTimes();
+      queryClient.invalidateQueries({ queryKey: ['room-bundle', id] });
     },
     onError: (error) => {
       console.error('응답 활성화 실패:', error);
@@ -102,7 +102,7 @@ const Results: React.FC = () => {
     activateResponseMutation.mutate(responseId);
   };
 
-  if (roomLoading || participantsLoading || optimalLoading) {
+  if (isLoading) {
     return (
       <div className="flex justify-center items-center h-64">
         <div className="animate-spin rounded-full h-12 w-12 border-b-2 border-blue-600"></div>
@@ -123,7 +123,7 @@ const Results: React.FC = () => {
 
   // 고유한 이름 기준으로 카운트
   const uniqueParticipantNames = new Set(participants?.map(p => p.name) || []).size;
-  const respondedParticipants = participantResponses.data?.filter(p => p.activeResponse).length || 0;
+  const respondedParticipants = bundle?.respondent_count ?? participantResponses.filter(p => p.activeResponse).length;
 
   // 시간대별 응답 현황 렌더링 함수
   const renderTimeSlotResponses = (responseData: any) => {
@@ -528,13 +528,13 @@ const Results: React.FC = () => {
         <div className="card">
           <h2 className="text-xl font-bold mb-4">참여자별 응답 현황</h2>
           
-          {participantResponses.isLoading ? (
+          {isLoading ? (
             <div className="flex justify-center py-8">
               <div className="animate-spin rounded-full h-8 w-8 border-b-2 border-blue-600"></div>
             </div>
-          ) : participantResponses.data && participantResponses.data.length > 0 ? (
+          ) : participantResponses.length > 0 ? (
             <div className="space-y-6">
-              {participantResponses.data.map((item, index) => (
+              {participantResponses.map((item, index) => (
                 <div key={`${item.name}-${index}`} className="p-4 bg-gray-50 rounded-lg">
                   <div className="flex items-start justify-between mb-3">
                     <div className="flex items-center space-x-3">
@@ -7,6 +7,16 @@ import {
   Response,
   CreateResponseRequest,
   OptimalTimeSlot,
+  OptimalTimesParams,
+  RoomAvailability,
+  RoomBundle,
+  RoomBundleParams,
+  RoomChangeEvent,
+  RoomHelloEvent,
+  Page,
+  PageParams,
+  SubmissionRequest,
+  SubmissionResult,
 } from '../types';
 
 const API_BASE_URL = import.meta.env.VITE_API_BASE_URL || (
@@ -41,6 +51,25 @@ api.interceptors.response.use(
   }
 );
 
+// 커서 페이지네이션 목록 (다음 페이지 커서는 X-Next-Cursor 헤더)
+async function fetchPage<T>(url: string, params?: PageParams): Promise<Page<T>> {
+  const response = await api.get(url, {
+    params: { ...params, fields: params?.fields?.join(',') },
+  });
+  return { items: response.data, nextCursor: response.headers['x-next-cursor'] ?? null };
+}
+
+async function fetchAllPages<T>(url: string, params?: PageParams): Promise<T[]> {
+  const items: T[] = [];
+  let cursor: string | undefined;
+  do {
+    const page = await fetchPage<T>(url, { ...params, cursor });
+    items.push(...page.items);
+    cursor = page.nextCursor ?? undefined;
+  } while (cursor);
+  return items;
+}
+
 // Room API
 export const roomApi = {
   async createRoom(roomData: CreateRoomRequest): Promise<Room> {
@@ -62,10 +91,45 @@ export const roomApi = {
     await api.delete(`/rooms/${roomId}`);
   },
 
-  async getOptimalTimes(roomId: string): Promise<OptimalTimeSlot[]> {
-    const response = await api.get(`/rooms/${roomId}/optimal-times`);
+  // 이름으로 참여하면서 응답 제출 (같은 이름의 참여자가 있으면 새 버전으로 저장)
+  async submitResponse(roomId: string, submission: SubmissionRequest): Promise<SubmissionResult> {
+    const response = await api.post(`/rooms/${roomId}/submissions`, submission);
+    return response.data;
+  },
+
+  async getOptimalTimes(roomId: string, params?: OptimalTimesParams): Promise<OptimalTimeSlot[]> {
+    const response = await api.get(`/rooms/${roomId}/optimal-times`, { params });
     return response.data;
   },
+
+  async getAvailability(roomId: string): Promise<RoomAvailability> {
+    const response = await api.get(`/rooms/${roomId}/availability`);
+    return response.data;
+  },
+
+  // 묶음과 함께 ETag("방ID-버전", 압축된 응답은 "방ID-버전-인코딩")의 방 변경 버전을 돌려줌 (변경 이벤트 적용 기준)
+  async getRoomBundle(roomId: string, params?: RoomBundleParams): Promise<RoomBundle> {
+    const response = await api.get(`/rooms/${roomId}/bundle`, { params });
+    const tag = String(response.headers['etag'] ?? '').replace(/^W\//, '').replace(/"/g, '');
+    const version = tag.startsWith(`${roomId}-`) ? parseInt(tag.slice(roomId.length + 1), 10) : NaN;
+    return { ...response.data, version: Number.isNaN(version) ? undefined : version };
+  },
+
+  // 방 변경 이벤트 구독, 반환된 함수로 구독 해제
+  // 연결이 끊기면(느린 구독자로 끊긴 경우 포함) EventSource가 다시 연결하고 서버가 hello를 다시 보낸다
+  subscribeRoomEvents(
+    roomId: string,
+    handlers: { onHello: (event: RoomHelloEvent) => void; onChange: (event: RoomChangeEvent) => void }
+  ): () => void {
+    const source = new EventSource(`${API_BASE_URL}/api/v1/rooms/${roomId}/events`);
+    source.addEventListener('hello', (event) => {
+      handlers.onHello(JSON.parse((event as MessageEvent).data));
+    });
+    source.addEventListener('change', (event) => {
+      handlers.onChange(JSON.parse((event as MessageEvent).data));
+    });
+    return () => source.close();
+  },
 };
 
 // Participant API
@@ -75,9 +139,13 @@ export const participantApi = {
     return response.data;
   },
 
+  // 방의 참여자 전체 (페이지를 차례로 조회)
   async getParticipantsByRoom(roomId: string): Promise<Participant[]> {
-    const response = await api.get(`/participants/room/${roomId}`);
-    return response.data;
+    return fetchAllPages<Participant>(`/participants/room/${roomId}`, { limit: 1000 });
+  },
+
+  async getParticipantsPage(roomId: string, params?: PageParams): Promise<Page<Participant>> {
+    return fetchPage<Participant>(`/participants/room/${roomId}`, params);
   },
 
   async getParticipant(participantId: string): Promise<Participant> {
@@ -97,9 +165,14 @@ export const responseApi = {
     return response.data;
   },
 
+  // 참여자의 응답 기록 전체 (최신순)
   async getResponsesByParticipant(participantId: string): Promise<Response[]> {
-    const response = await api.get(`/responses/participant/${participantId}`);
-    return response.data;
+    return fetchAllPages<Response>(`/responses/participant/${participantId}`, { limit: 1000 });
+  },
+
+  // fields로 response_data를 빼면 버전 목록만 가볍게 조회
+  async getResponsesPage(participantId: string, params?: PageParams): Promise<Page<Partial<Response>>> {
+    return fetchPage<Partial<Response>>(`/responses/participant/${participantId}`, params);
   },
 
   async getResponse(responseId: string): Promise<Response> {
@@ -0,0 +1,80 @@
+import { OptimalTimeSlot, Participant, RoomBundle, RoomChangeEvent, ROOM_TYPES } from '../types';
+
+// 변경 이벤트를 캐시된 결과 묶음에 적용한 결과
+// - 'ignore': 이미 반영된(묶음 버전 이하) 이벤트
+// - 'refetch': 놓친 이벤트가 있거나 슬롯 변화 없이 다시 받아야 하는 변경 (묶음을 다시 조회)
+// - RoomBundle: 바뀐 슬롯 인원수와 응답자 수를 반영한 새 묶음
+export type RoomChangeResult = 'ignore' | 'refetch' | RoomBundle;
+
+const PARTICIPANT_LEFT = 'participant_deleted';
+
+// 슬롯 델타를 최적 시간대 목록에 적용 (한 이벤트는 참여자 한 명의 변화이므로 인원수가 늘면 추가, 줄면 제거)
+function applySlots(
+  optimalTimes: OptimalTimeSlot[],
+  slots: Record<string, number>,
+  participant: string | undefined,
+  respondentCount: number
+): OptimalTimeSlot[] {
+  const bySlot = new Map(optimalTimes.map((slot) => [slot.time_slot, slot]));
+  Object.entries(slots).forEach(([key, count]) => {
+    const current = bySlot.get(key);
+    let names = current ? current.available_participants.filter((name) => name !== participant) : [];
+    if (participant && count > (current?.participant_count ?? 0)) {
+      names = [...names, participant];
+    }
+    if (count > 0) {
+      bySlot.set(key, { time_slot: key, available_participants: names, participant_count: count, availability_rate: 0 });
+    } else {
+      bySlot.delete(key);
+    }
+  });
+
+  // 참여 가능 인원수 내림차순 (동률이면 기존 순서 유지)
+  return Array.from(bySlot.values())
+    .map((slot) => ({
+      ...slot,
+      availability_rate: respondentCount > 0 ? slot.participant_count / respondentCount : 0,
+    }))
+    .sort((a, b) => b.participant_count - a.participant_count);
+}
+
+// 이름으로만 알 수 있는 참여자 목록 변화 반영 (새 이름은 응답 기록 없이 추가, 삭제된 이름은 제거)
+function applyParticipant(participants: Participant[], bundle: RoomBundle, event: RoomChangeEvent): Participant[] {
+  const name = event.participant;
+  if (!name) return participants;
+  if (event.change === PARTICIPANT_LEFT) {
+    return participants.filter((participant) => participant.name !== name);
+  }
+  if (participants.some((participant) => participant.name === name)) {
+    return participants;
+  }
+  return [
+    ...participants,
+    { id: `pending:${name}`, room_id: bundle.room.id, name, created_at: new Date().toISOString(), responses: [] },
+  ];
+}
+
+export function applyRoomChange(bundle: RoomBundle | undefined, event: RoomChangeEvent): RoomChangeResult {
+  if (!bundle || bundle.version === undefined) return 'refetch';
+  if (event.version <= bundle.version) return 'ignore';
+
+  // 이벤트를 놓쳤거나(버전 건너뜀) 슬롯 변화가 없는 변경(방 정보 변경, 집계 미생성)은 다시 조회
+  if (event.version !== bundle.version + 1 || event.resync || !event.slots) {
+    return 'refetch';
+  }
+  // 블럭 기준 방은 최적 시간대 라벨이 슬롯 키와 달라 델타를 바로 적용할 수 없음
+  if (bundle.room.room_type === ROOM_TYPES.BLOCK && Object.keys(event.slots).length > 0) {
+    return 'refetch';
+  }
+
+  // 참여만 한 경우(participant_joined)는 응답자 수가 오지 않음
+  const respondentCount = event.respondent_count ?? bundle.respondent_count;
+  return {
+    ...bundle,
+    version: event.version,
+    respondent_count: respondentCount,
+    optimal_times: applySlots(bundle.optimal_times, event.slots, event.participant, respondentCount),
+    participants: applyParticipant(bundle.participants, bundle, event),
+    historyStale: true,
+  };
+}
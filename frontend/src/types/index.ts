@@ -49,6 +49,17 @@ export interface CreateResponseRequest {
   response_data: Record<string, any>;
 }
 
+export interface SubmissionRequest {
+  name: string;
+  response_data: Record<string, any>;
+}
+
+export interface SubmissionResult {
+  participant_id: string;
+  response_id: string;
+  version: number;
+}
+
 export interface OptimalTimeSlot {
   time_slot: string;
   available_participants: string[];
@@ -56,6 +67,75 @@ export interface OptimalTimeSlot {
   availability_rate: number;
 }
 
+export interface SlotAvailability {
+  slot: string; // 시간(HH:MM) 또는 블럭 ID (날짜 기준 방은 빈 문자열)
+  label: string;
+  available_participants: string[];
+  participant_count: number;
+  availability_rate: number;
+}
+
+export interface DateAvailability {
+  date: string; // 날짜가 없는 이전 구조의 응답은 빈 문자열
+  slots: SlotAvailability[];
+}
+
+export interface RoomAvailability {
+  room_id: string;
+  room_type: number;
+  respondent_count: number;
+  dates: DateAvailability[];
+}
+
+// 커서 페이지네이션 목록
+export interface PageParams {
+  limit?: number;
+  cursor?: string;
+  fields?: string[]; // 보낼 필드만 선택 (예: ['id', 'version', 'is_active'])
+}
+
+export interface Page<T> {
+  items: T[];
+  nextCursor: string | null;
+}
+
+// 결과 페이지용 묶음 응답 (GET /rooms/{id}/bundle)
+export interface RoomBundle {
+  room: Room;
+  participants: Participant[]; // 참여자별 responses는 최신 버전부터
+  respondent_count: number;
+  optimal_times: OptimalTimeSlot[];
+  version?: number; // 응답 ETag의 방 변경 버전 (클라이언트에서 채움)
+  historyStale?: boolean; // 변경 이벤트로 집계만 고친 상태 (응답 기록은 다시 조회해야 최신)
+}
+
+export interface RoomBundleParams {
+  history?: 'active' | 'all' | number; // active: 활성 응답만, all: 전체 버전, N: 활성 응답 + 최근 N개 버전
+}
+
+// 방 변경 이벤트 (GET /rooms/{id}/events, Server-Sent Events)
+export interface RoomChangeEvent {
+  change: string; // response_created, response_activated, participant_joined, room_updated ...
+  version: number; // 방 변경 버전 (ETag와 같은 값)
+  participant?: string;
+  respondent_count?: number;
+  slots?: Record<string, number>; // 바뀐 슬롯 -> 새 참여 인원수
+  resync?: boolean; // true면 바뀐 슬롯 정보 없이 전체를 다시 조회해야 함
+}
+
+// 연결(재연결 포함)할 때마다 먼저 오는 이벤트
+export interface RoomHelloEvent {
+  version: number; // 현재 방 변경 버전
+}
+
+export interface OptimalTimesParams {
+  duration?: number; // 회의 길이(분), 시간 기준 방에서 연속 구간으로 계산
+  scoring?: 'all' | 'count';
+  limit?: number; // 상위 N개만 반환
+  min_count?: number; // 최소 참여 인원수
+  min_rate?: number; // 최소 참여율 (0~1)
+}
+
 export interface TimeSlot {
   hour: number;
   available: boolean;